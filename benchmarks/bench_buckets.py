@@ -0,0 +1,77 @@
+# bench_buckets.py    -*- coding: utf-8 -*-
+
+"""Time the panel layout of jobs with their (material, thickness) groups laid
+out one after another, and all at once in a pool of processes.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_buckets
+"""
+
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cabinet_calc.cabinet import MATERIALS, Run
+from cabinet_calc.job import Job
+from cabinet_calc.nesting import nest, nest_jobs
+
+
+def best_time(func, repeat=3):
+    """Return the least time taken by func, in seconds."""
+    result = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def report(name, algorithm, parts, serial, pooled, largest=None):
+    groups = len({(p['material'], p['thickness']) for p in parts})
+    print('{:20s}  {:10s}  {:6d}  {:11.1f}  {:9.1f}  {:>12s}'.format(
+        name, algorithm, groups, serial * 1e3, pooled * 1e3,
+        '' if largest is None else '{:.1f}'.format(largest * 1e3)))
+
+
+def main():
+    print('{:20s}  {:10s}  {:>6s}  {:>11s}  {:>9s}  {:>11s}'.format(
+        'job', 'algorithm', 'groups', 'serial (ms)', 'pool (ms)',
+        'largest (ms)'))
+    with ProcessPoolExecutor() as executor:
+        # Start the workers, so that starting them is not timed.
+        nest(Run(72.0, 28.5, 24.0).parts, executor=executor)
+        for fullwidth in (96.0, 157.125, 240.0):
+            run = Run(fullwidth, 28.5, 24.0, has_legs=True,
+                      prim_material='Melamine',
+                      door_material='Standard Plywood')
+            parts = run.parts
+            for algorithm in ('auto', 'random'):
+                largest = max(
+                    best_time(lambda: nest(parts[
+                        (parts['material'] == m) & (parts['thickness'] == t)],
+                        algorithm=algorithm))
+                    for m, t in {(p['material'], p['thickness'])
+                                 for p in parts})
+                report('{:g}" run'.format(fullwidth), algorithm, parts,
+                       best_time(lambda: nest(parts, algorithm=algorithm)),
+                       best_time(lambda: nest(parts, algorithm=algorithm,
+                                              executor=executor)),
+                       largest)
+        jobs = [Job('Job {}'.format(i),
+                    Run(72.0 + 12 * (i % 8), 28.5, 24.0, has_legs=bool(i % 2),
+                        prim_material=MATERIALS[i % 3],
+                        door_material=MATERIALS[i // 3 % 3]))
+                for i in range(50)]
+        parts = [p for job in jobs for p in job.parts]
+        for algorithm in ('auto', 'maxrects'):
+            report('50 jobs', algorithm, parts,
+                   best_time(lambda: nest_jobs(jobs, algorithm=algorithm), 1),
+                   best_time(lambda: nest_jobs(jobs, algorithm=algorithm,
+                                               executor=executor), 1))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_buckets.py  ends here
@@ -0,0 +1,64 @@
+# bench_cabinet_width.py    -*- coding: utf-8 -*-
+
+"""Benchmark the cabinet width solver against the original stepwise search.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_cabinet_width
+
+Both algorithms are timed over a dense grid of wall widths (every 1/16" from
+12" to 40') for each filler configuration, after checking that they agree on
+every width in the grid.
+"""
+
+
+import timeit
+
+import numpy as np
+
+from cabinet_calc.cabinet import (
+    Ends, _num_fillers, _search_cabinet_width, _solve_cabinet_width,
+    _batch_cabinet_width
+    )
+
+
+WIDTHS = np.arange(12.0, 480.0, 1 / 16)
+
+
+def grid(fillers):
+    """Return (fullwidth, num_cabinets, num_fillers) triples over the grid."""
+    num_fillers = _num_fillers(fillers)
+    return [(w, int(np.ceil(w / 36.0)), num_fillers) for w in WIDTHS.tolist()]
+
+
+def main():
+    print('Time per width, in microseconds, with speedups over the search:')
+    print('{:8s} {:>8s} {:>8s} {:>8s} {:>8s} {:>8s}'.format(
+        'Fillers', 'search', 'solve', '', 'batch', ''))
+    for fillers in Ends:
+        args = grid(fillers)
+        searched = [_search_cabinet_width(*a) for a in args]
+        solved = [_solve_cabinet_width(*a) for a in args]
+        if searched != solved:
+            raise AssertionError('solver disagrees with search for ' +
+                                 str(fillers))
+        t_search = min(timeit.repeat(
+            lambda: [_search_cabinet_width(*a) for a in args],
+            number=1, repeat=5))
+        t_solve = min(timeit.repeat(
+            lambda: [_solve_cabinet_width(*a) for a in args],
+            number=1, repeat=5))
+        fullwidth, num_cabinets, num_fillers = map(np.array, zip(*args))
+        t_batch = min(timeit.repeat(
+            lambda: _batch_cabinet_width(fullwidth, num_cabinets, num_fillers),
+            number=1, repeat=5))
+        per_call = 1e6 / len(args)
+        print('{:8s} {:8.3f} {:8.3f} {:7.1f}x {:8.3f} {:7.1f}x'.format(
+            str(fillers), t_search * per_call, t_solve * per_call,
+            t_search / t_solve, t_batch * per_call, t_search / t_batch))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_cabinet_width.py  ends here
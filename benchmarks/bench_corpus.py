@@ -0,0 +1,169 @@
+# bench_corpus.py    -*- coding: utf-8 -*-
+
+"""Time the panel layout of a fixed corpus of jobs by each algorithm, and
+check the results against a stored baseline.
+
+The corpus is every single run of cabinets over a grid of wall widths,
+heights, depths and filler configurations, less the few that cannot be laid
+out. For each algorithm, the 50th, 90th and 99th percentiles of the time
+taken per job are reported, with the sheets used and the yield over the whole
+corpus. The run fails, with exit status 1, if a percentile is more than
+--time-tolerance slower than in the baseline, or if the yield falls by more
+than --yield-tolerance. Since exact() stops at a time limit, its yield may
+vary a little from one machine to another.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_corpus
+
+and with --save to store the results as the new baseline, after a change
+that is meant to make them better, or on a new machine.
+"""
+
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from cabinet_calc.cabinet import Ends, Run
+from cabinet_calc.nesting import ALGORITHMS, nest
+
+
+# The grid of the corpus.
+WIDTHS = (36.0, 60.0, 96.0, 132.5, 157.125, 204.0, 240.0)
+HEIGHTS = (28.5, 34.5)
+DEPTHS = (12.0, 24.0)
+FILLERS = tuple(Ends)
+
+# The file the baseline is stored in.
+BASELINE = os.path.join(os.path.dirname(__file__), 'corpus_baseline.json')
+
+# The algorithms timed only once per job, since they take so long.
+SLOW = ('random', 'exact')
+
+
+def make_corpus():
+    """Return the parts tables of the corpus, as a list."""
+    result = []
+    for fullwidth in WIDTHS:
+        for height in HEIGHTS:
+            for depth in DEPTHS:
+                for fillers in FILLERS:
+                    parts = Run(fullwidth, height, depth, fillers=fillers).parts
+                    try:
+                        nest(parts, algorithm='guillotine')
+                    except ValueError:
+                        continue
+                    result.append(parts)
+    return result
+
+
+def measure(corpus, name):
+    """Return the results of one algorithm over the corpus, as a dict."""
+    times = []
+    sheets = 0
+    used = 0.0
+    area = 0.0
+    for parts in corpus:
+        best = float('inf')
+        for _ in range(1 if name in SLOW else 3):
+            start = time.perf_counter()
+            layout = nest(parts, algorithm=name)
+            best = min(best, time.perf_counter() - start)
+        times.append(best * 1e3)
+        sheets += layout.num_sheets
+        used += sum(sheet.used_area for sheet in layout.sheets)
+        area += sum(sheet.area for sheet in layout.sheets)
+    p50, p90, p99 = np.percentile(times, [50, 90, 99])
+    result = {'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99, 'sheets': sheets,
+              'yield': used / area}
+    return result
+
+
+def regressions(results, baseline, time_tolerance, yield_tolerance):
+    """Return a list of the ways the results are worse than the baseline."""
+    result = []
+    for name, now in results.items():
+        if name not in baseline:
+            continue
+        then = baseline[name]
+        for key in ('p50_ms', 'p90_ms', 'p99_ms'):
+            if now[key] > then[key] * (1 + time_tolerance):
+                result.append('{} {} {:.2f} ms, was {:.2f} ms'.format(
+                    name, key[:3], now[key], then[key]))
+        if now['yield'] < then['yield'] - yield_tolerance:
+            result.append('{} yield {:.2%} on {} sheets, was {:.2%} on {}'
+                          .format(name, now['yield'], now['sheets'],
+                                  then['yield'], then['sheets']))
+    return result
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the nesting algorithms over a fixed corpus.')
+    parser.add_argument('--save', action='store_true',
+                        help='store the results as the new baseline')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='the baseline file (default: %(default)s)')
+    parser.add_argument('--time-tolerance', type=float, default=0.5,
+                        help='the fraction by which a time percentile may '
+                             'exceed the baseline (default: %(default)s)')
+    parser.add_argument('--yield-tolerance', type=float, default=0.005,
+                        help='the amount by which the yield may fall below '
+                             'the baseline (default: %(default)s)')
+    parser.add_argument('algorithms', nargs='*', default=list(ALGORITHMS),
+                        help='the algorithms to run (default: all)')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    corpus = make_corpus()
+    print('{} jobs'.format(len(corpus)))
+    print('{:10s}  {:>8s}  {:>8s}  {:>8s}  {:>6s}  {:>6s}'.format(
+        'algorithm', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'sheets', 'yield'))
+    results = {}
+    for name in args.algorithms:
+        results[name] = now = measure(corpus, name)
+        print('{:10s}  {:8.2f}  {:8.2f}  {:8.2f}  {:6d}  {:6.1%}'.format(
+            name, now['p50_ms'], now['p90_ms'], now['p99_ms'], now['sheets'],
+            now['yield']))
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = None
+    if args.save:
+        # Keep the baselines of the algorithms that were not run.
+        if baseline is not None and baseline['jobs'] == len(corpus):
+            results = dict(baseline['results'], **results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'jobs': len(corpus), 'results': results}, f, indent=2,
+                      sort_keys=True)
+            f.write('\n')
+        print('Saved the baseline in {}'.format(args.baseline))
+        return 0
+    if baseline is None:
+        print('No baseline; run with --save to store one.')
+        return 1
+    if baseline['jobs'] != len(corpus):
+        print('The baseline is of a different corpus; run with --save to '
+              'store a new one.')
+        return 1
+    worse = regressions(results, baseline['results'], args.time_tolerance,
+                        args.yield_tolerance)
+    for line in worse:
+        print('REGRESSION: ' + line)
+    if not worse:
+        print('No regressions against the baseline.')
+    return 1 if worse else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# bench_corpus.py  ends here
@@ -0,0 +1,61 @@
+# bench_cutting.py    -*- coding: utf-8 -*-
+
+"""Time the cut sequences of a day's batch of jobs on the panel saw.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_cutting
+"""
+
+
+import time
+
+import numpy as np
+
+from cabinet_calc.cabinet import Ends, Run
+from cabinet_calc.job import Job
+from cabinet_calc.nesting import nest
+from cabinet_calc.cutting import cut_plan
+
+
+def make_jobs(count):
+    rng = np.random.default_rng(0)
+    result = []
+    for i in range(count):
+        runs = {'Run {}'.format(r + 1):
+                Run(float(rng.uniform(36, 360)), 28.5, 24.0,
+                    fillers=Ends(int(rng.integers(1, 5))),
+                    has_legs=bool(rng.integers(2)))
+                for r in range(int(rng.integers(1, 4)))}
+        result.append(Job('Job {}'.format(i), runs))
+    return result
+
+
+def make_layouts(jobs):
+    result = []
+    for job in jobs:
+        try:
+            result.append(nest(job.parts, algorithm='guillotine'))
+        except ValueError:
+            # Some random walls leave a filler too narrow to cut.
+            pass
+    return result
+
+
+def main():
+    for count in (10, 50, 200):
+        layouts = make_layouts(make_jobs(count))
+        start = time.perf_counter()
+        plans = cut_plan(layouts)
+        elapsed = time.perf_counter() - start
+        print('{:4d} jobs  {:5d} sheets  {:6d} cuts  {:5d} turns  '
+              '{:6.1f} saw hours  {:8.2f} ms'.format(
+                  count, len(plans), sum(len(p.cuts) for p in plans),
+                  sum(p.turns for p in plans),
+                  sum(p.seconds for p in plans) / 3600, elapsed * 1e3))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_cutting.py  ends here
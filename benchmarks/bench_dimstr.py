@@ -0,0 +1,64 @@
+# bench_dimstr.py    -*- coding: utf-8 -*-
+
+"""Time the conversion of dimensions to fractional inch strings, one at a
+time, through a Formatter and its cache, and a whole array at once, and their
+parsing back into numbers.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_dimstr
+"""
+
+
+import timeit
+
+import numpy as np
+
+from cabinet_calc.dimension_strs import (
+    Formatter, dimstr, dimstr_col, thickness_str, dimstr_array,
+    dimstr_col_array, thickness_str_array, parse_dimstr)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    # Dimensions as in a parts list: any number of thousandths, and exact
+    # sixteenths, as many parts come out.
+    values = {'random': rng.uniform(0.0, 96.0, 10000).round(3).tolist(),
+              'sixteenths': (rng.integers(0, 96 * 16, 10000) / 16).tolist()}
+    for func, func_array in ((dimstr, dimstr_array),
+                             (dimstr_col, dimstr_col_array),
+                             (thickness_str, thickness_str_array)):
+        for name, xs in values.items():
+            t = min(timeit.repeat(lambda: [func(x) for x in xs],
+                                  number=5, repeat=5)) / 5
+            print('{:20s} {:10s}  {:6.3f} us per value'.format(
+                func.__name__, name, t / len(xs) * 1e6))
+            array = np.array(xs)
+            t = min(timeit.repeat(lambda: func_array(array),
+                                  number=5, repeat=5)) / 5
+            print('{:20s} {:10s}  {:6.3f} us per value'.format(
+                func_array.__name__, name, t / len(xs) * 1e6))
+    fmt = Formatter()
+    for name, xs in values.items():
+        fmt.cache_clear()
+        t = min(timeit.repeat(lambda: [fmt.dimstr(x) for x in xs],
+                              number=5, repeat=5)) / 5
+        print('{:20s} {:10s}  {:6.3f} us per value  ({:.0%} cache hits)'.format(
+            'Formatter.dimstr', name, t / len(xs) * 1e6,
+            fmt.cache_info().hits / (25 * len(xs))))
+    # Parse the strings back, as from an imported job file, and the decimal
+    # numbers they were made from.
+    for name, xs in values.items():
+        for kind, strs in (('decimal', [str(x) for x in xs]),
+                           ('dimstr', [dimstr(x) for x in xs])):
+            parse_dimstr.cache_clear()
+            t = min(timeit.repeat(lambda: [parse_dimstr(s) for s in strs],
+                                  number=5, repeat=5)) / 5
+            print('{:20s} {:10s}  {:6.3f} us per value  ({})'.format(
+                'parse_dimstr', name, t / len(strs) * 1e6, kind))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_dimstr.py  ends here
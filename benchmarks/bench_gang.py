@@ -0,0 +1,58 @@
+# bench_gang.py    -*- coding: utf-8 -*-
+
+"""Time the panel layout of a day's batch of jobs, pooled and one by one.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_gang
+"""
+
+
+import random
+import time
+
+from cabinet_calc.cabinet import Ends, Run
+from cabinet_calc.job import Job
+from cabinet_calc.nesting import nest, nest_jobs
+
+
+def make_jobs(count, seed=0):
+    """Return a list of count jobs, each a single run of random width."""
+    rng = random.Random(seed)
+    result = []
+    while len(result) < count:
+        run = Run(rng.choice([72.0, 96.0, 120.0, 157.125, 180.0, 240.0]),
+                  28.5, 24.0, fillers=rng.choice(list(Ends)))
+        job = Job('Job {}'.format(len(result) + 1), run)
+        try:
+            nest(job.parts, algorithm='guillotine')
+        except ValueError:
+            continue
+        result.append(job)
+    return result
+
+
+def main():
+    print('jobs  pooled (ms)  sheets  yield   '
+          'one by one (ms)  sheets  yield')
+    for count in (10, 25, 50, 100):
+        jobs = make_jobs(count)
+        start = time.perf_counter()
+        pooled = nest_jobs(jobs)
+        pooled_time = time.perf_counter() - start
+        start = time.perf_counter()
+        layouts = [nest(job.parts) for job in jobs]
+        single_time = time.perf_counter() - start
+        sheets = sum(layout.num_sheets for layout in layouts)
+        used = sum(sheet.used_area for layout in layouts
+                   for sheet in layout.sheets)
+        area = sum(sheet.area for layout in layouts for sheet in layout.sheets)
+        print('{:4d}  {:11.1f}  {:6d}  {:5.1%}  {:15.1f}  {:6d}  {:5.1%}'.format(
+            count, pooled_time * 1e3, pooled.num_sheets, pooled.utilization,
+            single_time * 1e3, sheets, used / area))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_gang.py  ends here
@@ -0,0 +1,48 @@
+# bench_nesting.py    -*- coding: utf-8 -*-
+
+"""Time the panel layout of jobs of various sizes, by each algorithm.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_nesting
+"""
+
+
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+from cabinet_calc.cabinet import Ends, Run
+from cabinet_calc.job import Job
+from cabinet_calc.nesting import ALGORITHMS, nest, portfolio
+
+
+# The time allowed for each portfolio layout, in seconds.
+DEADLINE = 1.0
+
+
+def report(name, layout, seconds):
+    print('{:4d} parts  {:10s}  {:8.2f} ms  {:3d} sheets  {:.1%} yield'.format(
+        layout.num_pieces, name, seconds * 1e3, layout.num_sheets,
+        layout.utilization))
+
+
+def main():
+    with ProcessPoolExecutor() as executor:
+        for fullwidth in (36.0, 72.0, 157.125, 240.0, 480.0):
+            job = Job('Bench', Run(fullwidth, 28.5, 24.0, fillers=Ends.BOTH))
+            parts = job.parts
+            for name in ALGORITHMS:
+                number = 1 if name in ('random', 'exact') else 10
+                t = min(timeit.repeat(lambda: nest(parts, algorithm=name),
+                                      number=number, repeat=3)) / number
+                report(name, nest(parts, algorithm=name), t)
+            start = time.perf_counter()
+            layout = portfolio(parts, DEADLINE, executor=executor)
+            report('portfolio', layout, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_nesting.py  ends here
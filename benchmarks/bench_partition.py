@@ -0,0 +1,38 @@
+# bench_partition.py    -*- coding: utf-8 -*-
+
+"""Time the mixed width partitioner on runs up to 40 feet.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_partition
+"""
+
+
+import timeit
+
+from cabinet_calc.cabinet import Ends, partition_run
+
+
+# A finer catalog than the default, in 1/2" steps.
+HALF_INCH_CATALOG = [w / 2 for w in range(24, 73)]
+
+
+def main():
+    for fullwidth in (96.0, 240.0, 479.3):
+        for name, catalog in (('default', None),
+                              ('1/2" steps', HALF_INCH_CATALOG)):
+            kwargs = {} if catalog is None else {'catalog': catalog}
+            t = min(timeit.repeat(
+                lambda: partition_run(fullwidth, Ends.BOTH, **kwargs),
+                number=20, repeat=5)) / 20
+            part = partition_run(fullwidth, Ends.BOTH, **kwargs)
+            print('{:6.1f}"  {:10s}  {:7.3f} ms  {:2d} cabinets,'
+                  ' {} widths'.format(fullwidth, name, t * 1e3,
+                                      len(part.widths),
+                                      len(set(part.widths))))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_partition.py  ends here
@@ -0,0 +1,52 @@
+# bench_remnants.py    -*- coding: utf-8 -*-
+
+"""Time remnant lookups, and nesting on remnants, as the inventory grows.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_remnants
+"""
+
+
+import timeit
+
+import numpy as np
+
+from cabinet_calc.cabinet import MATERIALS, MATL_THICKNESSES, Ends, Run
+from cabinet_calc.nesting import nest
+from cabinet_calc.remnants import RemnantStore
+
+
+def make_store(count):
+    rng = np.random.default_rng(0)
+    store = RemnantStore(':memory:')
+    for _ in range(count):
+        material = MATERIALS[int(rng.integers(len(MATERIALS)))]
+        store.add(material, MATL_THICKNESSES[material][0],
+                  float(rng.uniform(6, 48)), float(rng.uniform(12, 96)))
+    return store
+
+
+def main():
+    parts = Run(157.125, 28.5, 24.0, fillers=Ends.BOTH).parts
+    print('{:>9s} {:>12s} {:>12s} {:>8s}'.format(
+        'remnants', 'find (us)', 'nest (ms)', 'sheets'))
+    for count in (0, 100, 1000, 10000):
+        store = make_store(count)
+        material = MATERIALS[0]
+        thickness = MATL_THICKNESSES[material][0]
+        t_find = min(timeit.repeat(
+            lambda: store.find(material, thickness, 23.5, 27.5, limit=10),
+            number=100, repeat=3)) / 100
+        t_nest = min(timeit.repeat(lambda: nest(parts, remnants=store),
+                                   number=5, repeat=3)) / 5
+        layout = nest(parts, remnants=store)
+        print('{:9d} {:12.1f} {:12.2f} {:8d}'.format(
+            count, t_find * 1e6, t_nest * 1e3,
+            sum(s.remnant is None for s in layout.sheets)))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_remnants.py  ends here
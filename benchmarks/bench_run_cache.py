@@ -0,0 +1,56 @@
+# bench_run_cache.py    -*- coding: utf-8 -*-
+
+"""Show how much work the Run derived-value cache saves.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_run_cache
+
+For each piece of job output, the number of derived values computed and the
+number of recomputations saved by the cache are reported, along with the time
+taken against a cold cache and a warm one.
+"""
+
+
+import timeit
+
+from cabinet_calc.cabinet import Ends, Run
+from cabinet_calc import job
+from cabinet_calc import cutlist
+
+
+def make_run():
+    return Run(183.5, 28.5, 24.0, fillers=Ends.BOTH, has_legs=True)
+
+
+OUTPUTS = [
+    ('job.run_summaryln', job.run_summaryln),
+    ('job.run_partslist', job.run_partslist),
+    ('cutlist.isometric_view', cutlist.isometric_view),
+    ('cutlist.panels_table', cutlist.panels_table),
+]
+
+
+def main():
+    print('{:24s} {:>8s} {:>8s} {:>10s} {:>10s}'.format(
+        'Output', 'computed', 'saved', 'cold (us)', 'warm (us)'))
+    for name, output in OUTPUTS:
+        r = make_run()
+        output(r)
+        info = r.cache_info()
+
+        def cold():
+            r.invalidate()
+            output(r)
+
+        t_cold = min(timeit.repeat(cold, number=100, repeat=5)) / 100
+        t_warm = min(timeit.repeat(lambda: output(r), number=100,
+                                   repeat=5)) / 100
+        print('{:24s} {:8d} {:8d} {:10.1f} {:10.1f}'.format(
+            name, info.misses, info.hits, t_cold * 1e6, t_warm * 1e6))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_run_cache.py  ends here
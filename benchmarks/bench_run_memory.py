@@ -0,0 +1,70 @@
+# bench_run_memory.py    -*- coding: utf-8 -*-
+
+"""Compare the memory held per quote by Run, RunSpec and RunResult objects.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_run_memory
+
+Many quotes are built for every object type, and the memory allocated for them
+is measured with tracemalloc and reported per object, along with the size of
+each object when pickled.
+"""
+
+
+import pickle
+import tracemalloc
+
+import numpy as np
+
+from cabinet_calc.cabinet import Ends, Run
+
+
+N = 20000
+
+
+def quotes():
+    """Return the Runs for N quotes, over a range of wall widths."""
+    widths = np.linspace(36.0, 480.0, N).tolist()
+    return [Run(w, 28.5, 24.0, fillers=Ends.BOTH) for w in widths]
+
+
+def measure(build):
+    """Return the bytes allocated per object by build(), and one object."""
+    tracemalloc.start()
+    objects = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return allocated / len(objects), objects[0]
+
+
+def main():
+    runs = quotes()
+    specs = [run.spec for run in runs]
+    # Fill the caches of these Runs now, so that building RunResults from them
+    # below measures only the RunResults.
+    for run in runs:
+        run.result
+    cases = [
+        ('Run', quotes),
+        ('Run, cache filled', lambda: [run.result and run for run in quotes()]),
+        ('RunSpec', lambda: [run.spec for run in runs]),
+        ('RunResult', lambda: [run.result for run in runs]),
+        ('RunSpec + RunResult',
+         lambda: [(spec, spec.to_run().result) for spec in specs]),
+    ]
+    print('{:22s} {:>14s} {:>14s}'.format('Object', 'bytes/object',
+                                          'pickled bytes'))
+    baseline = None
+    for name, build in cases:
+        per_object, sample = measure(build)
+        if baseline is None:
+            baseline = per_object
+        print('{:22s} {:14.0f} {:14d}   ({:.0%} of Run)'.format(
+            name, per_object, len(pickle.dumps(sample)), per_object / baseline))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_run_memory.py  ends here
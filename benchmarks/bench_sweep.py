@@ -0,0 +1,34 @@
+# bench_sweep.py    -*- coding: utf-8 -*-
+
+"""Time the design space sweep over many wall widths.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_sweep
+"""
+
+
+import timeit
+
+import numpy as np
+
+from cabinet_calc.cabinet import sweep, sweep_batch
+
+
+def main():
+    t_one = min(timeit.repeat(lambda: sweep(157.25, 28.5, 24.0),
+                              number=100, repeat=5)) / 100
+    print('sweep, one wall:            {:8.2f} ms'.format(t_one * 1e3))
+    for count in (1000, 10000):
+        widths = np.linspace(36.0, 480.0, count)
+        t_batch = min(timeit.repeat(lambda: sweep_batch(widths, 28.5, 24.0),
+                                    number=1, repeat=3))
+        cands = sweep_batch(widths, 28.5, 24.0)
+        print('sweep_batch, {:5d} walls:   {:8.2f} ms  ({} candidates)'.format(
+            count, t_batch * 1e3, len(cands)))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_sweep.py  ends here
@@ -0,0 +1,46 @@
+# bench_takeoff.py    -*- coding: utf-8 -*-
+
+"""Time the sheet goods takeoff of a large batch of jobs.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_takeoff
+"""
+
+
+import timeit
+
+import numpy as np
+
+from cabinet_calc.cabinet import Ends, Run
+from cabinet_calc.job import Job
+from cabinet_calc.takeoff import takeoff
+
+
+def make_jobs(count):
+    rng = np.random.default_rng(0)
+    result = []
+    for i in range(count):
+        runs = {'Run {}'.format(r + 1):
+                Run(float(rng.uniform(36, 360)), 28.5, 24.0,
+                    fillers=Ends(int(rng.integers(1, 5))),
+                    has_legs=bool(rng.integers(2)))
+                for r in range(int(rng.integers(1, 4)))}
+        result.append(Job('Job {}'.format(i), runs))
+    return result
+
+
+def main():
+    for count in (10, 100, 1000):
+        jobs = make_jobs(count)
+        for combine in (False, True):
+            t = min(timeit.repeat(lambda: takeoff(jobs, combine=combine),
+                                  number=5, repeat=3)) / 5
+            print('{:5d} jobs, combine={!s:5}  {:8.2f} ms'.format(
+                count, combine, t * 1e3))
+
+
+if __name__ == '__main__':
+    main()
+
+# bench_takeoff.py  ends here
@@ -39,14 +39,22 @@ diagrams of all parts to be cut, with all diagrams being to scale.
 """
 
 
-__all__ = ['MAX_CABINET_WIDTH', 'MIN_FILLER_WIDTH', 'MAX_FILLER_WIDTH',
-           'DOOR_HINGE_GAP', 'MATERIALS', 'MATL_ABBREVS',
+__all__ = ['MAX_CABINET_WIDTH', 'MIN_CABINET_WIDTH', 'MIN_FILLER_WIDTH',
+           'MAX_FILLER_WIDTH', 'DOOR_HINGE_GAP', 'MATERIALS', 'MATL_ABBREVS',
            'PRIM_MAT_DEFAULT', 'DOOR_MAT_DEFAULT', 'MATL_THICKNESSES',
-           'Ends', 'Run', 'cabinet_run']
+           'MATL_GRAIN', 'PART_GRAIN',
+           'SWEEP_WEIGHTS', 'SWEEP_DTYPE', 'CATALOG_WIDTHS', 'PART_DTYPE',
+           'Ends', 'CacheInfo', 'Run', 'RunSpec', 'RunResult', 'RunBatch',
+           'SweepCandidate', 'Partition', 'cabinet_run', 'sweep', 'sweep_batch',
+           'partition_run']
 
 
 import math
+from collections import namedtuple
 from enum import Enum
+from functools import wraps
+
+import numpy as np
 
 
 # Module constants
@@ -54,6 +62,9 @@ from enum import Enum
 # All measurements are in inches, unless otherwise specified.
 
 MAX_CABINET_WIDTH = 36.0
+# With two doors per cabinet, anything narrower is impractical. Only the design
+# space sweep uses this; Run never chooses more cabinets than it must.
+MIN_CABINET_WIDTH = 12.0
 MIN_FILLER_WIDTH = 1.0
 MAX_FILLER_WIDTH = 4.0
 
@@ -94,6 +105,51 @@ MATL_THICKNESSES = {'Standard Plywood': (0.74, [0.74, 0.74]),
                     'Marine-Grade Plywood': (0.75, [0.75, 0.75]),
                     'Melamine': (0.76, [1.0])}
 
+# Whether the parts cut from each material must follow its grain. Plywood
+# parts are laid out with their grain along that of the sheet, while melamine
+# has no grain to follow, so its parts may be turned either way. A material
+# not listed here is taken to have a grain.
+MATL_GRAIN = {'Standard Plywood': True,
+              'Marine-Grade Plywood': True,
+              'Melamine': False}
+
+# The way the grain runs on each part, where its material has a grain: along
+# the part's height ('V') or along its width ('H').
+PART_GRAIN = {'Back': 'V',
+              'Bottom': 'H',
+              'Side': 'V',
+              'Nailer': 'H',
+              'Filler': 'V',
+              'Door': 'V'}
+
+# Weights of the design space sweep score, which is to be minimized: per inch
+# of filler, per part to cut, and per distinct part size.
+SWEEP_WEIGHTS = (1.0, 0.5, 1.0)
+
+# The record type of Run.parts, one record per part size in the run. The part
+# is `width' by `height' as listed in the parts list. The grain runs along the
+# height ('V'), along the width ('H'), or either way ('', for parts of a
+# material without grain; see MATL_GRAIN and PART_GRAIN). The edges to be
+# banded are any of T(op) and B(ottom), which run along the width, and L(eft)
+# and R(ight), which run along the height; the front edge is B on horizontal
+# parts and L on side panels.
+PART_DTYPE = np.dtype([('name', 'U8'), ('qty', int), ('width', float),
+                       ('height', float), ('thickness', float),
+                       ('material', 'U32'), ('grain', 'U1'), ('edges', 'U4')])
+
+# The catalog of preferred cabinet widths that partition_run() mixes within a
+# run, in the 3" steps of the usual stock cabinet sizes.
+CATALOG_WIDTHS = (12.0, 15.0, 18.0, 21.0, 24.0, 27.0, 30.0, 33.0, 36.0)
+
+# The record type of the arrays returned by sweep_batch(). The fillers field
+# holds the value of the Ends member, and wall the index of the wall width.
+SWEEP_DTYPE = np.dtype([('wall', np.intp), ('fullwidth', float),
+                        ('num_cabinets', int), ('fillers', int),
+                        ('cabinet_width', float), ('filler_width', float),
+                        ('filler_waste', float), ('part_count', int),
+                        ('distinct_sizes', int), ('score', float),
+                        ('rank', int)])
+
 
 class Ends(Enum):
     """The choices for which ends of a cabinet run are to have fillers.
@@ -160,6 +216,68 @@ def cabinet_run(
                doorside_space_m, doorside_space_r)
 
 
+class RunSpec(namedtuple('RunSpec', [
+        'fullwidth', 'height', 'depth', 'fillers',
+        'prim_material', 'prim_thickness', 'door_material', 'door_thickness',
+        'btmpanel_thicknesses', 'has_legs', 'topnailer_depth', 'doortop_space',
+        'doorside_space_l', 'doorside_space_m', 'doorside_space_r'])):
+    """The input specification of a run of cabinets, as an immutable record.
+
+    The fields are the parameters of Run(), with every default filled in, so
+    the same run always has the same RunSpec. The btmpanel_thicknesses field
+    is a tuple rather than a list, to keep the record hashable.
+    """
+
+    __slots__ = ()
+
+    def to_run(self):
+        """Return a new :class:`Run <Run>` built to this specification."""
+        return Run.from_spec(self)
+
+
+class RunResult(namedtuple('RunResult', [
+        'fullwidth', 'num_cabinets', 'cabinet_width', 'cabinet_height',
+        'cabinet_depth', 'extra_width', 'num_fillers', 'filler_width',
+        'filler_height', 'filler_thickness', 'num_backpanels', 'back_width',
+        'back_height', 'back_thickness', 'btmpanels_per_cab', 'num_bottompanels',
+        'bottom_thickness', 'bottom_width', 'bottom_depth', 'num_sidepanels',
+        'side_depth', 'side_height', 'side_thickness', 'num_topnailers',
+        'topnailer_width', 'topnailer_depth', 'topnailer_thickness',
+        'num_doors', 'door_width', 'door_height', 'door_thickness'])):
+    """Every computed dimension of a run of cabinets, as an immutable record.
+
+    Each field holds the value of the same-named Run property.
+    """
+
+    __slots__ = ()
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'currsize'])
+CacheInfo.__doc__ = """Statistics of a Run's derived-value cache.
+
+Each hit is a recomputation saved."""
+
+
+def _derived(method):
+    """Decorate a Run method computing a derived value, to cache its result.
+
+    The cached value is kept until the Run is next mutated; see Run.__setattr__.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self):
+        try:
+            result = self._cache[name]
+        except KeyError:
+            result = self._cache[name] = method(self)
+            self._cache_stats['misses'] += 1
+        else:
+            self._cache_stats['hits'] += 1
+        return result
+    return wrapper
+
+
 class Run():
     """A Run maintains all specs for a single run, or bank, of cabinets.
 
@@ -202,6 +320,15 @@ class Run():
     The Run class assumes that there are exactly two doors per cabinet, as do all
     other functions in this module. This may change in the future, to allow
     single-door cabinets, but that would require lots of other modifications.
+
+    Derived values such as the number of cabinets and the cabinet width are
+    computed once and cached, as they are used by most other properties. Setting
+    or deleting any attribute clears the cache, so setters need not bother with
+    it. The one thing that goes unnoticed is mutating the btmpanel_thicknesses
+    list in place; assign a new list instead, or call invalidate() afterwards.
+
+    The parts property gathers all the panels to be cut into a single table,
+    from which the job output is produced.
     """
 
     def __init__(self, fullwidth, height, depth, fillers=Ends.NEITHER,
@@ -215,6 +342,8 @@ class Run():
                  doortop_space=0.5, doorside_space_l=0.125,
                  doorside_space_m=0.125, doorside_space_r=0.125):
         """Construct a Run object."""
+        self._cache = {}
+        self._cache_stats = {'hits': 0, 'misses': 0}
         self._fullwidth = fullwidth
         self._height = height
         self._depth = depth
@@ -249,6 +378,57 @@ class Run():
         self.doorside_space_m = doorside_space_m
         self.doorside_space_r = doorside_space_r
 
+    def __setattr__(self, name, value):
+        """Set an attribute, clearing the cache of derived values."""
+        super().__setattr__(name, value)
+        if name not in ('_cache', '_cache_stats'):
+            self._cache.clear()
+
+    def __delattr__(self, name):
+        """Delete an attribute, clearing the cache of derived values."""
+        super().__delattr__(name)
+        self._cache.clear()
+
+    def invalidate(self):
+        """Clear the cache of derived values, so they will be recomputed."""
+        self._cache.clear()
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Construct a Run from a :class:`RunSpec <RunSpec>`."""
+        return cls(spec.fullwidth, spec.height, spec.depth, spec.fillers,
+                   spec.prim_material, spec.prim_thickness,
+                   spec.door_material, spec.door_thickness,
+                   list(spec.btmpanel_thicknesses), spec.has_legs,
+                   spec.topnailer_depth, spec.doortop_space,
+                   spec.doorside_space_l, spec.doorside_space_m,
+                   spec.doorside_space_r)
+
+    @property
+    def spec(self):
+        """Return the current specification of this run as a RunSpec."""
+        return RunSpec(self._fullwidth, self._height, self._depth, self.fillers,
+                       self.prim_material, self.prim_thickness,
+                       self.door_material, self.door_thickness,
+                       tuple(self.btmpanel_thicknesses), self._has_legs,
+                       self.topnailer_depth, self.doortop_space,
+                       self.doorside_space_l, self.doorside_space_m,
+                       self.doorside_space_r)
+
+    @property
+    def result(self):
+        """Return all the computed dimensions of this run as a RunResult."""
+        return RunResult._make(getattr(self, field)
+                               for field in RunResult._fields)
+
+    def cache_info(self):
+        """Return a CacheInfo with the statistics of the derived-value cache.
+
+        The number of hits is the number of recomputations that were saved.
+        """
+        return CacheInfo(self._cache_stats['hits'], self._cache_stats['misses'],
+                         len(self._cache))
+
     @property
     def fullwidth(self):
         """Return the total wall width as a float for this run of cabinets."""
@@ -263,6 +443,7 @@ class Run():
         del self._fullwidth
 
     @property
+    @_derived
     def num_cabinets(self):
         """Compute the number of cabinets needed for the given wall width.
 
@@ -282,31 +463,14 @@ class Run():
         return self._depth
 
     @property
+    @_derived
     def cabinet_width(self):
         """Retrun the width of each individual cabinet in this run as a float."""
-        if self.num_fillers == 0:
-            # With no fillers, we have no choice about the cabinet width.
-            width = self._fullwidth / self.num_cabinets
-        else:
-            # Restrict cabinet width to an easy-to-cut value, if possible,
-            # while keeping filler widths within allowable range. We start with
-            # integral values for the cabinet width.
-            width = self._fullwidth // self.num_cabinets
-            filler_w = ((self._fullwidth - width * self.num_cabinets)
-                        / self.num_fillers)
-            delta = 1.0
-            while filler_w < MIN_FILLER_WIDTH:
-                width -= delta
-                filler_w = ((self._fullwidth - width * self.num_cabinets)
-                            / self.num_fillers)
-            while filler_w > MAX_FILLER_WIDTH:
-                delta /= 2
-                width += delta
-                filler_w = ((self._fullwidth - width * self.num_cabinets)
-                            / self.num_fillers)
-        return width
+        return _solve_cabinet_width(self._fullwidth, self.num_cabinets,
+                                    self.num_fillers)
 
     @property
+    @_derived
     def extra_width(self):
         """Return the excess space in this run, beside the width of all cabinets.
 
@@ -316,20 +480,13 @@ class Run():
         return self._fullwidth - (self.num_cabinets * self.cabinet_width)
 
     @property
+    @_derived
     def num_fillers(self):
         """Return the number of fillers needed by this run of cabinets."""
-        if self.fillers is Ends.NEITHER:
-            result = 0
-        elif self.fillers is Ends.LEFT or self.fillers is Ends.RIGHT:
-            result = 1
-        elif self.fillers is Ends.BOTH:
-            result = 2
-        else:
-            raise TypeError('fillers is not one of Ends.neither, Ends.left,'
-                            'Ends.right, or Ends.both')
-        return result
+        return _num_fillers(self.fillers)
 
     @property
+    @_derived
     def filler_width(self):
         """Return the width of the filler(s) needed by this run of cabinets."""
         if self.fillers is Ends.NEITHER:
@@ -420,6 +577,7 @@ class Run():
         return self.btmpanels_per_cab * self.num_cabinets
 
     @property
+    @_derived
     def bottom_thickness(self):
         """Return the total thickness of the bottom of the cabinets in this run.
 
@@ -442,6 +600,7 @@ class Run():
             raise ValueError('bottom thickness is not between 1/2" and 2"')
 
     @property
+    @_derived
     def bottom_width(self):
         """Return the width of the bottom panels in this run."""
         width = self.cabinet_width - 2 * self.side_thickness
@@ -458,6 +617,7 @@ class Run():
         return 2 * self.num_cabinets
 
     @property
+    @_derived
     def side_depth(self):
         """Return the depth (front to back) of the side panels in this run.
 
@@ -503,6 +663,7 @@ class Run():
         return 2 * self.num_cabinets
 
     @property
+    @_derived
     def doorside_space(self):
         """Return the total space to the left, right and in between the doors."""
         space = (self.doorside_space_l + self.doorside_space_m
@@ -510,6 +671,7 @@ class Run():
         return space
 
     @property
+    @_derived
     def door_width(self):
         """Return the width of a single cabinet door.
 
@@ -525,4 +687,681 @@ class Run():
         height = self.cabinet_height - self.doortop_space
         return height
 
+    @property
+    @_derived
+    def parts(self):
+        """Return the table of all parts to be cut for this run.
+
+        The table is a read-only array of PART_DTYPE records, in the order
+        back, bottom, side, top nailer, filler and door. There is a bottom
+        record for each distinct thickness of stacked bottom panel, and a
+        filler record only if the run has fillers. The grain of each part
+        is as in PART_GRAIN if its material has a grain, and '' if not.
+        """
+        rows = [('Back', self.num_backpanels, self.back_width,
+                 self.back_height, self.back_thickness, self.prim_material,
+                 '')]
+        for thickness in dict.fromkeys(self.btmpanel_thicknesses):
+            qty = self.num_cabinets * self.btmpanel_thicknesses.count(thickness)
+            rows.append(('Bottom', qty, self.bottom_width, self.bottom_depth,
+                         thickness, self.prim_material, 'B'))
+        rows.append(('Side', self.num_sidepanels, self.side_depth,
+                     self.side_height, self.side_thickness, self.prim_material,
+                     'L'))
+        rows.append(('Nailer', self.num_topnailers, self.topnailer_width,
+                     self.topnailer_depth, self.topnailer_thickness,
+                     self.prim_material, ''))
+        if self.num_fillers > 0:
+            rows.append(('Filler', self.num_fillers, self.filler_width,
+                         self.filler_height, self.filler_thickness,
+                         self.prim_material, ''))
+        rows.append(('Door', self.num_doors, self.door_width, self.door_height,
+                     self.door_thickness, self.door_material, 'TBLR'))
+        rows = [row[:6] + (_grain(row[0], row[5]),) + row[6:] for row in rows]
+        result = np.array(rows, dtype=PART_DTYPE)
+        result.flags.writeable = False
+        return result
+
+
+class RunBatch():
+    """A RunBatch computes the specs for many runs of cabinets at once.
+
+    Every parameter may be a scalar or an array-like; they are broadcast against
+    one another, so a batch of wall widths can share a single height, depth,
+    etc. All the computed properties are NumPy arrays of the broadcast shape,
+    holding element by element exactly the value the same-named property of
+    :class:`Run <Run>` would return for those inputs. Where Run returns None
+    (the filler dimensions of a run without fillers), the array holds NaN.
+
+    :param fullwidth: The full wall widths of the runs
+    :type fullwidth: array_like of float
+    :param height: The distances from the toe kick to the top of the cabinets
+    :type height: array_like of float
+    :param depth: The distances from the front of the doors to the wall
+    :type depth: array_like of float
+    :param fillers: The end(s) of each run that will have filler panels, as
+        Ends members or their values
+    :type fillers: Ends or array_like of Ends or int, optional
+    :param prim_thickness: The thickness of most panels in each run
+    :type prim_thickness: array_like of float, optional
+    :param door_thickness: The thickness of the door material of each run
+    :type door_thickness: array_like of float, optional
+    :param bottom_thickness: The total bottom thickness of each run, defaults to
+        `prim_thickness`
+    :type bottom_thickness: array_like of float, optional
+    :param btmpanels_per_cab: The number of (stacked) bottom panels per cabinet
+    :type btmpanels_per_cab: array_like of int, optional
+    :param topnailer_depth: The depth, front to back, of the top nailers
+    :type topnailer_depth: array_like of float, optional
+    :param doortop_space: The distance from the top of door to the top of cabinet
+    :type doortop_space: array_like of float, optional
+    :param doorside_space_l: The distance from left edge of cabinet to the left door
+    :type doorside_space_l: array_like of float, optional
+    :param doorside_space_m: The distance between the two doors
+    :type doorside_space_m: array_like of float, optional
+    :param doorside_space_r: The distance from the right edge of the cabinet to
+        the right door
+    :type doorside_space_r: array_like of float, optional
+    :param num_cabinets: The number of cabinets in each run, defaults to the
+        smallest number that does not exceed the maximum cabinet width, as Run
+        always uses
+    :type num_cabinets: array_like of int, optional
+
+    The number of cabinets and the cabinet width are solved for every run in a
+    single vectorized pass when the batch is constructed, with the same
+    closed-form solution Run uses; all other properties are cheap array
+    expressions of those.
+    """
+
+    def __init__(self, fullwidth, height, depth, fillers=Ends.NEITHER,
+                 prim_thickness=MATL_THICKNESSES[MATERIALS[PRIM_MAT_DEFAULT]][0],
+                 door_thickness=MATL_THICKNESSES[MATERIALS[DOOR_MAT_DEFAULT]][0],
+                 bottom_thickness=None,
+                 btmpanels_per_cab=1,
+                 topnailer_depth=4,
+                 doortop_space=0.5, doorside_space_l=0.125,
+                 doorside_space_m=0.125, doorside_space_r=0.125,
+                 num_cabinets=None):
+        """Construct a RunBatch object."""
+        if isinstance(fillers, Ends):
+            num_fillers = _num_fillers(fillers)
+        else:
+            fillers = np.asarray(fillers)
+            if fillers.dtype == object:
+                num_fillers = [_num_fillers(ends) for ends in fillers]
+            else:
+                # The values of Ends members; look them up all at once.
+                table = np.zeros(max(e.value for e in Ends) + 1, dtype=int)
+                for ends in Ends:
+                    table[ends.value] = _num_fillers(ends)
+                num_fillers = table[fillers]
+        if bottom_thickness is None:
+            bottom_thickness = prim_thickness
+        floats = [np.asarray(arr, dtype=float) for arr in (
+            fullwidth, height, depth, prim_thickness, door_thickness,
+            bottom_thickness, topnailer_depth, doortop_space, doorside_space_l,
+            doorside_space_m, doorside_space_r)]
+        shape = np.broadcast_shapes(*(arr.shape for arr in floats),
+                                    np.shape(num_fillers),
+                                    np.shape(btmpanels_per_cab),
+                                    np.shape(num_cabinets))
+        (self.fullwidth, self.cabinet_height, self.cabinet_depth,
+         self.prim_thickness, self.door_thickness, self.bottom_thickness,
+         self.topnailer_depth, self.doortop_space, self.doorside_space_l,
+         self.doorside_space_m, self.doorside_space_r) = (
+             np.broadcast_to(arr, shape) for arr in floats)
+        self.num_fillers = np.broadcast_to(np.asarray(num_fillers, dtype=int),
+                                           shape)
+        self.btmpanels_per_cab = np.broadcast_to(
+            np.asarray(btmpanels_per_cab, dtype=int), shape)
+        if num_cabinets is None:
+            self.num_cabinets = np.ceil(
+                self.fullwidth / MAX_CABINET_WIDTH).astype(int)
+        else:
+            self.num_cabinets = np.broadcast_to(
+                np.asarray(num_cabinets, dtype=int), shape)
+        self.cabinet_width = _batch_cabinet_width(
+            self.fullwidth, self.num_cabinets, self.num_fillers)
+
+    @classmethod
+    def from_runs(cls, runs):
+        """Construct a RunBatch holding the specs of the given Run objects."""
+        runs = list(runs)
+        return cls([run.fullwidth for run in runs],
+                   [run.cabinet_height for run in runs],
+                   [run.cabinet_depth for run in runs],
+                   fillers=[run.fillers for run in runs],
+                   prim_thickness=[run.prim_thickness for run in runs],
+                   door_thickness=[run.door_thickness for run in runs],
+                   bottom_thickness=[run.bottom_thickness for run in runs],
+                   btmpanels_per_cab=[run.btmpanels_per_cab for run in runs],
+                   topnailer_depth=[run.topnailer_depth for run in runs],
+                   doortop_space=[run.doortop_space for run in runs],
+                   doorside_space_l=[run.doorside_space_l for run in runs],
+                   doorside_space_m=[run.doorside_space_m for run in runs],
+                   doorside_space_r=[run.doorside_space_r for run in runs])
+
+    def __len__(self):
+        """Return the number of runs in the (one-dimensional) batch."""
+        return len(self.fullwidth)
+
+    @property
+    def extra_width(self):
+        """Return the excess space in each run, beside the width of all cabinets."""
+        return self.fullwidth - (self.num_cabinets * self.cabinet_width)
+
+    @property
+    def filler_width(self):
+        """Return the width of the filler(s) of each run, NaN if it has none."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            width = self.extra_width / self.num_fillers
+        return np.where(self.num_fillers > 0, width, np.nan)
+
+    @property
+    def filler_height(self):
+        """Return the height of the filler(s) of each run, NaN if it has none."""
+        return np.where(self.num_fillers > 0, self.cabinet_height, np.nan)
+
+    @property
+    def filler_thickness(self):
+        """Return the thickness of the filler(s) of each run, NaN if it has none."""
+        return np.where(self.num_fillers > 0, self.prim_thickness, np.nan)
+
+    @property
+    def num_backpanels(self):
+        """Return the number of back panels needed for each run."""
+        return self.num_cabinets
+
+    @property
+    def back_width(self):
+        """Return the width of a full back panel of each run."""
+        return self.cabinet_width
+
+    @property
+    def back_height(self):
+        """Return the height of a full back panel of each run."""
+        return self.cabinet_height
+
+    @property
+    def back_thickness(self):
+        """Return the thickness of the back panels of each run."""
+        return self.prim_thickness
+
+    @property
+    def num_bottompanels(self):
+        """Return the number of bottom panels needed for each run."""
+        return self.btmpanels_per_cab * self.num_cabinets
+
+    @property
+    def bottom_width(self):
+        """Return the width of the bottom panels of each run."""
+        return self.cabinet_width - 2 * self.side_thickness
+
+    @property
+    def bottom_depth(self):
+        """Return the depth (front to back) of the bottom panels of each run."""
+        return self.side_depth
+
+    @property
+    def num_sidepanels(self):
+        """Return the number of side panels needed for each run."""
+        return 2 * self.num_cabinets
+
+    @property
+    def side_depth(self):
+        """Return the depth (front to back) of the side panels of each run."""
+        return (self.cabinet_depth - (self.door_thickness + DOOR_HINGE_GAP)
+                - self.back_thickness)
+
+    @property
+    def side_height(self):
+        """Return the height of the side panels of each run."""
+        return self.cabinet_height
+
+    @property
+    def side_thickness(self):
+        """Return the thickness of the side panels of each run."""
+        return self.prim_thickness
+
+    @property
+    def num_topnailers(self):
+        """Return the total number of top nailers needed for each run."""
+        return 2 * self.num_cabinets
+
+    @property
+    def topnailer_width(self):
+        """Return the width of the top nailers of each run."""
+        return self.bottom_width
+
+    @property
+    def topnailer_thickness(self):
+        """Return the thickness of the top nailers of each run."""
+        return self.prim_thickness
+
+    @property
+    def num_doors(self):
+        """Return the total number of doors needed for each run."""
+        return 2 * self.num_cabinets
+
+    @property
+    def doorside_space(self):
+        """Return the total space to the left, right and in between the doors."""
+        return (self.doorside_space_l + self.doorside_space_m
+                + self.doorside_space_r)
+
+    @property
+    def door_width(self):
+        """Return the width of a single cabinet door of each run."""
+        return (self.cabinet_width - self.doorside_space) / 2
+
+    @property
+    def door_height(self):
+        """Return the height of the cabinet doors of each run."""
+        return self.cabinet_height - self.doortop_space
+
+
+SweepCandidate = namedtuple('SweepCandidate', [
+    'num_cabinets', 'fillers', 'cabinet_width', 'filler_width', 'filler_waste',
+    'part_count', 'distinct_sizes', 'score'])
+SweepCandidate.__doc__ = """A feasible configuration of a run, as ranked by sweep().
+
+The filler_width is None when there are no fillers, and filler_waste is the
+total width of all the fillers."""
+
+
+def sweep(fullwidth, height, depth, weights=SWEEP_WEIGHTS, **kwargs):
+    """Return every feasible configuration of a run of cabinets, best first.
+
+    Every number of cabinets from the fewest that fit the wall (as Run uses)
+    up to the most that keep them at least MIN_CABINET_WIDTH wide is tried with
+    every choice of fillers. A configuration is feasible if its cabinets are no
+    wider than MAX_CABINET_WIDTH and its fillers, if any, are within the
+    allowed range. Each is scored by its filler waste, its total number of
+    parts and its number of distinct part sizes, weighted by `weights'.
+
+    The remaining keyword arguments are passed on to RunBatch.
+
+    :return: The feasible configurations, in ascending order of score
+    :rtype: [SweepCandidate]
+    """
+    result = []
+    for cand in sweep_batch([fullwidth], height, depth, weights, **kwargs):
+        has_fillers = cand['fillers'] != Ends.NEITHER.value
+        result.append(SweepCandidate(
+            int(cand['num_cabinets']), Ends(cand['fillers']),
+            float(cand['cabinet_width']),
+            float(cand['filler_width']) if has_fillers else None,
+            float(cand['filler_waste']), int(cand['part_count']),
+            int(cand['distinct_sizes']), float(cand['score'])))
+    return result
+
+
+def sweep_batch(fullwidths, height, depth, weights=SWEEP_WEIGHTS, **kwargs):
+    """Return the ranked feasible configurations for many wall widths at once.
+
+    This is the bulk form of sweep(). All the candidates for all the walls are
+    evaluated together in a single RunBatch.
+
+    :return: A SWEEP_DTYPE array of the feasible configurations, grouped by wall
+        in the order given, and within each wall, ranked from best (rank 0)
+    :rtype: numpy.ndarray
+    """
+    fullwidths = np.asarray(fullwidths, dtype=float).ravel()
+    fewest = np.ceil(fullwidths / MAX_CABINET_WIDTH).astype(int)
+    most = np.maximum(fewest, np.floor(fullwidths / MIN_CABINET_WIDTH)
+                      .astype(int))
+    # Lay out one lane for each (wall, number of cabinets, fillers) candidate.
+    counts = most - fewest + 1
+    wall = np.repeat(np.arange(len(fullwidths)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    num_cabinets = np.repeat(fewest, counts) + np.arange(len(wall)) - starts
+    ends = np.array([e.value for e in Ends])
+    wall = np.repeat(wall, len(ends))
+    num_cabinets = np.repeat(num_cabinets, len(ends))
+    fillers = np.tile(ends, len(wall) // len(ends))
+    batch = RunBatch(fullwidths[wall], height, depth,
+                     fillers=fillers,
+                     num_cabinets=num_cabinets, **kwargs)
+
+    has_fillers = batch.num_fillers > 0
+    with np.errstate(invalid='ignore'):
+        feasible = ((batch.cabinet_width <= MAX_CABINET_WIDTH)
+                    & (batch.cabinet_width > 0)
+                    & (batch.door_width > 0)
+                    & (batch.bottom_width > 0)
+                    & (~has_fillers
+                       | ((batch.filler_width >= MIN_FILLER_WIDTH)
+                          & (batch.filler_width <= MAX_FILLER_WIDTH))))
+    filler_waste = np.where(has_fillers, batch.extra_width, 0.0)
+    part_count = (batch.num_backpanels + batch.num_bottompanels
+                  + batch.num_sidepanels + batch.num_topnailers
+                  + batch.num_doors + batch.num_fillers)
+    distinct_sizes = _batch_distinct_sizes(batch)
+    waste_wt, parts_wt, sizes_wt = weights
+    score = (waste_wt * filler_waste + parts_wt * part_count
+             + sizes_wt * distinct_sizes)
+
+    # Rank the feasible candidates within each wall; ties go to fewer cabinets.
+    keep = np.flatnonzero(feasible)
+    order = keep[np.lexsort((fillers[keep], num_cabinets[keep], score[keep],
+                             wall[keep]))]
+    result = np.empty(len(order), dtype=SWEEP_DTYPE)
+    result['wall'] = wall[order]
+    result['fullwidth'] = batch.fullwidth[order]
+    result['num_cabinets'] = num_cabinets[order]
+    result['fillers'] = fillers[order]
+    result['cabinet_width'] = batch.cabinet_width[order]
+    result['filler_width'] = batch.filler_width[order]
+    result['filler_waste'] = filler_waste[order]
+    result['part_count'] = part_count[order]
+    result['distinct_sizes'] = distinct_sizes[order]
+    result['score'] = score[order]
+    first = np.searchsorted(result['wall'], result['wall'])
+    result['rank'] = np.arange(len(result)) - first
+    return result
+
+
+Partition = namedtuple('Partition', [
+    'widths', 'fillers', 'filler_width', 'filler_waste', 'part_count',
+    'distinct_sizes', 'score'])
+Partition.__doc__ = """A run split into cabinets of mixed widths by partition_run().
+
+The widths are those of the individual cabinets, widest first. As with
+SweepCandidate, filler_width is None when there are no fillers, and
+filler_waste is the total width of all the fillers."""
+
+
+def partition_run(fullwidth, fillers=Ends.NEITHER, catalog=CATALOG_WIDTHS,
+                  max_distinct=3, btmpanels_per_cab=1, weights=SWEEP_WEIGHTS,
+                  btmpanel_thicknesses=None):
+    """Split a run into cabinets of mixed widths, taken from a catalog.
+
+    Unlike Run, which makes every cabinet the same width, this chooses any
+    number of cabinets of each catalog width, using at most `max_distinct'
+    different widths, so that the fillers, if any, are within the allowed
+    range. With no fillers the cabinets must fill the wall exactly. The choice
+    minimizes the same score as sweep(): filler waste, number of parts and
+    number of distinct part sizes, weighted by `weights'. Each cabinet width
+    has its own back, top nailer and door sizes, and a bottom size for each
+    different thickness of its stacked bottom panels, while all cabinets share
+    the side panel size. The parts are counted as in the parts table of a Run
+    (see Run.parts), so a run with stacked bottoms of mixed thicknesses has
+    more distinct sizes than one whose bottoms are all alike.
+
+    The choice is made by dynamic programming over the catalog widths, on the
+    coarsest grid that every catalog width falls on, and takes about a
+    millisecond for a 40 foot run.
+
+    :param fullwidth: The width of the wall, in inches
+    :type fullwidth: float
+    :param fillers: The ends of the run that get fillers
+    :type fillers: Ends
+    :param catalog: The cabinet widths to choose from, in whole sixteenths of
+        an inch and no wider than MAX_CABINET_WIDTH
+    :type catalog: Sequence[float]
+    :param max_distinct: The most distinct cabinet widths to use
+    :type max_distinct: int
+    :param btmpanels_per_cab: The number of stacked bottom panels per cabinet,
+        all of one thickness
+    :type btmpanels_per_cab: int
+    :param btmpanel_thicknesses: The thicknesses of the stacked bottom panels
+        of each cabinet, as for Run, in place of btmpanels_per_cab
+    :type btmpanel_thicknesses: Sequence[float], optional
+    :return: The best partition of the run
+    :rtype: Partition
+    :raises ValueError: If no combination of catalog widths fits the wall
+    """
+    num_fillers = _num_fillers(fillers)
+    if max_distinct < 1:
+        raise ValueError('max_distinct must be at least 1')
+    if btmpanel_thicknesses is None:
+        btm_sizes = 1
+    else:
+        btmpanels_per_cab = len(btmpanel_thicknesses)
+        btm_sizes = len(set(btmpanel_thicknesses))
+    widths16 = sorted(set(_catalog_sixteenths(catalog)))
+    unit = math.gcd(*widths16)
+    widths = [w // unit for w in widths16]
+    # The range of total cabinet widths, in grid units, that the fillers allow.
+    lo = max(1, math.ceil((fullwidth - num_fillers * MAX_FILLER_WIDTH) * 16
+                          / unit - _GRID_TOL))
+    hi = math.floor((fullwidth - num_fillers * MIN_FILLER_WIDTH) * 16 / unit
+                    + _GRID_TOL)
+    if hi < lo:
+        raise ValueError('no cabinets of the catalog widths fit the wall')
+    layers = _partition_layers(widths, max_distinct, hi + 1)
+
+    # Score every (number of distinct widths, total width) that was reached.
+    counts = layers[-1][1:, lo:]
+    distinct = np.arange(1, max_distinct + 1)[:, np.newaxis]
+    filler_waste = np.maximum(fullwidth - np.arange(lo, hi + 1) * unit / 16,
+                              0.0)
+    part_count = counts * (btmpanels_per_cab + 6) + num_fillers
+    distinct_sizes = 1 + (3 + btm_sizes) * distinct + (num_fillers > 0)
+    waste_wt, parts_wt, sizes_wt = weights
+    score = (waste_wt * filler_waste + parts_wt * part_count
+             + sizes_wt * distinct_sizes)
+    if not np.isfinite(score).any():
+        raise ValueError('no cabinets of the catalog widths fit the wall')
+    # Break ties in favour of fewer distinct widths, then fewer cabinets.
+    order = np.lexsort((counts.ravel(),
+                        np.broadcast_to(distinct, score.shape).ravel(),
+                        score.ravel()))
+    d, i = np.unravel_index(order[0], score.shape)
+    chosen = _partition_backtrack(layers, widths, d + 1, lo + i)
+    result = Partition(
+        tuple(sorted((w * unit / 16 for w in chosen), reverse=True)),
+        fillers,
+        float(filler_waste[i]) / num_fillers if num_fillers else None,
+        float(filler_waste[i]), int(part_count[d, i]),
+        int(distinct_sizes[d, 0]), float(score[d, i]))
+    return result
+
+
+# Implementation.    (Definitions below are non-public)
+
+
+def _grain(name, material):
+    """Return the grain of a part in the parts table, as in PART_DTYPE."""
+    if MATL_GRAIN.get(material, True):
+        result = PART_GRAIN[name]
+    else:
+        result = ''
+    return result
+
+
+def _num_fillers(fillers):
+    """Return the number of fillers used for the given Ends value."""
+    if fillers is Ends.NEITHER:
+        result = 0
+    elif fillers is Ends.LEFT or fillers is Ends.RIGHT:
+        result = 1
+    elif fillers is Ends.BOTH:
+        result = 2
+    else:
+        raise TypeError('fillers is not one of Ends.neither, Ends.left,'
+                        'Ends.right, or Ends.both')
+    return result
+
+
+def _batch_distinct_sizes(batch):
+    """Return the number of distinct part sizes of each run in a RunBatch.
+
+    Parts are the same size if they have the same thickness and the same two
+    face dimensions, either way around.
+    """
+    parts = [
+        (batch.back_width, batch.back_height, batch.back_thickness),
+        (batch.bottom_width, batch.bottom_depth,
+         batch.bottom_thickness / batch.btmpanels_per_cab),
+        (batch.side_depth, batch.side_height, batch.side_thickness),
+        (batch.topnailer_width, batch.topnailer_depth,
+         batch.topnailer_thickness),
+        (batch.door_width, batch.door_height, batch.door_thickness),
+        (batch.filler_width, batch.filler_height, batch.filler_thickness),
+    ]
+    sizes = [(np.minimum(w, h), np.maximum(w, h), t) for w, h, t in parts]
+    # Fillers are the only part a run may not have.
+    present = [np.ones(batch.fullwidth.shape, dtype=bool)] * (len(parts) - 1)
+    present.append(batch.num_fillers > 0)
+    result = np.zeros(batch.fullwidth.shape, dtype=int)
+    for i, size in enumerate(sizes):
+        is_new = present[i].copy()
+        for j in range(i):
+            is_new &= ~(present[j] & (sizes[j][0] == size[0])
+                        & (sizes[j][1] == size[1]) & (sizes[j][2] == size[2]))
+        result += is_new
+    return result
+
+
+def _solve_cabinet_width(fullwidth, num_cabinets, num_fillers):
+    """Return the width of each cabinet in a run, in constant time.
+
+    With fillers, we restrict the cabinet width to an easy-to-cut value, if
+    possible, while keeping filler widths within the allowable range. This
+    gives exactly the widths of the original search (_search_cabinet_width),
+    but rather than stepping the width until the fillers fit, it solves for the
+    number of steps directly.
+    """
+    if num_fillers == 0:
+        # With no fillers, we have no choice about the cabinet width.
+        return fullwidth / num_cabinets
+    # The search starts with an integral width and steps it down 1" at a time
+    # while the fillers are too narrow. Each step widens the fillers by
+    # num_cabinets / num_fillers, so solve for the number of steps.
+    width = fullwidth // num_cabinets
+    filler_w = (fullwidth - width * num_cabinets) / num_fillers
+    if filler_w < MIN_FILLER_WIDTH:
+        width -= math.ceil((MIN_FILLER_WIDTH - filler_w) * num_fillers
+                           / num_cabinets)
+        filler_w = (fullwidth - width * num_cabinets) / num_fillers
+    # Then, while the fillers are too wide, it adds 1/2", 1/4", 1/8", ... to
+    # the width; after n halvings it has added 1 - 1/2**n in all. The fillers
+    # fit once 1/2**n <= ratio, below, which first holds for n = 1 - e, where
+    # e is the binary exponent of ratio as returned by frexp().
+    if filler_w > MAX_FILLER_WIDTH:
+        ratio = 1 - (filler_w - MAX_FILLER_WIDTH) * num_fillers / num_cabinets
+        width += 1 - 0.5 ** (1 - math.frexp(ratio)[1])
+    return width
+
+
+def _search_cabinet_width(fullwidth, num_cabinets, num_fillers):
+    """Return the width of each cabinet in a run, searching for it stepwise.
+
+    This is the original algorithm behind Run.cabinet_width. It is kept as the
+    reference that _solve_cabinet_width must agree with, for the tests and the
+    benchmarks.
+    """
+    if num_fillers == 0:
+        width = fullwidth / num_cabinets
+    else:
+        width = fullwidth // num_cabinets
+        filler_w = (fullwidth - width * num_cabinets) / num_fillers
+        delta = 1.0
+        while filler_w < MIN_FILLER_WIDTH:
+            width -= delta
+            filler_w = (fullwidth - width * num_cabinets) / num_fillers
+        while filler_w > MAX_FILLER_WIDTH:
+            delta /= 2
+            width += delta
+            filler_w = (fullwidth - width * num_cabinets) / num_fillers
+    return width
+
+
+def _batch_cabinet_width(fullwidth, num_cabinets, num_fillers):
+    """Return an array of cabinet widths, given arrays of run parameters.
+
+    This is the vectorized counterpart of _solve_cabinet_width, and solves for
+    the widths of all the runs in the same way, in a fixed number of passes.
+    """
+    has_fillers = num_fillers > 0
+    # Divide by 1 where there are no fillers, so those lanes stay finite.
+    divisor = np.where(has_fillers, num_fillers, 1)
+    width = fullwidth // num_cabinets
+    filler_w = (fullwidth - width * num_cabinets) / divisor
+    too_narrow = filler_w < MIN_FILLER_WIDTH
+    width = np.where(
+        too_narrow,
+        width - np.ceil((MIN_FILLER_WIDTH - filler_w) * divisor / num_cabinets),
+        width)
+    filler_w = (fullwidth - width * num_cabinets) / divisor
+    too_wide = filler_w > MAX_FILLER_WIDTH
+    ratio = np.where(
+        too_wide,
+        1 - (filler_w - MAX_FILLER_WIDTH) * divisor / num_cabinets,
+        1.0)
+    width = np.where(too_wide, width + (1 - 0.5 ** (1 - np.frexp(ratio)[1])),
+                     width)
+    return np.where(has_fillers, width, fullwidth / num_cabinets)
+
+
+# Catalog and wall widths are put on the partition grid with this much
+# tolerance, in grid units, for floating point error.
+_GRID_TOL = 1e-9
+
+
+def _catalog_sixteenths(catalog):
+    """Return the catalog widths in whole sixteenths of an inch."""
+    result = []
+    for width in catalog:
+        width16 = round(width * 16)
+        if abs(width * 16 - width16) > _GRID_TOL or width16 <= 0:
+            raise ValueError('catalog widths must be positive multiples of'
+                             ' 1/16": ' + repr(width))
+        if width > MAX_CABINET_WIDTH:
+            raise ValueError('catalog width exceeds MAX_CABINET_WIDTH: '
+                             + repr(width))
+        result.append(width16)
+    if not result:
+        raise ValueError('the catalog of widths is empty')
+    return result
+
+
+def _partition_layers(widths, max_distinct, size):
+    """Return the dynamic programming tables for partition_run().
+
+    Layer i is an array of shape (max_distinct + 1, size) holding, for each
+    number d of distinct widths among the first i catalog widths and each total
+    width, the fewest cabinets that add up to it exactly, or infinity where
+    none do. All widths are in grid units.
+    """
+    table = np.full((max_distinct + 1, size), np.inf)
+    table[0, 0] = 0
+    result = [table]
+    for width in widths:
+        rows = -(-size // width)
+        step = np.arange(rows)[:, np.newaxis]
+        prev = np.full((max_distinct + 1, rows * width), np.inf)
+        prev[:, :size] = table
+        prev = prev.reshape(max_distinct + 1, rows, width)
+        # Adding k >= 1 cabinets of this width moves k rows down the same
+        # column, so the cheapest way to reach a row is a running minimum.
+        best = np.minimum.accumulate(prev[:-1] - step, axis=1)
+        used = np.full(prev.shape, np.inf)
+        used[1:, 1:] = best[:, :-1] + step[1:]
+        table = np.minimum(table,
+                           used.reshape(max_distinct + 1, -1)[:, :size])
+        result.append(table)
+    return result
+
+
+def _partition_backtrack(layers, widths, distinct, total):
+    """Return the cabinet widths behind an entry of the final layer."""
+    result = []
+    cost = layers[-1][distinct, total]
+    for i in range(len(widths), 0, -1):
+        if distinct == 0:
+            break
+        if layers[i - 1][distinct, total] == cost:
+            continue
+        width = widths[i - 1]
+        k = 1
+        while layers[i - 1][distinct - 1, total - k * width] + k != cost:
+            k += 1
+        result.extend([width] * k)
+        distinct -= 1
+        total -= k * width
+        cost -= k
+    return result
+
 # cabinet.py ends here
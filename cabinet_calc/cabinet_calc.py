@@ -46,6 +46,11 @@ from cabinet_calc.cabinet import (
 from cabinet_calc import gui
 from cabinet_calc import job
 from cabinet_calc import cutlist
+from cabinet_calc import nesting
+from cabinet_calc.dimension_strs import (
+    PRECISIONS, PRECISION_DEFAULT, parse_dimstr
+    )
+from cabinet_calc.layout_cache import LayoutCache
 
 
 def start_gui():
@@ -67,20 +72,29 @@ def start_cli(args):
                   has_legs=args.legs)
     # Create a job object that holds the name, a single cabinet run object,
     # and an optional description for the job.
+    fmt = PRECISIONS[args.precision]
     if args.desc is not None:
-        j = job.Job(args.name, cab_run, args.desc)
+        j = job.Job(args.name, cab_run, args.desc, formatter=fmt)
     else:
-        j = job.Job(args.name, cab_run)
+        j = job.Job(args.name, cab_run, formatter=fmt)
 
     # Output the job specification to the terminal, ensuring lines are no
     # longer than 65 chars.
     for line in j.specification:
         print(textwrap.fill(line, width=65))
 
+    # If requested, lay out the panels on stock sheets, unless the same parts
+    # have been laid out before, and output the layout too.
+    layout = None
+    if args.panel_layout:
+        layout = nesting.nest(j.parts, cache=LayoutCache())
+        for line in nesting.summary(layout, fmt):
+            print(textwrap.fill(line, width=65))
+
     # If requested, produce and save a cutlist pdf file.
     if args.cutlist is not None:
         # Generate a cutlist pdf and save in file given by args.cutlist
-        cutlist.save_cutlist(args.cutlist, j)
+        cutlist.save_cutlist(args.cutlist, j, layout)
 
 
 def get_parser():
@@ -94,19 +108,22 @@ def get_parser():
             When running the command line version, the following arguments are
             REQUIRED:  -w WIDTH -ht HT -d DEPTH -n NAME
             Otherwise, there is not enough information to compute the job.
+
+            Dimensions and thicknesses are in inches, either decimal or
+            fractional, e.g. 34.3125, "34 5/16" or 1-1/2.
             '''))
     parser.add_argument('-w', '--fullwidth',
                         help='full bank width for all cabinets combined',
                         metavar='WIDTH',
-                        type=float)
+                        type=parse_dimstr)
     parser.add_argument('-ht', '--height',
                         help="height from toe kick to top of cabinet",
                         metavar='HT',
-                        type=float)
+                        type=parse_dimstr)
     parser.add_argument('-d', '--depth',
                         help="depth from front to back including door",
                         metavar='DEPTH',
-                        type=float)
+                        type=parse_dimstr)
     parser.add_argument('-n', "--name",
                         help="a unique identifying name for the job",
                         metavar='NAME',
@@ -128,7 +145,7 @@ def get_parser():
     parser.add_argument("-pt", "--prim_thick",
                         help="primary thickness",
                         metavar='TH',
-                        type=float)
+                        type=parse_dimstr)
     parser.add_argument("-dm", "--door_matl",
                         help="door material name",
                         metavar='MTL',
@@ -137,7 +154,7 @@ def get_parser():
     parser.add_argument("-dt", "--door_thick",
                         help="door thickness",
                         metavar='TH',
-                        type=float)
+                        type=parse_dimstr)
     parser.add_argument("-l", "--legs",
                         help="add cabinet legs",
                         action="store_true")
@@ -145,20 +162,29 @@ def get_parser():
                         help="bottom panel thicknesses",
                         metavar='TH',
                         nargs='+',
-                        type=float)
+                        type=parse_dimstr)
+    parser.add_argument("-p", "--panel_layout",
+                        help="lay out the panels on stock sheets",
+                        action="store_true")
+    parser.add_argument("-pr", "--precision",
+                        help="give dimensions to the nearest PREC, one of "
+                             + ", ".join(PRECISIONS),
+                        metavar='PREC',
+                        choices=list(PRECISIONS),
+                        default=PRECISION_DEFAULT)
     parser.add_argument("-c", "--cutlist",
                         help="generate cutlist & save in FN.pdf",
                         metavar='FN',
                         type=str)
     # parser.add_argument("-ctl", "--ctopleft",
     #                     help="countertop overhang left side",
-    #                     type=float)
+    #                     type=parse_dimstr)
     # parser.add_argument("-ctr", "--ctopright",
     #                     help="countertop overhang right side",
-    #                     type=float)
+    #                     type=parse_dimstr)
     # parser.add_argument("-ctf", "--ctopfront",
     #                     help="countertop overhang front side",
-    #                     type=float)
+    #                     type=parse_dimstr)
     return parser
 
 
@@ -23,7 +23,8 @@ This module provides all cutlist capabilities for Cabinet Calc.
 
 Its main interface is the function save_cutlist(fname, job), which accepts a
 filename and a Job object describing the cabinet job, and generates a PDF file
-containing the cutlist and saves it in the file _fname_.pdf.
+containing the cutlist and saves it in the file _fname_.pdf. Each run of
+cabinets in the job gets a page of its own.
 """
 
 
@@ -38,7 +39,7 @@ from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.platypus import (
     BaseDocTemplate, PageTemplate, Frame, Paragraph, Spacer, FrameBreak,
-    Table, XPreformatted
+    PageBreak, Table, XPreformatted
     )
 from reportlab.graphics.shapes import (
     Drawing, Line, Rect, String, Group
@@ -46,7 +47,8 @@ from reportlab.graphics.shapes import (
 from reportlab.pdfbase.pdfmetrics import stringWidth
 
 from cabinet_calc.cabinet import Ends, DOOR_HINGE_GAP, MATL_ABBREVS
-from cabinet_calc.dimension_strs import dimstr, thickness_str
+from cabinet_calc.dimension_strs import DEFAULT_FORMATTER
+from cabinet_calc import nesting
 from cabinet_calc.text import (
     normal_style, rt_style, title_style, wallwidth_style, heading_style,
     fixed_style
@@ -68,13 +70,11 @@ def landscape(pagesize):
 PAGE_WIDTH, PAGE_HT = landscape(letter)
 
 
-def all_equal(lst):
-    """Return True if all elements in the list lst are equal, False otherwise."""
-    return lst[1:] == lst[:-1]
+def save_cutlist(fname, job, layout=None):
+    """Generate a cutlist for the job in PDF format and save it in fname.pdf.
 
-
-def save_cutlist(fname, job):
-    """Generate a cutlist for the job in PDF format and save it in fname.pdf."""
+    If a panel layout of the job is given, it is added after the runs.
+    """
     doc = BaseDocTemplate(pdf_ify(fname),
                           pagesize=landscape(letter),
                           leftMargin=0.5 * inch,
@@ -94,7 +94,7 @@ def save_cutlist(fname, job):
                       onPage=all_pages)]
     )
     # Construct the cutlist content--i.e., the `elements' list of Flowables
-    elements = content(job)
+    elements = content(job, layout)
     # Fill out and layout the document. This saves the pdf file as well.
     doc.build(elements)
 
@@ -140,32 +140,82 @@ def all_pages(canvas, doc):
     canvas.restoreState()
 
 
-def content(job):
-    """Create a list of flowables with all the content for the cutlist."""
+def content(job, layout=None):
+    """Create a list of flowables with all the content for the cutlist.
+
+    Each run of the job gets a page of its own, and so does the panel layout,
+    if there is one.
+    """
+    result = []
+    for name in job.runs:
+        if result:
+            result.append(PageBreak())
+        result.extend(run_content(job, name))
+    if layout is not None:
+        result.append(PageBreak())
+        result.extend(layout_content(job, layout))
+    return result
+
+
+def run_content(job, name):
+    """Create a list of flowables with the cutlist content for the named run."""
+    cabs = job.runs[name]
+    info = job.run_info(name)
     result = []
-    result.append(hdr_table(job))
+    result.append(hdr_table(job, name))
     result.append(FrameBreak())
 
     result.append(Paragraph('Overview:', heading_style))
-    for line in job.summaryln:
+    for line in info.summaryln:
         result.append(Paragraph(line, normal_style))
     result.append(Spacer(1, 10))
-    for line in job.cabinfo:
+    for line in info.cabinfo:
         result.append(Paragraph(line, normal_style))
     result.append(Spacer(1, 10))
-    for line in job.materialinfo:
+    for line in info.materialinfo:
         result.append(Paragraph(line, normal_style))
     result.append(Spacer(1, 24))
-    result.append(isometric_view(job))
+    result.append(isometric_view(cabs, job.formatter))
     result.append(FrameBreak())
 
-    result.append(panels_table(job))
+    result.append(panels_table(cabs, job.formatter))
     result.append(Paragraph('Parts List:', heading_style))
-    for line in job.partslist:
+    for line in info.partslist:
         result.append(XPreformatted(line, fixed_style))
     return result
 
 
+def layout_content(job, layout):
+    """Create a list of flowables with the panel layout of the job."""
+    fmt = job.formatter
+    u = fmt.unit
+    result = []
+    result.append(Paragraph('Job Name: ' + job.name + ' &mdash; Panel Layout',
+                            title_style))
+    result.append(FrameBreak())
+    result.append(Paragraph(nesting.summary(layout, fmt)[0], heading_style))
+    for i, sheet in enumerate(layout.sheets):
+        result.append(Paragraph(
+            'Sheet {}:  {} {}  {} x {}  ({:.1%} used)'.format(
+                i + 1, fmt.thickness_str(sheet.thickness) + u, sheet.material,
+                fmt.dimstr(sheet.width) + u, fmt.dimstr(sheet.length) + u,
+                sheet.utilization),
+            heading_style))
+        data = [(p.piece.name,
+                 fmt.dimstr(p.piece.width) + u + ' x '
+                 + fmt.dimstr(p.piece.height) + u,
+                 'at ' + fmt.dimstr(p.x) + u + ', ' + fmt.dimstr(p.y) + u,
+                 'turned' if p.rotated else '',
+                 '' if p.piece.tag is None else str(p.piece.tag))
+                for p in sheet.placements]
+        result.append(Table(data, hAlign='LEFT', style=[
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1)
+        ]))
+    return result
+
+
 def finished_ends(fillers):
     if fillers is Ends.NEITHER:
         result = 'Both end panels finished.'
@@ -178,16 +228,21 @@ def finished_ends(fillers):
     return result
 
 
-def hdr_table(job):
-    """Return a table layout of the job header."""
+def hdr_table(job, name):
+    """Return a table layout of the job header, for the named run."""
+    cabs = job.runs[name]
     if job.description != '':
         desc = 'Description: ' + job.description
     else:
         desc = ''
+    title = 'Job Name: ' + job.name
+    if job.multirun:
+        title += ' &mdash; ' + name
     data = (
-        (Paragraph('Job Name: ' + job.name, title_style),
-         Paragraph(str(job.cabs.fullwidth) + '" Wide', wallwidth_style),
-         Paragraph(finished_ends(job.cabs.fillers), rt_style)
+        (Paragraph(title, title_style),
+         Paragraph(job.formatter.decimal_str(cabs.fullwidth)
+                   + job.formatter.unit + ' Wide', wallwidth_style),
+         Paragraph(finished_ends(cabs.fillers), rt_style)
          ),
         (Paragraph(desc, normal_style), '', '')
     )
@@ -215,8 +270,8 @@ def inches_to_pts(line):
     return tuple(coord * inch for coord in line)
 
 
-def isometric_view(job):
-    """Return a Drawing with an isometric view of a single cabinet."""
+def isometric_view(cabs, fmt=DEFAULT_FORMATTER):
+    """Return a Drawing with an isometric view of a single cabinet of the run."""
     # Determine the width and height required for the drawing. The distances
     # below are all in points, unless noted otherwise.
     top_margin = 10
@@ -234,11 +289,11 @@ def isometric_view(job):
     arrow_sep_horiz = arrow_sep_vert
     # The horizontal (or vertical, since they are equal) projection of the
     # angled cabinet depth lines -- in inches, unscaled.
-    iso45 = math.sin(math.radians(45)) * job.cabs.cabinet_depth / 2
+    iso45 = math.sin(math.radians(45)) * cabs.cabinet_depth / 2
     # Overall drawing width and height
-    d_width = ((job.cabs.cabinet_width + iso45) * inch * DEFAULT_ISO_SCALE
+    d_width = ((cabs.cabinet_width + iso45) * inch * DEFAULT_ISO_SCALE
                + arrow_sep + boundsln_len/2 + long_vdimtxt_margin)
-    d_ht = ((job.cabs.cabinet_height + iso45) * inch * DEFAULT_ISO_SCALE
+    d_ht = ((cabs.cabinet_height + iso45) * inch * DEFAULT_ISO_SCALE
             + arrow_sep_vert + half_boundsln_vert + top_margin)
 
     result = Drawing(d_width, d_ht)
@@ -246,7 +301,7 @@ def isometric_view(job):
 
     # The horizontal (or vertical, since they are equal) projection of the
     # angled topnailer depth lines -- in inches, unscaled.
-    isoNlr45 = job.cabs.topnailer_depth * math.sin(math.radians(45)) / 2
+    isoNlr45 = cabs.topnailer_depth * math.sin(math.radians(45)) / 2
 
     # Construct a list of the lines that make up the isometric view. Each line
     # is a tuple in (x1, y1, x2, y2) format, and all coordinates are in inches,
@@ -255,155 +310,155 @@ def isometric_view(job):
         # horizontal lines-----------------------------------------------------
 
         # horizontal bottom inner line
-        (job.cabs.side_thickness, job.cabs.bottom_thickness,
-         job.cabs.cabinet_width - job.cabs.side_thickness,
-         job.cabs.bottom_thickness),
+        (cabs.side_thickness, cabs.bottom_thickness,
+         cabs.cabinet_width - cabs.side_thickness,
+         cabs.bottom_thickness),
 
         # Front nailer - front edge bottom
-        (job.cabs.side_thickness,
-         job.cabs.cabinet_height - job.cabs.topnailer_thickness,
-         job.cabs.cabinet_width - job.cabs.side_thickness,
-         job.cabs.cabinet_height - job.cabs.topnailer_thickness),
+        (cabs.side_thickness,
+         cabs.cabinet_height - cabs.topnailer_thickness,
+         cabs.cabinet_width - cabs.side_thickness,
+         cabs.cabinet_height - cabs.topnailer_thickness),
 
         # Back panel top rear edge
-        (iso45, job.cabs.cabinet_height + iso45,
-         iso45 + job.cabs.cabinet_width, iso45 + job.cabs.cabinet_height),
+        (iso45, cabs.cabinet_height + iso45,
+         iso45 + cabs.cabinet_width, iso45 + cabs.cabinet_height),
 
         # Back panel top front edge
-        (iso45 - job.cabs.back_thickness * math.sin(math.radians(45)),
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)),
-         job.cabs.cabinet_width + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)),
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45))),
+        (iso45 - cabs.back_thickness * math.sin(math.radians(45)),
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)),
+         cabs.cabinet_width + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)),
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45))),
 
         # horizontal inside at bottom back
         (iso45, iso45,
-         job.cabs.cabinet_width - job.cabs.side_thickness, iso45),
+         cabs.cabinet_width - cabs.side_thickness, iso45),
 
         # Front nailer - top rear edge
-        (job.cabs.side_thickness + isoNlr45,
-         job.cabs.cabinet_height + isoNlr45,
-         job.cabs.cabinet_width - job.cabs.side_thickness + isoNlr45,
-         job.cabs.cabinet_height + isoNlr45),
+        (cabs.side_thickness + isoNlr45,
+         cabs.cabinet_height + isoNlr45,
+         cabs.cabinet_width - cabs.side_thickness + isoNlr45,
+         cabs.cabinet_height + isoNlr45),
 
         # Back nailer - top front edge
-        (job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
-         job.cabs.cabinet_width - job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45),
+        (cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
+         cabs.cabinet_width - cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45),
 
         # Back nailer - bottom front edge
-        (job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
-         - job.cabs.topnailer_thickness,
-         job.cabs.cabinet_width - job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
-         - job.cabs.topnailer_thickness,
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
-         - job.cabs.topnailer_thickness),
+        (cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
+         - cabs.topnailer_thickness,
+         cabs.cabinet_width - cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
+         - cabs.topnailer_thickness,
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
+         - cabs.topnailer_thickness),
 
         # Vertical lines-------------------------------------------------------
 
         # Vertical left inner line
-        (job.cabs.side_thickness, 0,
-         job.cabs.side_thickness, job.cabs.cabinet_height),
+        (cabs.side_thickness, 0,
+         cabs.side_thickness, cabs.cabinet_height),
 
         # Vertical right inner line
-        (job.cabs.cabinet_width - job.cabs.side_thickness, 0,
-         job.cabs.cabinet_width - job.cabs.side_thickness,
-         job.cabs.cabinet_height),
+        (cabs.cabinet_width - cabs.side_thickness, 0,
+         cabs.cabinet_width - cabs.side_thickness,
+         cabs.cabinet_height),
 
         # Vertical right back
-        (job.cabs.cabinet_width + iso45, iso45,
-         job.cabs.cabinet_width + iso45, job.cabs.cabinet_height + iso45),
+        (cabs.cabinet_width + iso45, iso45,
+         cabs.cabinet_width + iso45, cabs.cabinet_height + iso45),
 
         # Vertical right back inner
-        (job.cabs.cabinet_width + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)),
-         iso45 - job.cabs.back_thickness * math.sin(math.radians(45)),
-         job.cabs.cabinet_width + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)),
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45))),
+        (cabs.cabinet_width + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)),
+         iso45 - cabs.back_thickness * math.sin(math.radians(45)),
+         cabs.cabinet_width + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)),
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45))),
 
         # Back nailer - front left edge
-        (job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
-         - job.cabs.topnailer_thickness,
-         job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45),
+        (cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
+         - cabs.topnailer_thickness,
+         cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45,
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45),
 
         # Vertical inside line between nailers
-        (iso45, job.cabs.cabinet_height + isoNlr45,
-         iso45, job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
-         - job.cabs.topnailer_thickness),
+        (iso45, cabs.cabinet_height + isoNlr45,
+         iso45, cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)) - isoNlr45
+         - cabs.topnailer_thickness),
 
         # Vertical inside line at back of left side
         (iso45, iso45,
-         iso45, job.cabs.cabinet_height - job.cabs.topnailer_thickness),
+         iso45, cabs.cabinet_height - cabs.topnailer_thickness),
 
         # Angled lines---------------------------------------------------------
 
         # Iso bottom left inner angle
-        (job.cabs.side_thickness, job.cabs.bottom_thickness,
+        (cabs.side_thickness, cabs.bottom_thickness,
          iso45, iso45),
 
         # Iso upper left angle
-        (0, job.cabs.cabinet_height,
-         iso45, job.cabs.cabinet_height + iso45),
+        (0, cabs.cabinet_height,
+         iso45, cabs.cabinet_height + iso45),
 
         # Iso upper left angle inner
-        (job.cabs.side_thickness, job.cabs.cabinet_height,
-         job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)),
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45))),
+        (cabs.side_thickness, cabs.cabinet_height,
+         cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)),
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45))),
 
         # Iso upper right angle
-        (job.cabs.cabinet_width, job.cabs.cabinet_height,
-         job.cabs.cabinet_width + iso45, job.cabs.cabinet_height + iso45),
+        (cabs.cabinet_width, cabs.cabinet_height,
+         cabs.cabinet_width + iso45, cabs.cabinet_height + iso45),
 
         # Iso upper right angle inner
-        (job.cabs.cabinet_width - job.cabs.side_thickness,
-         job.cabs.cabinet_height,
-         job.cabs.cabinet_width - job.cabs.side_thickness + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45)),
-         job.cabs.cabinet_height + iso45
-         - job.cabs.back_thickness * math.sin(math.radians(45))),
+        (cabs.cabinet_width - cabs.side_thickness,
+         cabs.cabinet_height,
+         cabs.cabinet_width - cabs.side_thickness + iso45
+         - cabs.back_thickness * math.sin(math.radians(45)),
+         cabs.cabinet_height + iso45
+         - cabs.back_thickness * math.sin(math.radians(45))),
 
         # Iso lower right angle
-        (job.cabs.cabinet_width, 0,
-         job.cabs.cabinet_width + iso45, iso45),
+        (cabs.cabinet_width, 0,
+         cabs.cabinet_width + iso45, iso45),
 
         # Front cabinet rectangle lines (originally drawn as a Rect)
 
         # Horizontal bottom line
-        (0, 0, job.cabs.cabinet_width, 0),
+        (0, 0, cabs.cabinet_width, 0),
 
         # Horizontal top line
-        (0, job.cabs.cabinet_height,
-         job.cabs.cabinet_width, job.cabs.cabinet_height),
+        (0, cabs.cabinet_height,
+         cabs.cabinet_width, cabs.cabinet_height),
 
         # Vertical left line
-        (0, 0, 0, job.cabs.cabinet_height),
+        (0, 0, 0, cabs.cabinet_height),
 
         # Vertical right line
-        (job.cabs.cabinet_width, 0,
-         job.cabs.cabinet_width, job.cabs.cabinet_height)
+        (cabs.cabinet_width, 0,
+         cabs.cabinet_width, cabs.cabinet_height)
     ]
     isoLines_pts = [inches_to_pts(line) for line in isoLines]
     isoLines_scaled = [
@@ -414,36 +469,36 @@ def isometric_view(job):
         result.add(Line(*line, strokeWidth=0.5))
 
     # Height dimension arrow
-    vdim = job.cabs.cabinet_height
+    vdim = cabs.cabinet_height
     # (x,y) of back right bottom of cabinet, scaled
-    brb_x_scaled = (job.cabs.cabinet_width + iso45) * inch * DEFAULT_ISO_SCALE
+    brb_x_scaled = (cabs.cabinet_width + iso45) * inch * DEFAULT_ISO_SCALE
     brb_y_scaled = iso45 * inch * DEFAULT_ISO_SCALE
     arr = vdimarrow_iso_str(
         vdim, DEFAULT_ISO_SCALE,
         brb_x_scaled + arrow_sep_horiz, brb_y_scaled + arrow_sep_vert,
-        0.67, boundsln_len
+        0.67, boundsln_len, fmt
         )
     result.add(arr)
 
     # Width dimension arrow
-    hdim = job.cabs.cabinet_width
+    hdim = cabs.cabinet_width
     # (x,y) of back left top of cabinet, scaled
     blt_x_scaled = iso45 * inch * DEFAULT_ISO_SCALE
-    blt_y_scaled = (job.cabs.cabinet_height + iso45) * inch * DEFAULT_ISO_SCALE
+    blt_y_scaled = (cabs.cabinet_height + iso45) * inch * DEFAULT_ISO_SCALE
     arr = hdimarrow_iso_str(
         hdim, DEFAULT_ISO_SCALE,
         blt_x_scaled + arrow_sep_horiz, blt_y_scaled + arrow_sep_vert,
-        0.67, boundsln_len
+        0.67, boundsln_len, fmt
         )
     result.add(arr)
 
     # Depth dimension arrow
-    ddim = job.cabs.cabinet_depth - job.cabs.door_thickness - DOOR_HINGE_GAP
-    cabwidth_scaled = job.cabs.cabinet_width * inch * DEFAULT_ISO_SCALE
+    ddim = cabs.cabinet_depth - cabs.door_thickness - DOOR_HINGE_GAP
+    cabwidth_scaled = cabs.cabinet_width * inch * DEFAULT_ISO_SCALE
     arr = ddimarrow_iso_str(
         ddim, DEFAULT_ISO_SCALE,
         cabwidth_scaled + arrow_sep, 0,
-        0.67, boundsln_len
+        0.67, boundsln_len, fmt
         )
     result.add(arr)
     return result
@@ -479,10 +534,11 @@ def hdimarrow_iso(dim, scale, x, y, strwid, boundsln_len):
     return result
 
 
-def hdimarrow_iso_str(dim, scale, x, y, strwid, boundsln_len):
+def hdimarrow_iso_str(dim, scale, x, y, strwid, boundsln_len,
+                      fmt=DEFAULT_FORMATTER):
     """Return an isometric horiz dimension arrow with labeled measurement."""
     result = hdimarrow_iso(dim, scale, x, y, strwid, boundsln_len)
-    add_hdimstr(result, dim, scale, x, y)
+    add_hdimstr(result, dim, scale, x, y, fmt)
     return result
 
 
@@ -544,35 +600,36 @@ def hdimarrow_outside(dim, scale, x, y, strwid, boundsln_len):
     return result
 
 
-def hdimarrow_str(dim, scale, x, y, strwid, boundsln_len):
+def hdimarrow_str(dim, scale, x, y, strwid, boundsln_len,
+                  fmt=DEFAULT_FORMATTER):
     """Return a horizontal dimension arrow with labeled measurement."""
-    dimstr_width = get_dimstr_width(dim, scale, x, y)
+    dimstr_width = get_dimstr_width(dim, scale, x, y, fmt)
     dim_scaled = dim * inch * scale
     min_arrow_space = 5.5 * 2
     if dimstr_width <= dim_scaled - min_arrow_space:
         result = hdimarrow(dim, scale, x, y, strwid, boundsln_len)
-        add_hdimstr(result, dim, scale, x, y)
+        add_hdimstr(result, dim, scale, x, y, fmt)
     elif dimstr_width <= dim_scaled - 1 - 1:
         result = hdimarrow_outside(dim, scale, x, y, strwid, boundsln_len)
-        add_hdimstr(result, dim, scale, x, y)
+        add_hdimstr(result, dim, scale, x, y, fmt)
     else:
         result = hdimarrow_outside(dim, scale, x, y, strwid, boundsln_len)
-        add_hdimstr_beside(result, dim, x, y)
+        add_hdimstr_beside(result, dim, x, y, fmt)
     return result
 
 
-def get_dimstr_width(dim, scale, x, y):
+def get_dimstr_width(dim, scale, x, y, fmt=DEFAULT_FORMATTER):
     """Return the width of the rendered string for the given dimension."""
-    bounds_rect = get_dimstr_bounds(dim, scale, x, y)
+    bounds_rect = get_dimstr_bounds(dim, scale, x, y, fmt)
     result = bounds_rect[2] - bounds_rect[0]
     return result
 
 
-def get_dimstr_bounds(dim, scale, x, y):
+def get_dimstr_bounds(dim, scale, x, y, fmt=DEFAULT_FORMATTER):
     """Return the bounds rect of the string for the given dimension."""
     dim_scaled = dim * inch * scale
     dim_str = String(x + dim_scaled / 2, y - 3,
-                     dimstr(dim) + '"',
+                     fmt.dimstr(dim) + fmt.unit,
                      textAnchor='middle',
                      fontSize=9
                      )
@@ -580,11 +637,11 @@ def get_dimstr_bounds(dim, scale, x, y):
     return result
 
 
-def add_hdimstr(arrow, dim, scale, x, y):
+def add_hdimstr(arrow, dim, scale, x, y, fmt=DEFAULT_FORMATTER):
     """Add a measurement label to the given horizontal dimension arrow."""
     dim_scaled = dim * inch * scale
     dim_str = String(x + dim_scaled / 2, y - 3,
-                     dimstr(dim) + '"',
+                     fmt.dimstr(dim) + fmt.unit,
                      textAnchor='middle',
                      fontSize=9
                      )
@@ -599,10 +656,10 @@ def add_hdimstr(arrow, dim, scale, x, y):
     return arrow
 
 
-def add_hdimstr_beside(arrow, dim, x, y):
+def add_hdimstr_beside(arrow, dim, x, y, fmt=DEFAULT_FORMATTER):
     """Add a dim label to the given horiz dim arrow, outside the bounds."""
     dim_str = String(x - 11 - 2, y - 3,
-                     dimstr(dim) + '"',
+                     fmt.dimstr(dim) + fmt.unit,
                      textAnchor='end',
                      fontSize=9
                      )
@@ -669,25 +726,27 @@ def vdimarrow_iso(dim, scale, x, y, strwid, boundsln_len):
     return result
 
 
-def vdimarrow_str(dim, scale, x, y, strwid, boundsln_len):
+def vdimarrow_str(dim, scale, x, y, strwid, boundsln_len,
+                  fmt=DEFAULT_FORMATTER):
     """Return a vertical dimension arrow with labeled measurement."""
     result = vdimarrow(dim, scale, x, y, strwid, boundsln_len)
-    add_vdimstr(result, dim, scale, x, y, boundsln_len)
+    add_vdimstr(result, dim, scale, x, y, boundsln_len, fmt)
     return result
 
 
-def vdimarrow_iso_str(dim, scale, x, y, strwid, boundsln_len):
+def vdimarrow_iso_str(dim, scale, x, y, strwid, boundsln_len,
+                      fmt=DEFAULT_FORMATTER):
     """Return an isometric vert dimension arrow with labeled measurement."""
     result = vdimarrow_iso(dim, scale, x, y, strwid, boundsln_len)
-    add_vdimstr_iso(result, dim, scale, x, y, boundsln_len)
+    add_vdimstr_iso(result, dim, scale, x, y, boundsln_len, fmt)
     return result
 
 
-def add_vdimstr(arrow, dim, scale, x, y, boundsln_len):
+def add_vdimstr(arrow, dim, scale, x, y, boundsln_len, fmt=DEFAULT_FORMATTER):
     """Add a measurement label to the given vertical dimension arrow."""
     dim_scaled = dim * inch * scale
     dim_str = String(x + boundsln_len / 2 + 2, y + dim_scaled / 2 - 4,
-                     dimstr(dim) + '"',
+                     fmt.dimstr(dim) + fmt.unit,
                      textAnchor='end',
                      fontSize=9
                      )
@@ -701,12 +760,13 @@ def add_vdimstr(arrow, dim, scale, x, y, boundsln_len):
     return arrow
 
 
-def add_vdimstr_iso(arrow, dim, scale, x, y, boundsln_len):
+def add_vdimstr_iso(arrow, dim, scale, x, y, boundsln_len,
+                    fmt=DEFAULT_FORMATTER):
     """Add a measurement label to the given isometric vert dimension arrow."""
     dim_scaled = dim * inch * scale
     off = math.sqrt((boundsln_len / 2) ** 2 / 2)
     dim_str = String(x - off - 2, y + dim_scaled / 2 - 4,
-                     dimstr(dim) + '"',
+                     fmt.dimstr(dim) + fmt.unit,
                      textAnchor='start',
                      fontSize=9
                      )
@@ -756,14 +816,16 @@ def ddimarrow_iso(dim, scale, x, y, strwid, boundsln_len):
     return result
 
 
-def ddimarrow_iso_str(dim, scale, x, y, strwid, boundsln_len):
+def ddimarrow_iso_str(dim, scale, x, y, strwid, boundsln_len,
+                      fmt=DEFAULT_FORMATTER):
     """Return an isometric depth dimension arrow with labeled measurement."""
     result = ddimarrow_iso(dim, scale, x, y, strwid, boundsln_len)
-    add_ddimstr_iso(result, dim, scale, x, y, boundsln_len)
+    add_ddimstr_iso(result, dim, scale, x, y, boundsln_len, fmt)
     return result
 
 
-def add_ddimstr_iso(arrow, dim, scale, x, y, boundsln_len):
+def add_ddimstr_iso(arrow, dim, scale, x, y, boundsln_len,
+                    fmt=DEFAULT_FORMATTER):
     """Add a measurement label to the given isometric depth dimension arrow."""
     dim_scaled = dim * inch * scale
     # `iso45' is divided by 2 below because that is how it's calculated
@@ -771,7 +833,7 @@ def add_ddimstr_iso(arrow, dim, scale, x, y, boundsln_len):
     iso45 = math.sin(math.radians(45)) * dim_scaled / 2
     xmid, ymid = x + iso45 / 2, y + iso45 / 2
     dim_str = String(xmid - boundsln_len/2 - 4, ymid - 4,
-                     dimstr(dim) + '"',
+                     fmt.dimstr(dim) + fmt.unit,
                      textAnchor='start',
                      fontSize=9
                      )
@@ -785,48 +847,38 @@ def add_ddimstr_iso(arrow, dim, scale, x, y, boundsln_len):
     return arrow
 
 
-def panels_table(job):
-    """Return a table filled with drawings of the individual panels."""
-    backpanel_dr = panel_drawing(
-        'Back', job.cabs.back_width, job.cabs.back_height,
-        material=job.cabs.prim_material, thickness=job.cabs.back_thickness
-        )
-    if not all_equal(job.cabs.btmpanel_thicknesses):
-        raise ValueError('stacked bottom panels have different'
-                         ' thicknesses')
-    bottompanel_dr = panel_drawing(
-        'Bottom', job.cabs.bottom_width, job.cabs.bottom_depth,
-        material=job.cabs.prim_material,
-        thickness=job.cabs.btmpanel_thicknesses[0]
-        )
-    sidepanel_dr = panel_drawing(
-        'Side', job.cabs.side_depth, job.cabs.side_height,
-        material=job.cabs.prim_material, thickness=job.cabs.side_thickness
-        )
+def panels_table(cabs, fmt=DEFAULT_FORMATTER):
+    """Return a table filled with drawings of the individual panels of the run.
+
+    The panels are those of the run's parts table, three to a row, with a
+    bottom panel for each thickness of stacked bottom panels.
+    """
+    parts = {}
+    for part in cabs.parts:
+        parts.setdefault(str(part['name']), []).append(part)
+    backpanel_dr = part_drawing(parts['Back'][0], fmt=fmt)
+    bottompanel_drs = [part_drawing(part, fmt=fmt) for part in parts['Bottom']]
+    sidepanel_dr = part_drawing(parts['Side'][0], fmt=fmt)
+    # The nailer is drawn on end, and too narrow to label with its material.
     # Nailer scale may need to be 1/16 for hdim to fit
+    nailer = parts['Nailer'][0]
     topnailer_dr = panel_drawing(
-        'Nailer', job.cabs.topnailer_depth, job.cabs.topnailer_width
+        'Nailer', float(nailer['height']), float(nailer['width']), fmt=fmt
         )
     # Door scale may need to be 1/20 for hdim to fit
-    door_dr = panel_drawing(
-        'Door', job.cabs.door_width, job.cabs.door_height,
-        material=job.cabs.door_material, thickness=job.cabs.door_thickness
-        )
+    door_dr = part_drawing(parts['Door'][0], fmt=fmt)
+    drawings = [backpanel_dr, sidepanel_dr, topnailer_dr]
+    drawings.extend(bottompanel_drs)
+    drawings.append(door_dr)
+    if 'Filler' in parts:
+        # Fillers are used, we need a filler panel drawing.
+        drawings.append(part_drawing(parts['Filler'][0], labeled=False,
+                                     fmt=fmt))
     # Create table for layout of the panel drawings
     colWidths = ('35%', '35%', '30%')
+    data = [drawings[i:i + 3] for i in range(0, len(drawings), 3)]
     # The row heights below assume a col_ht of 411 pts (6.5 * 72 - 45 - 12).
-    rowHeights = (130, 130)
-    if job.cabs.fillers is Ends.NEITHER:
-        # No fillers used; do not create a filler panel drawing.
-        data = ((backpanel_dr, sidepanel_dr, topnailer_dr),
-                (bottompanel_dr, door_dr))
-    else:
-        # Fillers are used, we need a filler panel drawing.
-        filler_dr = panel_drawing(
-            'Filler', job.cabs.filler_width, job.cabs.filler_height
-        )
-        data = ((backpanel_dr, sidepanel_dr, topnailer_dr),
-                (bottompanel_dr, door_dr, filler_dr))
+    rowHeights = (130,) * len(data)
     top_center_style = [
         ('VALIGN', (0, 0), (-1, -1), 'TOP'),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER')
@@ -834,8 +886,27 @@ def panels_table(job):
     return Table(data, colWidths, rowHeights, style=top_center_style)
 
 
+def part_drawing(part, labeled=True, fmt=DEFAULT_FORMATTER):
+    """Create a panel Drawing of a record of a run's parts table.
+
+    If `labeled' is True, the panel is labeled with its thickness and material.
+    """
+    if labeled:
+        result = panel_drawing(
+            str(part['name']), float(part['width']), float(part['height']),
+            material=str(part['material']), thickness=float(part['thickness']),
+            fmt=fmt
+            )
+    else:
+        result = panel_drawing(
+            str(part['name']), float(part['width']), float(part['height']),
+            fmt=fmt
+            )
+    return result
+
+
 def panel_drawing(name, hdim, vdim, scale=DEFAULT_PANEL_SCALE, padding=6,
-                  material=None, thickness=None):
+                  material=None, thickness=None, fmt=DEFAULT_FORMATTER):
     """Create an individual panel Drawing of the named panel."""
     # Calculate the width and height of the panel rectangle in points.
     hdim_scaled = hdim * inch * scale
@@ -865,23 +936,26 @@ def panel_drawing(name, hdim, vdim, scale=DEFAULT_PANEL_SCALE, padding=6,
                )
         )
     boundsln_len = 10
-    result.add(hdimarrow_str(hdim, scale, rx, ry - 9, 0.67, boundsln_len))
-    result.add(vdimarrow_str(vdim, scale, rx - 9, ry, 0.67, boundsln_len))
+    result.add(hdimarrow_str(hdim, scale, rx, ry - 9, 0.67, boundsln_len,
+                             fmt))
+    result.add(vdimarrow_str(vdim, scale, rx - 9, ry, 0.67, boundsln_len,
+                             fmt))
     if material is not None and thickness is not None:
         thick_str, matl_str = matl_thick_strs(
-            material, thickness, rx, ry, hdim_scaled, vdim_scaled
+            material, thickness, rx, ry, hdim_scaled, vdim_scaled, fmt
             )
         result.add(thick_str)
         result.add(matl_str)
     return result
 
 
-def matl_thick_strs(material, thickness, rx, ry, rect_width, rect_ht):
+def matl_thick_strs(material, thickness, rx, ry, rect_width, rect_ht,
+                    fmt=DEFAULT_FORMATTER):
     """Return thickness and material Strings to display on the given panel.
 
     Returns the two strings as a pair (thick_str, matl_str).
     """
-    thickn = thickness_str(thickness) + '"'
+    thickn = fmt.thickness_str(thickness) + fmt.unit
     matl = MATL_ABBREVS[material]
     font_nm = 'Helvetica'      # Default Graphics FontName is Times-Roman
     thick_font_sz = 7
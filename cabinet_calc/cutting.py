@@ -0,0 +1,339 @@
+# cutting.py                          -*- coding: utf-8; -*-
+
+"""The cutting module for Cabinet Calc.
+
+Copyright © 2018-2021 Harry H. Toigo II, L33b0
+
+This file is part of Cabinet Calc.
+
+Cabinet Calc is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Cabinet Calc is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Cabinet Calc.  If not, see <https://www.gnu.org/licenses/>.
+
+This module works out the order in which to cut the parts of a panel layout
+(see nesting.py) free on a panel saw, and estimates how long that takes.
+
+Its main interface is the function cut_plan(layouts), which accepts a Layout
+or a sequence of them, e.g. a day's batch of jobs, and returns a SheetPlan for
+every sheet: the sequence of its cuts, with the number of times a piece must
+be turned and the distance the fence moves, and the estimated machine time.
+Only guillotine layouts can be cut on a panel saw. Those of portfolio() and
+anytime(), and of nest() by the guillotine, random and exact algorithms,
+always are; those of the maxrects and skyline algorithms may not be, and
+cut_plan() raises ValueError for them.
+
+The sheets are cut in stages. Each stage is a set of parallel cuts right
+across a piece, which cut it into strips; each strip is cut in turn by the
+next stage, across the other way, until only parts and offcuts are left. A
+sheet is loaded with its length along the saw, so that its first cuts are
+rips along its length. Turning a piece a quarter turn, to cut across the
+other way, is the slowest thing the operator does, so the stages are chosen
+to need as few turns as possible, and then as few cuts. The cuts of a stage
+are made in order across the piece, and strips are taken nearest first, so
+that the fence moves as little as possible.
+"""
+
+
+__all__ = ['Saw', 'SAW', 'Cut', 'SheetPlan', 'cut_plan', 'sheet_plan',
+           'summary']
+
+
+from collections import namedtuple
+
+from cabinet_calc.dimension_strs import DEFAULT_FORMATTER
+from cabinet_calc.nesting import _EPSILON
+
+
+class Saw(namedtuple('Saw', [
+        'cut_speed', 'fence_speed', 'turn_time', 'cut_time', 'load_time'])):
+    """The speeds of a panel saw and its operator, as an immutable record.
+
+    The speeds are in inches per second, and the times are in seconds:
+        cut_speed - the speed of the saw through the material
+        fence_speed - the speed of the fence when it is moved
+        turn_time - the time taken to turn a piece a quarter turn
+        cut_time - the time taken to set up and clear each cut
+        load_time - the time taken to load a full sheet on the saw
+    """
+
+    __slots__ = ()
+
+
+# Module constants
+
+# A typical sliding table panel saw, cutting at about 18 m/min.
+SAW = Saw(cut_speed=12.0, fence_speed=8.0, turn_time=15.0, cut_time=6.0,
+          load_time=45.0)
+
+
+class Cut(namedtuple('Cut', [
+        'axis', 'position', 'start', 'end', 'fence', 'turned'])):
+    """A single cut right across a piece, as an immutable record.
+
+    A cut with axis 'x' runs along the length of the sheet, at x = position,
+    from y = start to y = end; one with axis 'y' runs across it, at
+    y = position, from x = start to x = end. The kerf is on the far side of
+    the position. The fence is set at the position's distance from the near
+    edge of the piece, and turned is true if the piece is turned a quarter
+    turn just before the cut.
+    """
+
+    __slots__ = ()
+
+    @property
+    def length(self):
+        """Return the length of the cut."""
+        return self.end - self.start
+
+
+class SheetPlan(namedtuple('SheetPlan', [
+        'sheet', 'cuts', 'turns', 'travel', 'seconds'])):
+    """The cutting plan of one sheet, as an immutable record.
+
+    The sheet is the SheetLayout that is cut, cuts is the sequence of Cuts in
+    the order they are made, turns is how many of them need the piece turned,
+    travel is the total distance the fence moves, in inches, and seconds is
+    the estimated machine time, including loading the sheet.
+    """
+
+    __slots__ = ()
+
+
+def cut_plan(layouts, saw=SAW):
+    """Return a cutting plan for every sheet of one or more layouts.
+
+    :param layouts: The layout, or layouts, of the sheets to cut
+    :type layouts: nesting.Layout, or [nesting.Layout]
+    :param saw: The speeds of the panel saw
+    :type saw: Saw, optional
+    :return: The plans of all the sheets, in order
+    :rtype: [SheetPlan]
+    :raises ValueError: If a sheet is not a guillotine layout
+    """
+    if hasattr(layouts, 'sheets'):
+        layouts = [layouts]
+    result = [sheet_plan(sheet, layout.kerf, saw)
+              for layout in layouts for sheet in layout.sheets]
+    return result
+
+
+def sheet_plan(sheet, kerf, saw=SAW):
+    """Return the cutting plan of one sheet.
+
+    :param sheet: The layout of the sheet
+    :type sheet: nesting.SheetLayout
+    :param kerf: The width of the saw cut
+    :type kerf: float
+    :param saw: The speeds of the panel saw
+    :type saw: Saw, optional
+    :return: The plan of the sheet
+    :rtype: SheetPlan
+    :raises ValueError: If the sheet is not a guillotine layout
+    """
+    placements = tuple(sorted(sheet.placements, key=lambda p: (p.x, p.y)))
+    plan = _plan((0.0, 0.0, sheet.width, sheet.length), placements, 'x',
+                 kerf, {})
+    if plan is None:
+        raise ValueError('sheet is not a guillotine layout')
+    cuts = []
+    _sequence(plan[2], cuts, 0.0)
+    travel = 0.0
+    fence = 0.0
+    for cut in cuts:
+        travel += abs(cut.fence - fence)
+        fence = cut.fence
+    turns = sum(cut.turned for cut in cuts)
+    seconds = (saw.load_time + turns * saw.turn_time
+               + len(cuts) * saw.cut_time
+               + sum(cut.length for cut in cuts) / saw.cut_speed
+               + travel / saw.fence_speed)
+    result = SheetPlan(sheet, tuple(cuts), turns, travel, seconds)
+    return result
+
+
+def summary(plans, fmt=DEFAULT_FORMATTER):
+    """Return the cutting plans as a list of strings.
+
+    :param fmt: The formatter of the dimensions
+    :type fmt: dimension_strs.Formatter, optional
+    """
+    result = []
+    result.append('Cut Sequence:  {} {}, {} cuts, {} turns, {} estimated'.format(
+        len(plans), 'sheet' if len(plans) == 1 else 'sheets',
+        sum(len(plan.cuts) for plan in plans),
+        sum(plan.turns for plan in plans),
+        _duration(sum(plan.seconds for plan in plans))))
+    for i, plan in enumerate(plans):
+        result.append('')
+        result.append('Sheet {}:  {}{} {}  {} cuts, {} turns, {}'.format(
+            i + 1, fmt.thickness_str(plan.sheet.thickness), fmt.unit,
+            plan.sheet.material,
+            len(plan.cuts), plan.turns, _duration(plan.seconds)))
+        for n, cut in enumerate(plan.cuts):
+            result.append('    {:3d}  {:5s} at {:>10s}{}'.format(
+                n + 1, 'Rip' if cut.axis == 'x' else 'Cross',
+                fmt.dimstr(cut.fence) + fmt.unit,
+                '  (turn first)' if cut.turned else ''))
+    return result
+
+
+# Implementation.    (Definitions below are non-public)
+
+
+def _plan(region, placements, axis_in, kerf, memo):
+    """Return the stages that cut the placements free of a region.
+
+    The region (x, y, w, h) comes to be cut with the given axis, 'x' or 'y',
+    and turning it to cut across the other way costs a turn. Return a tuple
+    (turns, cuts, tree) with the fewest turns, and then cuts, where each node
+    of the tree is one of:
+        ('stage', axis, region, positions, children, turned) - a stage of
+            cuts at the positions, with the subtrees of the strips between
+            them, and whether the region is turned first
+        ('piece', placement) - a region that is exactly one placement
+        ('offcut', region) - an empty region
+    Return None if the placements cannot be cut free that way.
+    """
+    key = (region, placements, axis_in)
+    if key in memo:
+        return memo[key]
+    if not placements:
+        return (0, 0, ('offcut', region))
+    if len(placements) == 1:
+        p = placements[0]
+        x, y, w, h = region
+        if (abs(p.x - x) <= _EPSILON and abs(p.y - y) <= _EPSILON
+                and abs(p.width - w) <= _EPSILON
+                and abs(p.height - h) <= _EPSILON):
+            return (0, 0, ('piece', p))
+    result = None
+    for axis in (axis_in, 'y' if axis_in == 'x' else 'x'):
+        stage = _stage(region, placements, axis, kerf)
+        if stage is None:
+            continue
+        positions, strips = stage
+        turns = int(axis != axis_in)
+        cuts = len(positions)
+        children = []
+        for strip, members in strips:
+            plan = _plan(strip, members, axis, kerf, memo)
+            if plan is None:
+                break
+            turns += plan[0]
+            cuts += plan[1]
+            children.append(plan[2])
+        else:
+            if result is None or (turns, cuts) < result[:2]:
+                result = (turns, cuts, ('stage', axis, region, positions,
+                                        tuple(children), axis != axis_in))
+    memo[key] = result
+    return result
+
+
+def _stage(region, placements, axis, kerf):
+    """Return the cuts of one stage across the region, and the strips left.
+
+    The cuts are at every gap right across the region between the placements,
+    and at the edges of the placements nearest its sides, so each strip is
+    either as wide as the placements in it or an offcut. Return a tuple
+    (positions, strips), where each strip is a tuple (region, placements), or
+    None if there is nothing to cut across that way.
+    """
+    x, y, w, h = region
+    if axis == 'x':
+        lo, hi = x, x + w
+        spans = [(p.x, p.x + p.width) for p in placements]
+    else:
+        lo, hi = y, y + h
+        spans = [(p.y, p.y + p.height) for p in placements]
+    # The placements in groups that no cut can come between.
+    groups = []
+    for start, end in sorted(spans):
+        if groups and start < groups[-1][1] + kerf - _EPSILON:
+            groups[-1][1] = max(groups[-1][1], end)
+        else:
+            groups.append([start, end])
+    positions = []
+    cursor = lo
+    for start, end in groups:
+        if start > cursor + _EPSILON and (not positions
+                                          or start - kerf >= cursor - _EPSILON):
+            positions.append(start - kerf)
+        if end < hi - _EPSILON:
+            positions.append(end)
+            cursor = end + kerf
+    if not positions:
+        return None
+    strips = []
+    bounds = [lo] + [c for p in positions for c in (p, p + kerf)] + [hi]
+    for a, b in zip(bounds[::2], bounds[1::2]):
+        a, b = max(a, lo), min(b, hi)
+        if b - a <= _EPSILON:
+            continue
+        members = tuple(p for p, (start, end) in zip(placements, spans)
+                        if start >= a - _EPSILON and end <= b + _EPSILON)
+        if axis == 'x':
+            strip = (a, y, b - a, h)
+        else:
+            strip = (x, a, w, b - a)
+        strips.append((strip, members))
+    if len(strips) == 1 and strips[0][0] == region:
+        return None
+    return (positions, strips)
+
+
+def _sequence(tree, cuts, fence):
+    """Append the cuts of a stage tree to cuts, in order, and return the fence.
+
+    The cuts of a stage are made in order from whichever end is nearer the
+    fence, and then the strips are taken nearest first.
+    """
+    if tree[0] != 'stage':
+        return fence
+    _, axis, region, positions, children, turned = tree
+    x, y, w, h = region
+    if axis == 'x':
+        lo, start, end = x, y, y + h
+    else:
+        lo, start, end = y, x, x + w
+    settings = [max(0.0, p - lo) for p in positions]
+    order = list(zip(positions, settings))
+    if abs(settings[-1] - fence) < abs(settings[0] - fence):
+        order.reverse()
+    for i, (position, setting) in enumerate(order):
+        cuts.append(Cut(axis, position, start, end, setting,
+                        turned and i == 0))
+        fence = setting
+    stages = [child for child in children if child[0] == 'stage']
+    while stages:
+        nearest = min(stages, key=lambda child: _distance(child, fence))
+        stages.remove(nearest)
+        fence = _sequence(nearest, cuts, fence)
+    return fence
+
+
+def _distance(tree, fence):
+    """Return how far the fence moves to make the first cut of a stage."""
+    _, axis, region, positions, _, _ = tree
+    lo = region[0] if axis == 'x' else region[1]
+    return min(abs(max(0.0, positions[0] - lo) - fence),
+               abs(max(0.0, positions[-1] - lo) - fence))
+
+
+def _duration(seconds):
+    """Return a time in seconds as a string of hours, minutes and seconds."""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return '{:d}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+
+
+# cutting.py  ends here
@@ -24,17 +24,165 @@ measurements into strings expressed in fractional inches, as are commonly used
 by fabricators in a cabinet shop. The functions that produce fractional
 dimension strings will produce 'strong' and 'shy' measurements, using the
 suffixes '+' to mean strong and '-' to mean shy.
+
+For bulk output, such as exports of thousands of parts, dimstr_array(),
+dimstr_col_array() and thickness_str_array() convert a whole array of
+dimensions at once, to an array of exactly the strings that dimstr(),
+dimstr_col() and thickness_str() give for each element.
+
+These functions always give sixteenths of an inch. For output to a different
+precision, or in millimetres, use a Formatter, e.g. Formatter(32) for
+thirty-seconds of an inch, or Formatter(units='mm', decimals=1) for tenths of
+a millimetre. A Formatter keeps the strings it has made in a bounded cache,
+since the same few dimensions recur throughout the output of a job.
+
+Going the other way, parse_dimstr() converts a dimension as the shop writes it,
+e.g. `34 5/16', `22 3/8+' or `1-1/2', back to a floating point number. It
+accepts every string dimstr() gives, and plain decimal numbers too.
 """
 
 
-__all__ = ['dimstr', 'dimstr_col', 'thickness_str']
+__all__ = ['DENOMINATORS', 'UNITS', 'MM_PER_INCH', 'FORMAT_CACHE_SIZE',
+           'Formatter', 'DEFAULT_FORMATTER', 'PRECISIONS',
+           'PRECISION_DEFAULT', 'dimstr', 'dimstr_col',
+           'thickness_str', 'dimstr_array', 'dimstr_col_array',
+           'thickness_str_array', 'parse_dimstr']
 
 
 from fractions import Fraction
+from functools import lru_cache
 import math
+import re
+
+import numpy as np
+
+
+# Module constants
+
+# The fractions of an inch a Formatter can round to, as denominators.
+DENOMINATORS = (8, 16, 32, 64)
 
+# The units a Formatter can give dimensions in.
+UNITS = ('in', 'mm')
 
-DEBUG = False
+MM_PER_INCH = 25.4
+
+# The most strings a Formatter keeps in its cache, by default.
+FORMAT_CACHE_SIZE = 4096
+
+
+class Formatter(object):
+    """Converts dimensions in inches to strings, to a chosen precision.
+
+    In inches, dimensions are given as dimstr() gives them, but to the
+    nearest 1/denominator of an inch, and thicknesses as thickness_str()
+    gives them. In millimetres, both are given with a fixed number of
+    decimals. Each string is made once, and kept in a least recently used
+    cache of cache_size strings.
+    """
+
+    def __init__(self, denominator=16, units='in', decimals=1,
+                 cache_size=FORMAT_CACHE_SIZE):
+        """Set the precision and the size of the cache.
+
+        :param denominator: The denominator of the fractions of an inch to
+            round to, in inches
+        :type denominator: int, one of DENOMINATORS
+        :param units: The units to give dimensions in
+        :type units: str, one of UNITS
+        :param decimals: The number of decimals to give, in millimetres
+        :type decimals: int
+        :param cache_size: The most strings to keep in the cache
+        :type cache_size: int
+        :raises ValueError: If a parameter is not one of its allowed values
+        """
+        if denominator not in DENOMINATORS:
+            raise ValueError('denominator must be one of '
+                             + ', '.join(map(str, DENOMINATORS)))
+        if units not in UNITS:
+            raise ValueError('units must be one of ' + ', '.join(UNITS))
+        if decimals < 0:
+            raise ValueError('decimals must not be negative')
+        if cache_size <= 0:
+            raise ValueError('cache_size must be positive')
+        self.denominator = denominator
+        self.units = units
+        self.decimals = decimals
+        self.cache_size = cache_size
+        if units == 'in':
+            self.unit = '"'
+            self._table = fraction_table(denominator)
+        else:
+            self.unit = ' mm'
+            # Wide enough for four whole digits, so columns line up for any
+            # dimension under ten metres.
+            self._col_width = 4 + (decimals + 1 if decimals > 0 else 0)
+        self._cached = lru_cache(maxsize=cache_size)(self._format)
+
+    def __repr__(self):
+        if self.units == 'in':
+            return 'Formatter({})'.format(self.denominator)
+        return "Formatter(units='mm', decimals={})".format(self.decimals)
+
+    def __eq__(self, other):
+        if not isinstance(other, Formatter):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def dimstr(self, x):
+        """Return the string for the dimension x, without its unit."""
+        return self._cached(_DIM, x)
+
+    def dimstr_col(self, x):
+        """Like dimstr(x), adjusted so whole number parts align in columns."""
+        return self._cached(_DIM_COL, x)
+
+    def thickness_str(self, x):
+        """Return the string for the thickness x, without its unit."""
+        return self._cached(_THICKNESS, x)
+
+    def decimal_str(self, x):
+        """Return the string for a dimension as it was entered, without its unit.
+
+        In inches, this is x as a decimal number, e.g. `157.125', instead of
+        a fraction; in millimetres, it is dimstr(x).
+        """
+        if self.units == 'in':
+            result = str(x)
+        else:
+            result = self.dimstr(x)
+        return result
+
+    def cache_info(self):
+        """Return the statistics of the cache, as functools.lru_cache does."""
+        return self._cached.cache_info()
+
+    def cache_clear(self):
+        """Empty the cache."""
+        self._cached.cache_clear()
+
+    def _key(self):
+        """Return the settings that determine the strings, as a tuple."""
+        if self.units == 'in':
+            return ('in', self.denominator)
+        return ('mm', self.decimals)
+
+    def _format(self, kind, x):
+        """Return the string of the given kind for x, without the cache."""
+        if self.units == 'mm':
+            result = '{:.{}f}'.format(x * MM_PER_INCH, self.decimals)
+            if kind == _DIM_COL:
+                result = result.rjust(self._col_width)
+        elif kind == _THICKNESS:
+            result = thickness_str(x)
+        else:
+            result = nths_str(x, self.denominator, self._table)
+            if kind == _DIM_COL:
+                result = sdalign(result)
+        return result
 
 
 def dimstr(x):
@@ -55,51 +203,8 @@ def dimstr(x):
     return the nearest nth in lowest terms (e.g. 1/4 instead of 4/16), with a
     `+' or `-' suffix indicating `strong' or `shy', respectively.
     """
-    # Here, n = 16 means that one nth is one sixteenth; n = 32 means that one
-    # nth is one thirty-secondth, etc.
-    n = 16
-
-    # x = nths / n    (In general, `nths' will NOT be an integral value.)
-    nths = x * n
-    # Separate the number of 'nths' into integral & fractional parts:
-    nths_frac, nths_int = math.modf(nths)
-    # Change nths_int/n into the mixed number `i nths_int/n':
-    #     from 546/16      to    34 2/16
-    #          nths_int/n        i  nths_int/n
-    i, nths_int = divmod(int(nths_int), n)
-    lowernth_frac = Fraction(nths_int, n)
-    uppernth_frac = Fraction(nths_int + 1, n)
-    if DEBUG:
-        print('i=' + str(i))
-        print('nths_int=' + str(nths_int))
-        print('n=' + str(n))
-        print('nths_frac=' + str(nths_frac))
-        print('lowernth_frac=' + str(lowernth_frac))
-        print('uppernth_frac=' + str(uppernth_frac))
-
-    if nths_frac < 0.25:
-        # Within 1/4n of the lower nth--1/64, in the usual case of n=16. We are
-        # less than halfway to the midpoint between the lower and upper nths, so
-        # we drop the `strong'.
-        result = lowerval_str(i, lowernth_frac)
-    elif nths_frac < 0.5:
-        # Closer to the lower nth than the upper.
-        result = lowerval_strong_str(i, lowernth_frac)
-    elif nths_frac == 0.5:
-        # Exactly in the middle; `round' to the even value with `strong' or
-        # `shy', as required.
-        if is_even(nths_int):
-            result = lowerval_strong_str(i, lowernth_frac)
-        else:
-            result = upperval_shy_str(i, uppernth_frac)
-    elif nths_frac <= 0.75:
-        # Closer to the upper nth than the lower.
-        result = upperval_shy_str(i, uppernth_frac)
-    else:
-        # nths_frac > 0.75. Within 1/4n of the upper nth--1/64, if n=16.
-        # Consequently, we drop the `shy'.
-        result = upperval_str(i, uppernth_frac)
-    return result
+    # Here, n = 16 means that one nth is one sixteenth; see _SIXTEENTHS.
+    return nths_str(x, 16, _SIXTEENTHS)
 
 
 def dimstr_col(x):
@@ -115,106 +220,315 @@ def thickness_str(x):
     rounded to the nearest common thickness value, usually to the nearest 1/4,
     without the `strong' (+) or `shy' (-) indications.
     """
-    n = 4          # n = 4 means an nth is one fourth
+    # n = 4 means an nth is one fourth; see _QUARTERS.
 
     # x = nths / n    (In general, `nths' will NOT be an integral value.)
-    nths = x * n
     # Separate the number of 'nths' into integral & fractional parts:
-    nths_frac, nths_int = math.modf(nths)
+    nths_frac, nths_int = math.modf(x * 4)
     # Change nths_int/n into the mixed number `i nths_int/n':
     #     from 5/4      to    1 1/4
     #          nths_int/n     i nths_int/n
-    i, nths_int = divmod(int(nths_int), n)
-    lowernth_frac = Fraction(nths_int, n)
-    uppernth_frac = Fraction(nths_int + 1, n)
-
-    if nths_frac < 0.5:
-        result = lowerval_str(i, lowernth_frac)
-    elif nths_frac == 0.5:
-        # Exactly in the middle; round to the even value.
-        if is_even(nths_int):
-            result = lowerval_str(i, lowernth_frac)
-        else:
-            result = upperval_str(i, uppernth_frac)
+    i, nths_int = divmod(int(nths_int), 4)
+
+    if nths_frac < 0.5 or (nths_frac == 0.5 and nths_int % 2 == 0):
+        # Round down, and exactly in the middle, to the even value.
+        result = mixed_str(i, _QUARTERS[nths_int])
     else:
-        result = upperval_str(i, uppernth_frac)
+        result = mixed_str(i, _QUARTERS[nths_int + 1])
     return result
 
 
-# Implementation.    (Definitions below are non-public)
+def dimstr_array(x):
+    """Return an array of dimstr(x) for every element of the array x.
 
+    :param x: The dimensions
+    :type x: array_like of float
+    :return: The strings, in an array of the same shape as x
+    :rtype: numpy.ndarray of str
+    :raises ValueError: If an element of x is not finite, or is 2**48 or
+        more either way
+    """
+    return dimstrs_array(x, False)
 
-def sdalign(str):
-    """Align a single-digit number with column of double-digit numbers.
 
-    Indent strings such as `4' or `8 3/4', to align whole number parts with
-    numbers like `22 3/8', as follows:
+def dimstr_col_array(x):
+    """Return an array of dimstr_col(x) for every element of the array x.
 
-        22 3/8                   22 3/8
-         8 3/4    rather than    8 3/4
-         4                       4
+    :param x: The dimensions
+    :type x: array_like of float
+    :return: The strings, in an array of the same shape as x
+    :rtype: numpy.ndarray of str
+    :raises ValueError: If an element of x is not finite, or is 2**48 or
+        more either way
     """
-    if len(str) == 1 or str[1] == ' ':
-        result = ' ' + str
+    return dimstrs_array(x, True)
+
+
+def thickness_str_array(x):
+    """Return an array of thickness_str(x) for every element of the array x.
+
+    :param x: The thicknesses
+    :type x: array_like of float
+    :return: The strings, in an array of the same shape as x
+    :rtype: numpy.ndarray of str
+    :raises ValueError: If an element of x is not finite, or is 2**48 or
+        more either way
+    """
+    nths_frac, i, nths_int = nths_array(x, 4)
+    # Round as in thickness_str(), every element at once.
+    upper = (nths_frac > 0.5) | ((nths_frac == 0.5) & (nths_int % 2 == 1))
+    result = strs_array(i, nths_int + upper, np.zeros_like(i), _QUARTERS,
+                        ('',), False)
+    return result
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def parse_dimstr(s, n=16):
+    """Convert a dimension string to a floating point number of inches.
+
+    This is the inverse of dimstr(). The string is a decimal number, a whole
+    number, a fraction, or a whole number and a fraction separated by spaces
+    or a hyphen, optionally followed by a `+' (strong) or `-' (shy) and by
+    `"' or `in'. Some examples:
+
+        `s'             Return Value
+        '11.375'        11.375
+        '11 3/8'        11.375
+        '1-1/2"'        1.5
+        '22 3/8+'       22.3984375
+        '34 5/16-'      34.2890625
+
+    A strong or shy dimension is 3/8 of an nth more or less than the nth it
+    is marked on, in the middle of the range that dimstr() marks that way,
+    so that dimstr(parse_dimstr(s)) == s for any string s that dimstr()
+    gives. As in dimstr(), the fraction of a negative mixed number is added
+    to its whole number part, e.g. '-1 3/4' is -0.25.
+
+    :param s: The dimension string
+    :type s: str
+    :param n: The denominator of the nths that `s' was rounded to
+    :type n: int, optional
+    :rtype: float
+    :raises ValueError: If the string is not a finite dimension
+    """
+    # The values are cached, since the dimensions of a job file, like those
+    # of its output, are mostly the same few over and over.
+    try:
+        # Plain decimal numbers, the most common input, are parsed quickest
+        # this way.
+        result = float(s)
+    except ValueError:
+        result = fraction_value(s, n)
     else:
-        result = str
+        if not math.isfinite(result):
+            raise ValueError('dimension is not finite: ' + repr(s))
+    return result
+
+
+# Implementation.    (Definitions below are non-public)
+
+
+def fraction_table(n):
+    """Return a table of the fractions from 0/n to n/n, for mixed_str().
+
+    Entry j is a tuple (carry, fraction) for j/n: carry is 1 for n/n and 0
+    for the rest, and fraction is j/n in lowest terms as a string, e.g.
+    '3/8' for 6/16, or '' for 0/n and n/n.
+    """
+    result = [(0, '')]
+    result.extend((0, str(Fraction(j, n))) for j in range(1, n))
+    result.append((1, ''))
     return result
 
 
-def is_even(num):
-    return (num % 2 == 0)
+# The tables of the fractions dimstr() and thickness_str() round to.
+_SIXTEENTHS = fraction_table(16)
+_QUARTERS = fraction_table(4)
+
+# The kinds of strings a Formatter caches.
+_DIM, _DIM_COL, _THICKNESS = range(3)
+
+
+def nths_str(x, n, table):
+    """Return dimstr(x), but to the nearest nth, with fraction_table(n)."""
+    # x = nths / n    (In general, `nths' will NOT be an integral value.)
+    # Separate the number of 'nths' into integral & fractional parts:
+    nths_frac, nths_int = math.modf(x * n)
+    # Change nths_int/n into the mixed number `i nths_int/n'; with n = 16:
+    #     from 546/16      to    34 2/16
+    #          nths_int/n        i  nths_int/n
+    i, nths_int = divmod(int(nths_int), n)
+
+    if nths_frac < 0.25:
+        # Within 1/4n of the lower nth--1/64, in the usual case of n=16. We are
+        # less than halfway to the midpoint between the lower and upper nths, so
+        # we drop the `strong'.
+        result = mixed_str(i, table[nths_int])
+    elif nths_frac < 0.5 or (nths_frac == 0.5 and nths_int % 2 == 0):
+        # Closer to the lower nth than the upper, or exactly in the middle
+        # with the lower nth even; `round' to it, with `strong'.
+        result = mixed_str(i, table[nths_int]) + '+'
+    elif nths_frac <= 0.75:
+        # Closer to the upper nth than the lower, or exactly in the middle
+        # with the upper nth even; `round' to it, with `shy'.
+        result = mixed_str(i, table[nths_int + 1]) + '-'
+    else:
+        # nths_frac > 0.75. Within 1/4n of the upper nth--1/64, if n=16.
+        # Consequently, we drop the `shy'.
+        result = mixed_str(i, table[nths_int + 1])
+    return result
 
 
-def lowerval_str(i, frac):
-    """Return a string for an exact lower fractional value.
+def mixed_str(i, entry):
+    """Return a string for the whole number i plus an entry of fraction_table().
 
-    `i' is an integer, and `frac' is an instance of Fraction.
+    A whole number is written alone, e.g. `3' instead of `3 0/16', and a
+    fraction of less than one is too, e.g. `3/4' instead of `0 3/4'.
     """
-    if frac == 0:
-        # The fractional part is 0, so just use the integer. If the entire value
-        # is 0, we want the result to be `0'.
-        result = str(i)
+    carry, frac = entry
+    if not frac:
+        # The fractional part is 0 or 1, so just use the integer. If the entire
+        # value is 0, we want the result to be `0'.
+        result = str(i + carry)
     elif i == 0:
-        # We want `3/4' instead of `0 3/4'.
-        result = str(frac)
+        result = frac
     else:
-        result = str(i) + ' ' + str(frac)
+        result = str(i) + ' ' + frac
     return result
 
 
-def lowerval_strong_str(i, frac):
-    """Return a string for a `strong' lower fractional value.
+# The largest dimension, either way, that the array functions accept.
+_ARRAY_LIMIT = 2.0 ** 48
+
 
-    `i' is an integer, and `frac' is an instance of Fraction. Since this
-    function is used for lower nths only, `frac' can be 0 but cannot be 1. So
-    the logic is the same as for lowerval_str.
+def dimstrs_array(x, align):
+    """Return an array of dimstr(x), or of dimstr_col(x) if align is true."""
+    nths_frac, i, nths_int = nths_array(x, 16)
+    # Classify every element at once, as in dimstr(): lower, lower strong,
+    # upper shy, or upper.
+    strong = ((nths_frac >= 0.25)
+              & ((nths_frac < 0.5)
+                 | ((nths_frac == 0.5) & (nths_int % 2 == 0))))
+    upper = (nths_frac >= 0.5) & ~strong
+    shy = upper & (nths_frac <= 0.75)
+    result = strs_array(i, nths_int + upper, strong + 2 * shy, _SIXTEENTHS,
+                        ('', '+', '-'), align)
+    return result
+
+
+def nths_array(x, n):
+    """Split every element of the array x into a whole number and nths.
+
+    Return a tuple (nths_frac, i, nths_int) of arrays, where x is
+    i + (nths_int + nths_frac) / n, as in dimstr().
     """
-    return lowerval_str(i, frac) + '+'
+    x = np.asarray(x, dtype=float)
+    if not (np.abs(x) < _ARRAY_LIMIT).all():
+        raise ValueError('dimensions must be finite and less than 2**48')
+    nths_frac, nths_int = np.modf(x * n)
+    i, nths_int = np.divmod(nths_int.astype(np.int64), n)
+    return nths_frac, i, nths_int
 
 
-def upperval_str(i, frac):
-    """Return a string for an exact upper fractional value.
+def strs_array(i, j, suffix, table, suffixes, align):
+    """Return an array of the strings of mixed numbers with suffixes.
 
-    `i' is an integer, and `frac' is an instance of Fraction.
+    Element by element, the string is mixed_str(i, table[j]) followed by
+    suffixes[suffix], and aligned by sdalign() if align is true. Each string
+    is made only once, however many elements share it.
     """
-    if frac == 1:
-        # The fractional part is 1, so move up to the next integer.
-        result = str(i + 1)
-    elif i == 0:
-        # We want `3/4' instead of `0 3/4'.
-        result = str(frac)
+    if i.size == 0:
+        return np.zeros(i.shape, dtype=str)
+    base = int(i.min())
+    codes = ((i - base) * len(table) + j) * len(suffixes) + suffix
+    uniq, inverse = np.unique(codes, return_inverse=True)
+    strs = []
+    for code in uniq.tolist():
+        rest, k = divmod(code, len(suffixes))
+        whole, frac = divmod(rest, len(table))
+        text = mixed_str(whole + base, table[frac]) + suffixes[k]
+        strs.append(sdalign(text) if align else text)
+    result = np.array(strs)[inverse.reshape(-1)].reshape(i.shape)
+    return result
+
+
+# A dimension string, as parse_dimstr() accepts, for fraction_value().
+_DIMSTR_PATTERN = re.compile(r'''
+    \s* (?P<sign>-)?
+    (?:
+        # A mixed number, e.g. `34 5/16' or `1-1/2'
+        (?P<whole>\d+) (?:\s+|\s*-\s*) (?P<num>\d+) / (?P<den>\d+)
+        # A fraction, e.g. `3/4'
+      | (?P<fnum>\d+) / (?P<fden>\d+)
+        # A whole or decimal number, e.g. `17' or `17.25'
+      | (?P<number>\d+(?:\.\d*)? | \.\d+)
+    )
+    \s* (?P<mark>[-+])? \s* (?:"|in)? \s*
+    ''', re.VERBOSE)
+
+
+def fraction_value(s, n):
+    """Return the value of a dimension string that is not a plain number.
+
+    This is parse_dimstr(s, n) for strings that float() does not accept.
+    """
+    match = _DIMSTR_PATTERN.fullmatch(s)
+    if match is None:
+        raise ValueError('not a dimension: ' + repr(s))
+    sign, whole, num, den, fnum, fden, number, mark = match.groups()
+    if number is not None:
+        result = float(number)
+        if sign:
+            result = -result
+    elif whole is None:
+        if int(fden) == 0:
+            raise ValueError('zero denominator: ' + repr(s))
+        result = int(fnum) / int(fden)
+        if sign:
+            result = -result
     else:
-        result = str(i) + ' ' + str(frac)
+        if not int(num) < int(den):
+            raise ValueError('fraction of a mixed number is not less than '
+                             'one: ' + repr(s))
+        # As dimstr() writes it, the sign is of the whole number part only.
+        result = (-int(whole) if sign else int(whole)) + int(num) / int(den)
+    if mark == '+':
+        result += 0.375 / n
+    elif mark == '-':
+        result -= 0.375 / n
     return result
 
 
-def upperval_shy_str(i, frac):
-    """Return a string for a `shy' upper fractional value.
+def sdalign(str):
+    """Align a single-digit number with column of double-digit numbers.
 
-    `i' is an integer, and `frac' is an instance of Fraction. Since this
-    function is used for upper nths only, `frac' can be 1 but cannot be 0. So
-    the logic is the same as for upperval_str.
+    Indent strings such as `4' or `8 3/4', to align whole number parts with
+    numbers like `22 3/8', as follows:
+
+        22 3/8                   22 3/8
+         8 3/4    rather than    8 3/4
+         4                       4
     """
-    return upperval_str(i, frac) + '-'
+    if len(str) == 1 or str[1] == ' ':
+        result = ' ' + str
+    else:
+        result = str
+    return result
+
+
+# The formatter used where no other is given, which gives the same strings as
+# dimstr(), dimstr_col() and thickness_str().
+DEFAULT_FORMATTER = Formatter()
+
+# The precisions dimensions can be given to, by the names the user chooses
+# them by, on the command line or in the GUI: fractions of an inch, or
+# millimetres.
+PRECISIONS = {'1/8': Formatter(8),
+              '1/16': DEFAULT_FORMATTER,
+              '1/32': Formatter(32),
+              '1/64': Formatter(64),
+              'mm': Formatter(units='mm', decimals=0),
+              '0.1mm': Formatter(units='mm', decimals=1)}
+PRECISION_DEFAULT = '1/16'
 
 # dimension_strs.py  ends here
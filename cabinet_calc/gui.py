@@ -27,7 +27,9 @@ Tkinter, which will run on Windows, Mac and Linux desktops.
 __all__ = ['Application']
 
 
+import queue
 import textwrap
+import threading
 from tkinter import (Tk, StringVar, IntVar, N, S, W, E, Text)
 from tkinter import ttk
 from tkinter import filedialog
@@ -37,6 +39,20 @@ from cabinet_calc.cabinet import (
     )
 from cabinet_calc import job
 from cabinet_calc import cutlist
+from cabinet_calc import nesting
+from cabinet_calc.dimension_strs import (
+    PRECISIONS, PRECISION_DEFAULT, parse_dimstr
+    )
+from cabinet_calc.layout_cache import LayoutCache
+
+
+# The time between checks for the progress of the panel layout search, which
+# runs in a worker thread, in milliseconds.
+SEARCH_INTERVAL = 10
+
+# The number of steps of the search between updates of its elapsed time,
+# when the layout does not improve.
+SEARCH_REFRESH = 25
 
 
 def yn_to_bool(string):
@@ -87,8 +103,15 @@ class Application(ttk.Frame):
         self.stacked_btm = StringVar()
         self.btm_material = StringVar()
         self.doors_per_cab = IntVar()
+        # The precision is kept when the input is cleared.
+        self.precision = StringVar(value=PRECISION_DEFAULT)
         self.output = ''
         self.job = None
+        self.layout = None
+        self.layout_cache = LayoutCache()
+        self.search = None
+        self.search_cancel = None
+        self.search_results = None
         self.initialize_vars()
         self.make_widgets()
 
@@ -115,6 +138,8 @@ class Application(ttk.Frame):
         self.doors_per_cab.set(2)
         self.output = 'No job yet.'
         self.job = None
+        self.stop_search()
+        self.layout = None
 
     def make_widgets(self):
         """Create and layout all the UI elements.
@@ -154,12 +179,12 @@ class Application(ttk.Frame):
                 column=0, row=0, pady=2, sticky=W)
             self.jobname_ent = ttk.Entry(jobframe, textvariable=self.jobname,
                                          validate='key',
-                                         validatecommand=(vcmd, '%P'))
+                                         validatecommand=(vcmd, '%P', '%W'))
             ttk.Label(jobframe, text='Description:').grid(
                 column=0, row=1, pady=2, sticky=W)
             self.descrip_ent = ttk.Entry(
                 jobframe, textvariable=self.description, validate='key',
-                validatecommand=(vcmd, '%P'))
+                validatecommand=(vcmd, '%P', '%W'))
             self.jobname_ent.grid(column=1, row=0, pady=2, sticky=(W, E),
                                   padx=(5, 0))
             self.descrip_ent.grid(column=1, row=1, pady=2, sticky=(W, E),
@@ -179,17 +204,17 @@ class Application(ttk.Frame):
                 column=0, row=0, sticky=W, padx=(0, 3))
             self.fullwidth_ent = ttk.Entry(
                 dimframe, width=10, textvariable=self.fullwidth, validate='key',
-                validatecommand=(vcmd, '%P'))
+                validatecommand=(vcmd, '%P', '%W'))
             ttk.Label(dimframe, text='Height:').grid(
                 column=2, row=0, sticky=E, padx=(6, 3))
             self.height_ent = ttk.Entry(
                 dimframe, width=10, textvariable=self.height, validate='key',
-                validatecommand=(vcmd, '%P'))
+                validatecommand=(vcmd, '%P', '%W'))
             ttk.Label(dimframe, text='Depth:').grid(
                 column=4, row=0, sticky=E, padx=(6, 3))
             self.depth_ent = ttk.Entry(
                 dimframe, width=10, textvariable=self.depth, validate='key',
-                validatecommand=(vcmd, '%P'))
+                validatecommand=(vcmd, '%P', '%W'))
             self.fullwidth_ent.grid(column=1, row=0, sticky=(W, E), padx=3)
             self.height_ent.grid(column=3, row=0, sticky=(W, E), padx=3)
             self.depth_ent.grid(column=5, row=0, sticky=(W, E), padx=3)
@@ -400,21 +425,53 @@ class Application(ttk.Frame):
         self.panel_layout_btn.state(['disabled'])
         self.cutlist_button.grid(column=0, row=0, sticky=E, padx=2)
         self.panel_layout_btn.grid(column=1, row=0, sticky=W, padx=2)
-
-    def validate_entry(self, value):
-        """Enable the 'Calculate' button only when we have enough info."""
-        if self.have_enough_info():
+        ttk.Label(outp_btnsframe, text='Precision:').grid(
+            column=2, row=0, sticky=E, padx=(6, 2))
+        self.precision_cbx = ttk.Combobox(
+            outp_btnsframe, textvariable=self.precision,
+            width=max(map(len, PRECISIONS)))
+        self.precision_cbx['values'] = tuple(PRECISIONS)
+        # Prevent direct editing of the value in the combobox:
+        self.precision_cbx.state(['readonly'])
+        self.precision_cbx.bind('<<ComboboxSelected>>', self.precision_changed)
+        self.precision_cbx.grid(column=3, row=0, sticky=E, padx=2)
+
+    def validate_entry(self, value, widget):
+        """Enable the 'Calculate' button only when we have enough info.
+
+        `value' is what the entry named `widget' is being changed to; the
+        entry itself still holds what it held before.
+        """
+        if self.have_enough_info({widget: value}):
             self.calc_button.state(['!disabled'])
         else:
             self.calc_button.state(['disabled'])
         return True
 
-    def have_enough_info(self):
-        """Return True if we have enough info to calculate a job, False otherwise."""
-        result = (self.jobname_ent.get() != ''
-                  and self.fullwidth_ent.get() != ''
-                  and self.height_ent.get() != ''
-                  and self.depth_ent.get() != '')
+    def have_enough_info(self, changes=None):
+        """Return True if we have enough info to calculate a job, False otherwise.
+
+        The width, height and depth must be dimensions that parse_dimstr()
+        accepts, e.g. `34.3125' or `34 5/16'. `changes' maps the names of
+        entries being changed to their new values.
+        """
+        if changes is None:
+            changes = {}
+
+        def text(entry):
+            return changes.get(str(entry), entry.get())
+
+        def is_dimension(entry):
+            try:
+                parse_dimstr(text(entry))
+            except ValueError:
+                return False
+            return True
+
+        result = (text(self.jobname_ent) != ''
+                  and is_dimension(self.fullwidth_ent)
+                  and is_dimension(self.height_ent)
+                  and is_dimension(self.depth_ent))
         return result
 
     def prim_material_changed(self, e):
@@ -445,6 +502,17 @@ class Application(ttk.Frame):
         self.door_thickness.set(MATL_THICKNESSES[self.door_material.get()][0])
         self.door_material_cbx.selection_clear()
 
+    def precision_changed(self, e):
+        """Show the job and its panel layout to the newly chosen precision."""
+        self.precision_cbx.selection_clear()
+        if self.job is None:
+            return
+        self.job.formatter = PRECISIONS[self.precision.get()]
+        if self.layout is None:
+            self.display_output(self.job.specification)
+        else:
+            self.display_layout()
+
     def legs_changed(self):
         """Handle the changing of whether the cabinets will have legs or not."""
         if self.legs.get() == 'yes':
@@ -479,7 +547,7 @@ class Application(ttk.Frame):
     def stacked_btm_changed(self):
         """Handle the changing of whether cabinet bottoms will be stacked or not."""
         if self.stacked_btm.get() == 'yes':
-            half_btm = float(self.bottom_thickness.get()) / 2
+            half_btm = parse_dimstr(self.bottom_thickness.get()) / 2
             self.btmpanel1_thickness_ent.state(['!disabled'])
             self.btmpanel1_thickness.set(half_btm)
             self.btmpanel2_thickness_ent.state(['!disabled'])
@@ -498,11 +566,11 @@ class Application(ttk.Frame):
             if self.btmpanel1_thickness.get() == '':
                 bp1 = 0.0
             else:
-                bp1 = float(self.btmpanel1_thickness.get())
+                bp1 = parse_dimstr(self.btmpanel1_thickness.get())
             if self.btmpanel2_thickness.get() == '':
                 bp2 = 0.0
             else:
-                bp2 = float(self.btmpanel2_thickness.get())
+                bp2 = parse_dimstr(self.btmpanel2_thickness.get())
             new_thickness = bp1 + bp2
             if new_thickness == 0.0:
                 thickness_str = ''
@@ -512,6 +580,7 @@ class Application(ttk.Frame):
 
     def quit(self):
         """Quit the app; accomplished by destroying its top-level window."""
+        self.stop_search()
         self.root.destroy()
 
     def clear_input(self):
@@ -533,35 +602,42 @@ class Application(ttk.Frame):
 
     def calculate_job(self):
         """Calculate a job, given all input parameters."""
+        self.stop_search()
         if self.legs.get() == 'no':
-            bp_list = [float(self.prim_thickness.get())]
+            bp_list = [parse_dimstr(self.prim_thickness.get())]
         else:
             if self.stacked_btm.get() == 'yes':
-                bp1 = float(self.btmpanel1_thickness.get())
-                bp2 = float(self.btmpanel2_thickness.get())
+                bp1 = parse_dimstr(self.btmpanel1_thickness.get())
+                bp2 = parse_dimstr(self.btmpanel2_thickness.get())
                 bp_list = [bp1, bp2]
             else:
-                bt = float(self.bottom_thickness.get())
+                bt = parse_dimstr(self.bottom_thickness.get())
                 bp_list = [bt]
-        cab_run = Run(float(self.fullwidth.get()),
-                      float(self.height.get()),
-                      float(self.depth.get()),
+        cab_run = Run(parse_dimstr(self.fullwidth.get()),
+                      parse_dimstr(self.height.get()),
+                      parse_dimstr(self.depth.get()),
                       fillers=Ends.from_string(self.fillers.get()),
                       prim_material=self.prim_material.get(),
-                      prim_thickness=float(self.prim_thickness.get()),
+                      prim_thickness=parse_dimstr(self.prim_thickness.get()),
                       door_material=self.door_material.get(),
-                      door_thickness=float(self.door_thickness.get()),
+                      door_thickness=parse_dimstr(self.door_thickness.get()),
                       btmpanel_thicknesses=bp_list,
                       has_legs=yn_to_bool(self.legs.get()))
-        if self.description.get() != '':
-            self.job = job.Job(self.jobname.get(), cab_run,
-                               self.description.get())
+        self.job = job.Job(self.jobname.get(), cab_run, self.description.get(),
+                           PRECISIONS[self.precision.get()])
+        if self.layout is None:
+            self.display_output(self.job.specification)
         else:
-            self.job = job.Job(self.jobname.get(), cab_run)
-        # Display the computed job specification, ensuring output lines are no
-        # longer than 65 chars.
+            # A layout is showing, so keep it up to date with the job.
+            self.optimize_panel_layout()
+        self.cutlist_button.state(['!disabled'])
+        self.panel_layout_btn.state(['!disabled'])
+
+    def display_output(self, output_lines):
+        """Display the given lines in the output frame."""
+        # Ensure output lines are no longer than 65 chars.
         self.output = ''
-        for line in self.job.specification:
+        for line in output_lines:
             self.output += textwrap.fill(line, width=65) + '\n'
         lines = self.output.count('\n') + 1
         self.output_txt.configure(state='normal')
@@ -569,7 +645,6 @@ class Application(ttk.Frame):
         self.output_txt.insert('end', self.output)
         self.output_txt.configure(state='disabled', height=lines + 1)
         # self.output_txt.grid_configure(pady=0)
-        self.cutlist_button.state(['!disabled'])
 
     def save_cutlist(self):
         """Generate a cutlist pdf for the job and save it in a file."""
@@ -578,10 +653,107 @@ class Application(ttk.Frame):
             parent=self.root,
             filetypes=(('PDF Files', '*.pdf'), ('All Files', '*')))
         if filename != '':
-            cutlist.save_cutlist(filename, self.job)
+            cutlist.save_cutlist(filename, self.job, self.layout)
 
     def optimize_panel_layout(self):
-        """Optimize the panel layout."""
-        pass
+        """Lay out the job's panels on stock sheets and display the layout.
+
+        If the panels of a previous job were laid out, only the panels that
+        changed since are laid out again. Otherwise, the layout cache is
+        checked for a layout of the same panels first. Then a search for a
+        better layout is started, which shows each better layout as it is
+        found, until it ends or the user stops it. If the search is running,
+        stop it instead. The search runs in a worker thread, so that no step
+        of it holds up the window; its progress is passed back through a queue
+        that the window checks every SEARCH_INTERVAL milliseconds.
+        """
+        if self.search is not None:
+            self.stop_search()
+            self.display_layout()
+            return
+        try:
+            if self.layout is None:
+                self.layout = nesting.nest(self.job.parts,
+                                           cache=self.layout_cache)
+            else:
+                self.layout = nesting.renest(self.layout, self.job.parts)
+        except ValueError as exc:
+            self.layout = None
+            self.display_output(self.job.specification
+                                + ['Panel Layout:  ' + str(exc)])
+            return
+        self.display_layout()
+        self.search_cancel = threading.Event()
+        self.search_results = queue.Queue()
+        self.search = threading.Thread(
+            target=self.run_search,
+            args=(self.job.parts, self.search_cancel, self.search_results),
+            daemon=True)
+        self.search.start()
+        self.panel_layout_btn.configure(text='Stop Optimizing')
+        self.after(SEARCH_INTERVAL, self.search_step, self.search_results)
+
+    @staticmethod
+    def run_search(parts, cancel, results):
+        """Run the panel layout search, in a worker thread.
+
+        Put the Progress of each step in the results queue, and then None when
+        the search ends, or stops once cancel is set.
+        """
+        try:
+            for progress in nesting.anytime(parts, cancel=cancel):
+                results.put(progress)
+        finally:
+            results.put(None)
+
+    def search_step(self, results):
+        """Show the progress of the panel layout search since the last check.
+
+        The results are the queue of the search they come from, and are
+        ignored if that search was stopped since.
+        """
+        if results is not self.search_results:
+            return
+        progress = None
+        refresh = False
+        while not results.empty():
+            step = results.get()
+            if step is None:
+                self.stop_search()
+                self.display_layout()
+                return
+            progress = step
+            if progress.layout.num_sheets < self.layout.num_sheets:
+                self.layout = progress.layout
+                refresh = True
+            if progress.step % SEARCH_REFRESH == 0:
+                refresh = True
+        if refresh:
+            self.display_layout(
+                'Optimizing:  {:.1%} yield, at least {} sheets, {:.1f} s'.format(
+                    self.layout.utilization, progress.bound,
+                    progress.elapsed))
+        self.after(SEARCH_INTERVAL, self.search_step, results)
+
+    def stop_search(self):
+        """Stop the panel layout search, if it is running.
+
+        The worker thread is not waited for; it stops after the step it is
+        taking, and its results are ignored.
+        """
+        if self.search is not None:
+            self.search_cancel.set()
+            self.search = None
+            self.search_cancel = None
+            self.search_results = None
+            self.panel_layout_btn.configure(text='Optimize Panel Layout')
+
+    def display_layout(self, status=None):
+        """Display the job and its panel layout, with a status line if any."""
+        lines = (self.job.specification
+                 + nesting.summary(self.layout, self.job.formatter))
+        if status is not None:
+            lines = [status, ''] + lines
+        self.display_output(lines)
 
 # gui.py  ends here
@@ -22,16 +22,81 @@ along with Cabinet Calc.  If not, see <https://www.gnu.org/licenses/>.
 This module implements all the job-related facilities of Cabinet Calc,
 encapsulated in the Job class. A Job object represents a one-off cabinet job
 and holds all of its specifications, i.e. its name (which is its unique
-identifier), its description and a cabinet Run object holding all the parameters
-of its cabinet run, such as dimensions, etc.
+identifier), its description and the cabinet Run objects holding all the
+parameters of its cabinet runs, such as dimensions, etc.
+
+The dimensions in the job specification are given by the job's formatter (see
+dimension_strs.py), in sixteenths of an inch unless another is given.
 """
 
 
-__all__ = ['Job']
+__all__ = ['Job', 'RunInfo']
+
+
+from collections.abc import Mapping
+from functools import cached_property
 
+import numpy as np
 
 from cabinet_calc.cabinet import Ends
-from cabinet_calc.dimension_strs import dimstr, dimstr_col, thickness_str
+from cabinet_calc.dimension_strs import DEFAULT_FORMATTER
+
+
+# The name given to the run of a job constructed with a single Run.
+DEFAULT_RUN_NAME = 'Run 1'
+
+# The label of each part of a run's parts table in the parts list.
+PARTSLIST_LABELS = {'Back': 'Back Panels',
+                    'Bottom': 'Bottom Panels',
+                    'Side': 'Side Panels',
+                    'Nailer': 'Top Nailers',
+                    'Filler': 'Fillers',
+                    'Door': 'Doors'}
+
+
+class RunInfo(object):
+    """The specification of one run of a job, as lists of strings.
+
+    Also holds the RunSpec the strings are computed from, and the RunResult
+    with its computed dimensions. Each of them is computed from the RunSpec
+    when first needed, on its own, so that one that cannot be given does not
+    keep the others from being given.
+    """
+
+    def __init__(self, spec, fmt=DEFAULT_FORMATTER):
+        """Set the RunSpec of the run, and the Formatter of its dimensions."""
+        self.spec = spec
+        self.formatter = fmt
+
+    @cached_property
+    def _cabs(self):
+        """Return a Run built to the specification."""
+        return self.spec.to_run()
+
+    @cached_property
+    def result(self):
+        """Return the computed dimensions of the run, as a RunResult."""
+        return self._cabs.result
+
+    @cached_property
+    def summaryln(self):
+        """Return a very brief summary of the run as a list of strings."""
+        return run_summaryln(self._cabs, self.formatter)
+
+    @cached_property
+    def cabinfo(self):
+        """Return number of cabinets and cabinet width as list of strings."""
+        return run_cabinfo(self._cabs, self.formatter)
+
+    @cached_property
+    def materialinfo(self):
+        """Return the materials needed for the run as a list of strings."""
+        return run_materialinfo(self._cabs, self.formatter)
+
+    @cached_property
+    def partslist(self):
+        """Return a list of parts needed for the run as a list of strings."""
+        return run_partslist(self._cabs, self.formatter)
 
 
 def all_equal(lst):
@@ -40,16 +105,92 @@ def all_equal(lst):
 
 
 class Job(object):
-    """A job with name, an optional description, and a run of cabinets."""
+    """A job with name, an optional description, and runs of cabinets.
+
+    A job has one or more runs of cabinets, e.g. one for each wall of a
+    kitchen, each with a unique name. The job specification of each run is
+    computed when first needed and kept until that run is changed, so editing
+    one run only recomputes that run, and the job totals.
+    """
+
+    def __init__(self, name, cab_run, desc='', formatter=DEFAULT_FORMATTER):
+        """Set the unique Job name, optional description and its Run objects.
 
-    def __init__(self, name, cab_run, desc=''):
-        """Set the unique Job name, optional description and its Run object."""
+        `cab_run' is either a single Run, or a mapping of run names to Runs,
+        in the order they are to appear in the job. `formatter' is the
+        dimension_strs.Formatter that gives the dimensions in the job
+        specification.
+        """
         # Job.name is required and must be unique, as it is the job ID.
         self.name = name
         # A description is optional, and by default is the empty string.
         self.description = desc
-        # For now, each job only has ONE run of cabinets.
-        self.cabs = cab_run
+        if isinstance(cab_run, Mapping):
+            if len(cab_run) == 0:
+                raise ValueError('a job must have at least one run')
+            self.runs = dict(cab_run)
+        else:
+            self.runs = {DEFAULT_RUN_NAME: cab_run}
+        # Per-run specifications, by run name, computed as needed.
+        self._run_info = {}
+        self._formatter = formatter
+
+    @property
+    def formatter(self):
+        """Return the Formatter of the dimensions in the job specification."""
+        return self._formatter
+
+    @formatter.setter
+    def formatter(self, formatter):
+        """Set the Formatter, so that the specifications are computed again."""
+        if formatter != self._formatter:
+            self._formatter = formatter
+            self._run_info.clear()
+
+    @property
+    def cabs(self):
+        """Return the first (and for most jobs, the only) Run of the job."""
+        return next(iter(self.runs.values()))
+
+    @property
+    def multirun(self):
+        """Return True if the job has more than one run of cabinets."""
+        return len(self.runs) > 1
+
+    def add_run(self, name, cab_run):
+        """Add a run of cabinets to the job, under the given unique name."""
+        if name in self.runs:
+            raise ValueError('job already has a run named ' + repr(name))
+        self.runs[name] = cab_run
+
+    def remove_run(self, name):
+        """Remove the named run of cabinets from the job."""
+        if len(self.runs) == 1:
+            raise ValueError('a job must have at least one run')
+        del self.runs[name]
+        self._run_info.pop(name, None)
+
+    def run_info(self, name):
+        """Return the RunInfo of the named run, recomputing it only if needed.
+
+        The parts of the RunInfo are computed as they are used.
+        """
+        spec = self.runs[name].spec
+        info = self._run_info.get(name)
+        if info is None or info.spec != spec:
+            info = RunInfo(spec, self._formatter)
+            self._run_info[name] = info
+        return info
+
+    @property
+    def parts(self):
+        """Return the parts tables of all the runs in the job, as one table."""
+        return np.concatenate([cabs.parts for cabs in self.runs.values()])
+
+    @property
+    def fullwidth(self):
+        """Return the total wall width of all the runs in the job."""
+        return sum(cabs.fullwidth for cabs in self.runs.values())
 
     @property
     def header(self):
@@ -61,129 +202,189 @@ class Job(object):
         result.append('Job Name: ' + self.name)
         if self.description != '':
             result.append('Description: ' + self.description)
-        result.append('Total Wall Space: ' + str(self.cabs.fullwidth) + '"')
+        fmt = self._formatter
+        result.append('Total Wall Space: ' + fmt.decimal_str(self.fullwidth)
+                      + fmt.unit)
         return result
 
     @property
     def summaryln(self):
         """Return a very brief summary of the job as a list of strings."""
-        numcabs = self.cabs.num_cabinets
-        cabwidth = self.cabs.cabinet_width
-        summary = (str(numcabs) + (' cabinet' if numcabs == 1 else ' cabinets') +
-                   ' measuring ' + dimstr(cabwidth) + '" ' + 'totalling ' +
-                   dimstr(cabwidth * numcabs) + '"')
-        if self.cabs.fillers is Ends.NEITHER:
-            summary += (', with finished end panels on left and right.'
-                        ' No filler panels required.')
-        elif self.cabs.fillers is Ends.LEFT:
-            summary += (', with a ' + dimstr(self.cabs.filler_width) +
-                        '" filler on the left.')
-        elif self.cabs.fillers is Ends.RIGHT:
-            summary += (', with a ' + dimstr(self.cabs.filler_width) +
-                        '" filler on the right.')
-        elif self.cabs.fillers is Ends.BOTH:
-            summary += (', with two (2) ' + dimstr(self.cabs.filler_width) +
-                        '" fillers.')
-        else:
-            raise TypeError('fillers is not Ends.NEITHER, .LEFT, .RIGHT,'
-                            ' or .BOTH')
-        if self.cabs.has_legs:
-            summary += (' To be mounted on legs.')
-        return [summary]
+        return self._per_run('summaryln')
 
     @property
     def cabinfo(self):
         """Return number of cabinets needed and cabinet width as list of strings."""
-        result = []
-        result.append('Number of cabinets needed:  ' + str(self.cabs.num_cabinets))
-        result.append('Single cabinet width:  ' + dimstr(self.cabs.cabinet_width) +
-                      '"')
-        return result
+        return self._per_run('cabinfo')
 
     @property
     def materialinfo(self):
         """Return the materials needed for the job as a list of strings."""
+        return self._per_run('materialinfo')
+
+    def run_overview(self, name):
+        """Return an overview of the named run as a list of strings."""
+        info = self.run_info(name)
         result = []
-        result.append('Primary Material:  ' +
-                      thickness_str(self.cabs.prim_thickness) + '" ' +
-                      self.cabs.prim_material)
-        result.append('Door Material:  ' + thickness_str(self.cabs.door_thickness) +
-                      '" ' + self.cabs.door_material)
-        if self.cabs.has_legs:
-            if self.cabs.bottom_stacked:
-                mat_thick_strs = list(
-                    map(thickness_str, self.cabs.btmpanel_thicknesses))
-                if not all_equal(mat_thick_strs):
-                    raise ValueError('stacked bottom panels have different'
-                                     ' thicknesses')
-                mat_thick_str = mat_thick_strs[0]
-                btm_mat_str = ('Bottom Material:  ' + mat_thick_str + '" ' +
-                               self.cabs.prim_material + ', stacked x ' +
-                               str(self.cabs.btmpanels_per_cab))
-            else:
-                mat_thick_str = thickness_str(self.cabs.bottom_thickness)
-                btm_mat_str = ('Bottom Material:  ' + mat_thick_str + '" ' +
-                               self.cabs.prim_material)
-            result.append(btm_mat_str)
+        result.extend(info.summaryln)
+        result.append('')
+        result.extend(info.cabinfo)
+        result.append('')
+        result.extend(info.materialinfo)
         return result
 
     @property
     def overview(self):
         """Return an overview of the job specification as a list of strings."""
         result = []
-        result.extend(self.summaryln)
-        result.append('')
-        result.extend(self.cabinfo)
-        result.append('')
-        result.extend(self.materialinfo)
+        for name in self.runs:
+            if self.multirun:
+                result.extend([self.run_heading(name), ''])
+            result.extend(self.run_overview(name))
         return result
 
     @property
     def partslist(self):
         """Return a list of parts needed for the job as a list of strings."""
+        return self._per_run('partslist')
+
+    def run_heading(self, name):
+        """Return the heading for the named run in a multi-run job."""
+        fmt = self._formatter
+        return ('Run: ' + name + ' ('
+                + fmt.decimal_str(self.runs[name].fullwidth) + fmt.unit + ')')
+
+    @property
+    def totals(self):
+        """Return the totals of all runs in the job as a list of strings."""
+        results = [self.run_info(name).result for name in self.runs]
+
+        def total(field):
+            return sum(getattr(result, field) for result in results)
+
         result = []
-        result.append('Back Panels:     {:2d}  @  {:10s}  x  {:10s}  x  {}'.format(
-            self.cabs.num_backpanels,
-            dimstr_col(self.cabs.back_width) + '"',
-            dimstr_col(self.cabs.back_height) + '"',
-            thickness_str(self.cabs.back_thickness) + '"'))
-        result.append('Bottom Panels:   {:2d}  @  {:10s}  x  {:10s}  x  {}'.format(
-            self.cabs.num_bottompanels,
-            dimstr_col(self.cabs.bottom_width) + '"',
-            dimstr_col(self.cabs.bottom_depth) + '"',
-            (thickness_str(self.cabs.bottom_thickness /
-                           2) if thickness_str(self.cabs.bottom_thickness)
-             == '1 1/2' else thickness_str(self.cabs.bottom_thickness)) + '"'))
-        result.append('Side Panels:     {:2d}  @  {:10s}  x  {:10s}  x  {}'.format(
-            self.cabs.num_sidepanels,
-            dimstr_col(self.cabs.side_depth) + '"',
-            dimstr_col(self.cabs.side_height) + '"',
-            thickness_str(self.cabs.side_thickness) + '"'))
-        result.append('Top Nailers:     {:2d}  @  {:10s}  x  {:10s}  x  {}'.format(
-            self.cabs.num_topnailers,
-            dimstr_col(self.cabs.topnailer_width) + '"',
-            dimstr_col(self.cabs.topnailer_depth) + '"',
-            thickness_str(self.cabs.topnailer_thickness) + '"'))
-        if self.cabs.num_fillers > 0:
-            result.append(
-                'Fillers:         {:2d}  @  {:10s}  x  {:10s}  x  {}'.format(
-                    self.cabs.num_fillers,
-                    dimstr_col(self.cabs.filler_width) + '"',
-                    dimstr_col(self.cabs.filler_height) + '"',
-                    thickness_str(self.cabs.filler_thickness) + '"'))
-        result.append('Doors:           {:2d}  @  {:10s}  x  {:10s}  x  {}'.format(
-            self.cabs.num_doors,
-            dimstr_col(self.cabs.door_width) + '"',
-            dimstr_col(self.cabs.door_height) + '"',
-            thickness_str(self.cabs.door_thickness) + '"'))
+        result.append('Runs:             {:3d}'.format(len(results)))
+        result.append('Cabinets:         {:3d}'.format(total('num_cabinets')))
+        result.append('Back Panels:      {:3d}'.format(total('num_backpanels')))
+        result.append('Bottom Panels:    {:3d}'.format(total('num_bottompanels')))
+        result.append('Side Panels:      {:3d}'.format(total('num_sidepanels')))
+        result.append('Top Nailers:      {:3d}'.format(total('num_topnailers')))
+        if total('num_fillers') > 0:
+            result.append('Fillers:          {:3d}'.format(total('num_fillers')))
+        result.append('Doors:            {:3d}'.format(total('num_doors')))
         return result
 
     @property
     def specification(self):
         """Return a complete specification of the job as a list of strings."""
         sep = '-' * 65
-        result = ([sep] + self.header + [sep] + ['Overview:', ''] + self.overview +
-                  [sep] + ['Parts List:', ''] + self.partslist + [sep])
+        if not self.multirun:
+            return ([sep] + self.header + [sep] + ['Overview:', ''] +
+                    self.overview + [sep] + ['Parts List:', ''] +
+                    self.partslist + [sep])
+        result = [sep] + self.header + [sep]
+        for name in self.runs:
+            result.extend([self.run_heading(name), '', 'Overview:', ''])
+            result.extend(self.run_overview(name))
+            result.extend(['', 'Parts List:', ''])
+            result.extend(self.run_info(name).partslist)
+            result.append(sep)
+        result.extend(['Job Totals:', ''] + self.totals + [sep])
         return result
 
+    def _per_run(self, field):
+        """Return the given RunInfo field of all runs, as one list of strings.
+
+        The strings of each run are preceded by its heading in a multi-run job.
+        """
+        result = []
+        for name in self.runs:
+            if self.multirun:
+                result.append(self.run_heading(name))
+            result.extend(getattr(self.run_info(name), field))
+        return result
+
+
+def run_summaryln(cabs, fmt=DEFAULT_FORMATTER):
+    """Return a very brief summary of a run as a list of strings."""
+    numcabs = cabs.num_cabinets
+    cabwidth = cabs.cabinet_width
+    summary = (str(numcabs) + (' cabinet' if numcabs == 1 else ' cabinets') +
+               ' measuring ' + fmt.dimstr(cabwidth) + fmt.unit + ' ' +
+               'totalling ' + fmt.dimstr(cabwidth * numcabs) + fmt.unit)
+    if cabs.fillers is Ends.NEITHER:
+        summary += (', with finished end panels on left and right.'
+                    ' No filler panels required.')
+    elif cabs.fillers is Ends.LEFT:
+        summary += (', with a ' + fmt.dimstr(cabs.filler_width) + fmt.unit +
+                    ' filler on the left.')
+    elif cabs.fillers is Ends.RIGHT:
+        summary += (', with a ' + fmt.dimstr(cabs.filler_width) + fmt.unit +
+                    ' filler on the right.')
+    elif cabs.fillers is Ends.BOTH:
+        summary += (', with two (2) ' + fmt.dimstr(cabs.filler_width) +
+                    fmt.unit + ' fillers.')
+    else:
+        raise TypeError('fillers is not Ends.NEITHER, .LEFT, .RIGHT,'
+                        ' or .BOTH')
+    if cabs.has_legs:
+        summary += (' To be mounted on legs.')
+    return [summary]
+
+
+def run_cabinfo(cabs, fmt=DEFAULT_FORMATTER):
+    """Return number of cabinets and cabinet width of a run as list of strings."""
+    result = []
+    result.append('Number of cabinets needed:  ' + str(cabs.num_cabinets))
+    result.append('Single cabinet width:  ' + fmt.dimstr(cabs.cabinet_width)
+                  + fmt.unit)
+    return result
+
+
+def run_materialinfo(cabs, fmt=DEFAULT_FORMATTER):
+    """Return the materials needed for a run as a list of strings.
+
+    Stacked bottom panels of different thicknesses are given as each of the
+    thicknesses in the stack, e.g. 3/4" + 1".
+    """
+    result = []
+    result.append('Primary Material:  ' + fmt.thickness_str(cabs.prim_thickness)
+                  + fmt.unit + ' ' + cabs.prim_material)
+    result.append('Door Material:  ' + fmt.thickness_str(cabs.door_thickness)
+                  + fmt.unit + ' ' + cabs.door_material)
+    if cabs.has_legs:
+        if cabs.bottom_stacked:
+            mat_thick_strs = list(map(fmt.thickness_str,
+                                      cabs.btmpanel_thicknesses))
+            if all_equal(mat_thick_strs):
+                mat_thick_str = mat_thick_strs[0]
+            else:
+                mat_thick_str = (fmt.unit + ' + ').join(mat_thick_strs)
+            btm_mat_str = ('Bottom Material:  ' + mat_thick_str + fmt.unit +
+                           ' ' + cabs.prim_material + ', stacked x ' +
+                           str(cabs.btmpanels_per_cab))
+        else:
+            mat_thick_str = fmt.thickness_str(cabs.bottom_thickness)
+            btm_mat_str = ('Bottom Material:  ' + mat_thick_str + fmt.unit +
+                           ' ' + cabs.prim_material)
+        result.append(btm_mat_str)
+    return result
+
+
+def run_partslist(cabs, fmt=DEFAULT_FORMATTER):
+    """Return a list of parts needed for a run as a list of strings.
+
+    There is one line for each record of the run's parts table, so stacked
+    bottom panels of different thicknesses get a line for each thickness.
+    """
+    result = []
+    for part in cabs.parts:
+        result.append('{:17s}{:2d}  @  {:10s}  x  {:10s}  x  {}'.format(
+            PARTSLIST_LABELS[part['name']] + ':',
+            int(part['qty']),
+            fmt.dimstr_col(float(part['width'])) + fmt.unit,
+            fmt.dimstr_col(float(part['height'])) + fmt.unit,
+            fmt.thickness_str(float(part['thickness'])) + fmt.unit))
+    return result
+
 # job.py  ends here
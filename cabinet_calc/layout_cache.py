@@ -0,0 +1,214 @@
+# layout_cache.py                     -*- coding: utf-8; -*-
+
+"""The layout cache module for Cabinet Calc.
+
+Copyright © 2018-2021 Harry H. Toigo II, L33b0
+
+This file is part of Cabinet Calc.
+
+Cabinet Calc is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Cabinet Calc is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Cabinet Calc.  If not, see <https://www.gnu.org/licenses/>.
+
+This module keeps the panel layouts made by the nesting module on disk, so
+that jobs with the same parts as an earlier job need not be laid out again.
+
+A LayoutCache is a store of records, each one a value that can be written as
+JSON, under a key made by content_key() from a description of what the record
+was computed from. The nesting module describes a group of parts by the
+multiset of their sizes, thickness, material and rotation rule, along with
+the sheet size, kerf and algorithm, and stores the layout of the group as its
+record.
+
+The records are kept in an SQLite database. Each use of a record marks it as
+the most recently used, and once the records take up more than the size limit
+of the cache, the least recently used ones are dropped.
+
+SQLiteStore, the base of LayoutCache, holds the connection to such a
+database; the remnants module keeps its inventory with it too.
+"""
+
+
+__all__ = ['CACHE_FILE', 'CACHE_SIZE', 'LayoutCache', 'SQLiteStore',
+           'content_key']
+
+
+import hashlib
+import json
+import os
+import sqlite3
+
+
+# Module constants
+
+# The default database file, in the user's cache directory.
+CACHE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'cabinet-calc', 'layouts.sqlite')
+
+# The default limit on the size of all the records, in bytes.
+CACHE_SIZE = 16 * 1024 * 1024
+
+
+def content_key(content):
+    """Return the key of a record computed from the given content.
+
+    The content must be a value that can be written as JSON. Equal contents
+    always give the same key.
+    """
+    text = json.dumps(content, sort_keys=True, separators=(',', ':'))
+    result = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return result
+
+
+class SQLiteStore:
+    """A store kept in an SQLite database.
+
+    The database is opened, and created if need be, when it is first used.
+    Subclasses give the statements that create its tables, and any indexes,
+    as _SCHEMA.
+    """
+
+    _SCHEMA = ()
+
+    def __init__(self, filename):
+        """Initialize the store.
+
+        :param filename: The name of the database file, or ':memory:' for a
+            store that is not kept
+        :type filename: str
+        """
+        self.filename = filename
+        self._db = None
+
+    def close(self):
+        """Close the database, which is opened again if the store is used."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _connection(self):
+        """Return the connection to the database, opening it if need be."""
+        if self._db is None:
+            directory = os.path.dirname(self.filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.filename, timeout=10.0)
+            with self._db:
+                for statement in self._SCHEMA:
+                    self._db.execute(statement)
+        return self._db
+
+
+class LayoutCache(SQLiteStore):
+    """A persistent store of records with least recently used eviction."""
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS records ('
+        'key TEXT PRIMARY KEY, data TEXT NOT NULL, '
+        'size INTEGER NOT NULL, used INTEGER NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS records_used ON records (used)')
+
+    def __init__(self, filename=CACHE_FILE, max_size=CACHE_SIZE):
+        """Initialize the cache.
+
+        :param filename: The name of the database file
+        :type filename: str, optional
+        :param max_size: The limit on the size of all the records, in bytes
+        :type max_size: int, optional
+        :raises ValueError: If max_size is not positive
+        """
+        if max_size <= 0:
+            raise ValueError('cache size must be positive')
+        super().__init__(filename)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Return the number of records in the cache."""
+        (result,) = self._connection().execute(
+            'SELECT COUNT(*) FROM records').fetchone()
+        return result
+
+    @property
+    def size(self):
+        """Return the total size of the records in the cache, in bytes."""
+        (result,) = self._connection().execute(
+            'SELECT COALESCE(SUM(size), 0) FROM records').fetchone()
+        return result
+
+    def get(self, key):
+        """Return the record stored under the key, or None if there is none.
+
+        The record becomes the most recently used.
+        """
+        db = self._connection()
+        with db:
+            row = db.execute('SELECT data FROM records WHERE key = ?',
+                             (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                result = None
+            else:
+                self.hits += 1
+                db.execute('UPDATE records SET used = ? WHERE key = ?',
+                           (self._next_use(db), key))
+                result = json.loads(row[0])
+        return result
+
+    def put(self, key, record):
+        """Store the record under the key, as the most recently used.
+
+        Then drop the least recently used records until the rest fit in the
+        size limit. A record larger than the limit is not stored at all.
+        """
+        data = json.dumps(record, separators=(',', ':'))
+        if len(data) > self.max_size:
+            return
+        db = self._connection()
+        with db:
+            db.execute('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)',
+                       (key, data, len(data), self._next_use(db)))
+            self._evict(db)
+
+    def clear(self):
+        """Drop all the records from the cache."""
+        db = self._connection()
+        with db:
+            db.execute('DELETE FROM records')
+        self.hits = self.misses = 0
+
+    def _next_use(self, db):
+        """Return the use count that marks a record most recently used."""
+        (result,) = db.execute(
+            'SELECT COALESCE(MAX(used), 0) + 1 FROM records').fetchone()
+        return result
+
+    def _evict(self, db):
+        """Drop the least recently used records until the rest fit."""
+        (total,) = db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM records').fetchone()
+        if total <= self.max_size:
+            return
+        excess = total - self.max_size
+        dropped = []
+        for key, size in db.execute(
+                'SELECT key, size FROM records ORDER BY used'):
+            dropped.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany('DELETE FROM records WHERE key = ?', dropped)
+
+
+# layout_cache.py  ends here
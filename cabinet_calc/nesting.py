@@ -0,0 +1,1631 @@
+# nesting.py                          -*- coding: utf-8; -*-
+
+"""The nesting module for Cabinet Calc.
+
+Copyright © 2018-2021 Harry H. Toigo II, L33b0
+
+This file is part of Cabinet Calc.
+
+Cabinet Calc is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Cabinet Calc is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Cabinet Calc.  If not, see <https://www.gnu.org/licenses/>.
+
+This module lays out, or nests, the panels of cabinet jobs on stock sheets,
+so that they can be cut with as few sheets as possible.
+
+Its main interface is the function nest(parts), which accepts a parts table
+(see Run.parts and Job.parts) or a list of Pieces, and returns a Layout of all
+the sheets needed. Parts of different materials or thicknesses never share a
+sheet, so each (material, thickness) group is nested on its own.
+
+To cut several jobs on the same day, nest_jobs(jobs) pools the parts of all
+of them, so that parts of different jobs share sheets, and tags each piece
+with the name of its job, for labeling.
+
+Sheets are laid out with their width along x and their length along y, and
+the grain of the sheet runs along its length. Each cut removes the kerf. The
+layouts of guillotine() and random_restarts() are guillotine layouts, i.e.
+every part can be cut free by a sequence of straight cuts right across the
+remaining piece, as on a panel saw. Those of maxrects() and skyline() often
+use fewer sheets, but may need cuts that stop part way, as on a CNC router.
+
+Long searches need not keep their caller waiting: anytime(parts) is a
+generator that yields the best layout found so far after every step of its
+search, with its Progress, and stops whenever its caller stops asking.
+
+When a job changes, renest(layout, parts) keeps what it can of the previous
+layout, and moves only the parts that changed.
+
+For small jobs, of up to about three cabinets, exact() searches for a layout
+with the fewest sheets possible. anytime() and portfolio() try it on groups of
+parts that small, and so does nest() if it is asked to with algorithm='auto';
+by default nest() uses guillotine(), which is fast enough to wait for.
+
+Since no one algorithm is best on every job, portfolio(parts, deadline) races
+them all in a pool of processes and keeps the best layout found in time.
+Given max_workers, nest() lays out the (material, thickness) groups in a pool
+of processes too, all at once, so that it takes about as long as the largest
+group.
+
+Both nest() and portfolio() can be given a LayoutCache (see layout_cache.py),
+where they look up the layout of each group of parts before making it, and
+save the layouts they make. nest() can also be given a RemnantStore (see
+remnants.py), and then it puts as many parts as it can on offcuts left from
+earlier jobs before it opens new sheets.
+"""
+
+
+__all__ = ['RANDOM_RESTARTS', 'RENEST_THRESHOLD', 'REMNANT_CHOICES',
+           'EXACT_MAX_PIECES', 'EXACT_NODE_LIMIT', 'EXACT_TIME_LIMIT',
+           'ALGORITHMS', 'PORTFOLIO_ALGORITHMS', 'Rotation', 'Piece',
+           'Placement', 'SheetLayout', 'Layout', 'Progress', 'expand_parts',
+           'nest', 'nest_jobs', 'renest', 'portfolio', 'anytime', 'guillotine',
+           'maxrects', 'skyline', 'random_restarts', 'exact', 'lower_bound',
+           'offcuts', 'summary']
+
+
+import math
+import os
+import random
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait
+from enum import Enum
+
+from cabinet_calc.cabinet import MATERIALS
+from cabinet_calc.dimension_strs import DEFAULT_FORMATTER
+from cabinet_calc.layout_cache import content_key
+from cabinet_calc.takeoff import SHEET_WIDTH, SHEET_LENGTH, DEFAULT_KERF
+from cabinet_calc.takeoff import _EPSILON, _fits
+
+
+# Module constants
+
+# The most orders tried by each call of random_restarts().
+RANDOM_RESTARTS = 200
+
+# The fraction of a group's previous yield that renest() must keep, or else it
+# lays out the group again from scratch.
+RENEST_THRESHOLD = 0.95
+
+# The largest group of pieces that anytime() lays out with exact(), and nest()
+# with algorithm='auto': enough for the primary panels of three cabinets on
+# legs.
+EXACT_MAX_PIECES = 24
+
+# The most remnants nest() considers for each kind of piece, smallest first.
+REMNANT_CHOICES = 10
+
+# The most nodes exact() searches, and the most time it takes, in seconds,
+# before it settles for the best layout found so far.
+EXACT_NODE_LIMIT = 20000
+EXACT_TIME_LIMIT = 0.25
+
+
+class Rotation(Enum):
+    """The ways a piece may be turned when it is laid out on a sheet.
+
+    It must be one of:
+        FIXED - the piece's height runs along the length of the sheet
+        TURNED - the piece's width runs along the length of the sheet
+        FREE - either way
+    """
+
+    FIXED = 1
+    TURNED = 2
+    FREE = 3
+
+    def __str__(self):
+        """Return a member's name as a string for its string representation."""
+        return self.name
+
+    @staticmethod
+    def from_grain(grain):
+        """Return the Rotation that keeps a part's grain along the sheet's.
+
+        The grain is as in the parts table: 'V' along the part's height, 'H'
+        along its width, and '' if it does not matter.
+        """
+        if grain == 'V':
+            result = Rotation.FIXED
+        elif grain == 'H':
+            result = Rotation.TURNED
+        elif grain == '':
+            result = Rotation.FREE
+        else:
+            raise ValueError('grain is not one of "V", "H" or ""')
+        return result
+
+    @property
+    def orientations(self):
+        """Return the allowed values of Placement.rotated, as a tuple."""
+        if self is Rotation.FIXED:
+            result = (False,)
+        elif self is Rotation.TURNED:
+            result = (True,)
+        else:
+            result = (False, True)
+        return result
+
+
+class Piece(namedtuple('Piece', [
+        'name', 'width', 'height', 'thickness', 'material', 'rotation', 'tag'],
+        defaults=(Rotation.FREE, None))):
+    """A single part to be cut from a sheet, as an immutable record.
+
+    The width and height are as in the parts table, and rotation is the
+    Rotation that the part allows. The tag is free for the caller's use, e.g.
+    to tell which job a piece belongs to.
+    """
+
+    __slots__ = ()
+
+    @property
+    def area(self):
+        """Return the area of the piece, in square inches."""
+        return self.width * self.height
+
+
+class Placement(namedtuple('Placement', ['piece', 'x', 'y', 'rotated'])):
+    """A piece laid out on a sheet, with its lower left corner at (x, y).
+
+    If rotated is True, the piece is turned so its width runs along y.
+    """
+
+    __slots__ = ()
+
+    @property
+    def width(self):
+        """Return the extent of the placed piece along x."""
+        return self.piece.height if self.rotated else self.piece.width
+
+    @property
+    def height(self):
+        """Return the extent of the placed piece along y."""
+        return self.piece.width if self.rotated else self.piece.height
+
+
+class SheetLayout(namedtuple('SheetLayout', [
+        'material', 'thickness', 'width', 'length', 'placements', 'remnant'],
+        defaults=(None,))):
+    """The layout of pieces on one sheet, as an immutable record.
+
+    The remnant is the id of the remnant the sheet is, if it is one, in the
+    RemnantStore it was taken from, or None if it is a new stock sheet.
+    """
+
+    __slots__ = ()
+
+    @property
+    def area(self):
+        """Return the area of the sheet, in square inches."""
+        return self.width * self.length
+
+    @property
+    def used_area(self):
+        """Return the total area of the pieces on the sheet."""
+        return sum(p.piece.area for p in self.placements)
+
+    @property
+    def utilization(self):
+        """Return the yield of the sheet, the fraction of it used by pieces."""
+        return self.used_area / self.area
+
+
+class Layout(namedtuple('Layout', ['sheets', 'kerf'])):
+    """The layout of all the pieces of a job on sheets, as an immutable record.
+
+    The sheets are grouped by material, in the order of MATERIALS, and then by
+    thickness.
+    """
+
+    __slots__ = ()
+
+    @property
+    def num_sheets(self):
+        """Return the number of sheets used."""
+        return len(self.sheets)
+
+    @property
+    def num_pieces(self):
+        """Return the number of pieces laid out on all the sheets."""
+        return sum(len(sheet.placements) for sheet in self.sheets)
+
+    @property
+    def utilization(self):
+        """Return the overall yield, the fraction of all sheets used."""
+        area = sum(sheet.area for sheet in self.sheets)
+        return (sum(sheet.used_area for sheet in self.sheets) / area
+                if area else 0.0)
+
+
+class Progress(namedtuple('Progress', [
+        'layout', 'bound', 'elapsed', 'step', 'steps', 'improved'])):
+    """The progress of a search by anytime(), as an immutable record.
+
+    The layout is the best found so far, and bound is the fewest sheets that
+    any layout could use, as shown by lower_bound(). The search has taken
+    elapsed seconds, and step of at most steps steps, and improved is True if
+    the layout is better than at the step before.
+    """
+
+    __slots__ = ()
+
+    @property
+    def utilization(self):
+        """Return the yield of the best layout found so far."""
+        return self.layout.utilization
+
+    @property
+    def optimal(self):
+        """Return True if the layout is known to use the fewest sheets."""
+        return self.layout.num_sheets <= self.bound
+
+
+def expand_parts(parts, tag=None):
+    """Return a list of Pieces, one for every part in a parts table.
+
+    The rotation of each piece keeps its grain along that of the sheet.
+    """
+    result = []
+    for part in parts:
+        piece = Piece(str(part['name']), float(part['width']),
+                      float(part['height']), float(part['thickness']),
+                      str(part['material']),
+                      Rotation.from_grain(str(part['grain'])), tag)
+        result.extend([piece] * int(part['qty']))
+    return result
+
+
+def nest(parts, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+         algorithm='guillotine', cache=None, remnants=None, max_workers=1,
+         executor=None):
+    """Lay out all the parts on as few sheets as possible.
+
+    :param parts: The parts to lay out
+    :type parts: numpy.ndarray of PART_DTYPE records, or [Piece]
+    :param sheet: The width and length of a stock sheet
+    :type sheet: (float, float), optional
+    :param kerf: The width of the saw cut
+    :type kerf: float, optional
+    :param algorithm: The name of the algorithm in ALGORITHMS to use, or
+        'auto' to use exact() on groups of up to EXACT_MAX_PIECES pieces and
+        guillotine() on larger ones, which can take up to EXACT_TIME_LIMIT
+        seconds for each group
+    :type algorithm: str, optional
+    :param cache: The cache to look up layouts in, and save them in
+    :type cache: LayoutCache, optional
+    :param remnants: The inventory of remnants to use first, by guillotine
+        packing, before the rest of the parts are laid out on new sheets; the
+        inventory itself is left as it is
+    :type remnants: RemnantStore, optional
+    :param max_workers: The number of worker processes to lay out groups in
+        at once, or None for the number of processors; with the default of 1,
+        the groups are laid out one after another in this process
+    :type max_workers: int, optional
+    :param executor: A pool of processes to lay out the groups in, instead of
+        starting one
+    :type executor: concurrent.futures.Executor, optional
+    :return: The layout of the parts on sheets
+    :rtype: Layout
+    :raises ValueError: If a part will not fit on a sheet
+    """
+    buckets = _buckets(_pieces(parts))
+    sheets = [[] for _ in buckets]
+    # The groups still to lay out, as tuples (index, algorithm, key, pieces).
+    todo = []
+    for i, bucket in enumerate(buckets):
+        if remnants is not None:
+            used, bucket = _use_remnants(bucket, remnants, sheet, kerf)
+            sheets[i].extend(used)
+            if not bucket:
+                continue
+        name = _algorithm_name(algorithm, bucket)
+        key = _cache_key(name, bucket, sheet, kerf)
+        cached = _cache_get(cache, key, bucket)
+        if cached is None:
+            todo.append((i, name, key, bucket))
+        else:
+            sheets[i].extend(cached)
+    laid_out = _lay_out([(name, bucket) for _, name, _, bucket in todo],
+                        sheet, kerf, max_workers, executor)
+    for (i, _, key, bucket), (result, complete) in zip(todo, laid_out):
+        # A layout that exact() ran out of nodes or time on may be bettered
+        # another time, so it is not cached.
+        if complete:
+            _cache_put(cache, key, result, bucket)
+        sheets[i].extend(result)
+    return Layout(tuple(s for group in sheets for s in group), kerf)
+
+
+def nest_jobs(jobs, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+              algorithm='guillotine', cache=None, remnants=None, max_workers=1,
+              executor=None):
+    """Lay out the parts of several jobs together, on shared sheets.
+
+    All the parts of the same material and thickness, from every job, are
+    pooled and laid out as one group, which takes fewer sheets overall than
+    laying out each job on its own. Each piece is tagged with the name of its
+    job.
+
+    :param jobs: The jobs to lay out
+    :type jobs: [Job]
+    :param sheet: The width and length of a stock sheet
+    :type sheet: (float, float), optional
+    :param kerf: The width of the saw cut
+    :type kerf: float, optional
+    :param algorithm: The name of the algorithm to use, as for nest()
+    :type algorithm: str, optional
+    :param cache: The cache to look up layouts in, and save them in
+    :type cache: LayoutCache, optional
+    :param remnants: The inventory of remnants to use first, as for nest()
+    :type remnants: RemnantStore, optional
+    :param max_workers: The number of worker processes, as for nest()
+    :type max_workers: int, optional
+    :param executor: A pool of processes to use, as for nest()
+    :type executor: concurrent.futures.Executor, optional
+    :return: The layout of the parts of all the jobs on sheets
+    :rtype: Layout
+    :raises ValueError: If two jobs have the same name, or a part will not fit
+        on a sheet
+    """
+    pieces = []
+    names = set()
+    for job in jobs:
+        if job.name in names:
+            raise ValueError('more than one job named {}'.format(job.name))
+        names.add(job.name)
+        pieces.extend(expand_parts(job.parts, job.name))
+    result = nest(pieces, sheet, kerf, algorithm, cache, remnants,
+                  max_workers, executor)
+    return result
+
+
+def renest(layout, parts, sheet=(SHEET_WIDTH, SHEET_LENGTH),
+           threshold=RENEST_THRESHOLD, algorithm='guillotine'):
+    """Lay out the parts again, changing a previous layout as little as possible.
+
+    This is for when a job changes, say its door thickness or its fillers, and
+    only some of its parts change with it. The placements of parts that are
+    still in the job are kept where they are, and only the parts that are new
+    or that changed size are laid out again, in the free space left on the
+    previous sheets and then on new ones, by guillotine packing. If that leaves
+    the yield of a (material, thickness) group below the threshold times its
+    previous yield, the group is laid out from scratch with the algorithm, and
+    the better of the two layouts is kept. Groups that are new are laid out
+    from scratch, and the sheets of groups no longer in the job are dropped.
+
+    :param layout: The previous layout, whose kerf is used again
+    :type layout: Layout
+    :param parts: The parts to lay out
+    :type parts: numpy.ndarray of PART_DTYPE records, or [Piece]
+    :param sheet: The width and length of a new stock sheet
+    :type sheet: (float, float), optional
+    :param threshold: The fraction of its previous yield a group must keep
+    :type threshold: float, optional
+    :param algorithm: The name of the algorithm to use to lay out a group from
+        scratch, as for nest()
+    :type algorithm: str, optional
+    :return: The layout of the parts on sheets
+    :rtype: Layout
+    :raises ValueError: If a part will not fit on a sheet
+    """
+    previous = {}
+    for old in layout.sheets:
+        previous.setdefault((old.material, old.thickness), []).append(old)
+    sheets = []
+    for bucket in _buckets(_pieces(parts)):
+        key = (bucket[0].material, bucket[0].thickness)
+        sheets.extend(_renest_bucket(previous.get(key, []), bucket, sheet,
+                                     layout.kerf, threshold, algorithm))
+    return Layout(tuple(sheets), layout.kerf)
+
+
+def portfolio(parts, deadline, sheet=(SHEET_WIDTH, SHEET_LENGTH),
+              kerf=DEFAULT_KERF, algorithms=None, max_workers=None,
+              executor=None, cache=None):
+    """Lay out all the parts with the best of several algorithms.
+
+    Each of the algorithms, by default those of PORTFOLIO_ALGORITHMS, is run on
+    every (material, thickness) group of the parts, in parallel in a pool of
+    processes, with random_restarts() run once per worker with a different
+    seed. Every algorithm is given the deadline, and stops at it. Of the
+    layouts of each group that are ready by the deadline, only guillotine
+    layouts are kept, so that the result can always be cut on a panel saw (see
+    cutting.py): the sheets of a maxrects() or skyline() layout that are not
+    guillotine layouts have their pieces laid out again by guillotine packing,
+    in the space left on its other sheets and then on new sheets. Of those
+    layouts, the best is kept: the one with the fewest sheets, and
+    then with the least used on its emptiest sheet, leaving the largest offcut.
+    The plain guillotine() layout is made too, while the pool works, so there
+    is always a result, however short the deadline. A group whose layout is in
+    the cache is not laid out again. A layout is only saved in the cache once
+    every algorithm has finished on its group by the deadline, so that a layout
+    cut short by a short deadline is not returned by a later call with a longer
+    one.
+
+    :param parts: The parts to lay out
+    :type parts: numpy.ndarray of PART_DTYPE records, or [Piece]
+    :param deadline: The time allowed, in seconds
+    :type deadline: float
+    :param algorithms: The names of the algorithms in ALGORITHMS to race,
+        defaults to PORTFOLIO_ALGORITHMS
+    :type algorithms: [str], optional
+    :param max_workers: The number of worker processes, defaults to the number
+        of processors
+    :type max_workers: int, optional
+    :param executor: A pool of processes to use instead of starting one, e.g.
+        to keep it warm between calls on a server
+    :type executor: concurrent.futures.Executor, optional
+    :param cache: The cache to look up layouts in, and save them in
+    :type cache: LayoutCache, optional
+    :return: The best guillotine layout of the parts on sheets
+    :rtype: Layout
+    :raises ValueError: If a part will not fit on a sheet
+    """
+    end = time.time() + deadline
+    buckets = _buckets(_pieces(parts))
+    names = list(PORTFOLIO_ALGORITHMS if algorithms is None else algorithms)
+    keys = [_cache_key(['portfolio'] + sorted(names), bucket, sheet, kerf)
+            for bucket in buckets]
+    best = [_cache_get(cache, key, bucket)
+            for key, bucket in zip(keys, buckets)]
+    todo = [i for i, sheets in enumerate(best) if sheets is None]
+    for i in todo:
+        # Raise ValueError for a part that will not fit before starting work.
+        for piece in buckets[i]:
+            _check_fit(piece, *sheet)
+    workers = max_workers or os.cpu_count() or 1
+    pool = (executor or ProcessPoolExecutor(workers)) if todo else None
+    futures = {}
+    cut_short = set()
+    try:
+        # The fast algorithms are submitted first, so that they get the
+        # workers first when the deadline is short.
+        for name in sorted(names, key=lambda name: name in ('random', 'exact')):
+            for i in todo:
+                for seed in range(workers if name == 'random' else 1):
+                    future = pool.submit(_run_algorithm, name, buckets[i],
+                                         sheet, kerf, seed, end)
+                    futures[future] = i
+        # Make the fallback while the pool works.
+        for i in todo:
+            best[i] = guillotine(buckets[i], sheet, kerf)
+        done, not_done = wait(futures, timeout=max(0.0, end - time.time()))
+        cut_short.update(futures[future] for future in not_done)
+        for future in done:
+            i = futures[future]
+            if future.exception() is not None:
+                cut_short.add(i)
+                continue
+            sheets, finished = future.result()
+            if not finished:
+                cut_short.add(i)
+            if (sheets is not None
+                    and _layout_key(sheets) < _layout_key(best[i])):
+                best[i] = sheets
+    finally:
+        if executor is None and pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            for future in futures:
+                future.cancel()
+    for i in todo:
+        if i not in cut_short:
+            _cache_put(cache, keys[i], best[i], buckets[i])
+    return Layout(tuple(sheet for sheets in best for sheet in sheets), kerf)
+
+
+def anytime(parts, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+            deadline=None, restarts=RANDOM_RESTARTS, seed=0, cancel=None):
+    """Lay out all the parts, yielding better and better layouts as it goes.
+
+    This is a generator, which does one step of the search each time it is
+    resumed, and then yields its Progress. The first step lays out every
+    (material, thickness) group with guillotine(). Each of the rest tries one
+    more algorithm on one group: maxrects(), skyline() and, on small groups,
+    exact(), and then orders of the pieces as in random_restarts(), taking the
+    groups in turn. The best guillotine layout of each group is kept, as in
+    portfolio(), so every layout yielded can be cut on a panel saw, and a
+    group is left alone once it meets its lower bound. No step takes
+    much longer than EXACT_TIME_LIMIT seconds on a job of a few runs, so the
+    caller can show each layout as it improves, e.g. from the event loop of a
+    GUI, and stop whenever the layout is good enough, by not resuming the
+    generator.
+
+    :param parts: The parts to lay out
+    :type parts: numpy.ndarray of PART_DTYPE records, or [Piece]
+    :param sheet: The width and length of a stock sheet
+    :type sheet: (float, float), optional
+    :param kerf: The width of the saw cut
+    :type kerf: float, optional
+    :param deadline: The time allowed, in seconds, after which the search
+        stops, defaults to no limit
+    :type deadline: float, optional
+    :param restarts: The most orders of the pieces of each group to try
+    :type restarts: int, optional
+    :param seed: The seed of the random numbers
+    :type seed: int, optional
+    :param cancel: An event, such as a threading.Event, which stops the search
+        once it is set, for when the generator runs in another thread
+    :type cancel: threading.Event, optional
+    :return: The progress after each step
+    :rtype: generator of Progress
+    :raises ValueError: If a part will not fit on a sheet
+    """
+    start = time.time()
+    end = None if deadline is None else start + deadline
+    buckets = _buckets(_pieces(parts))
+    bounds = [lower_bound(bucket, sheet, kerf) for bucket in buckets]
+    best = [guillotine(bucket, sheet, kerf) for bucket in buckets]
+    steps = []
+    for i, bucket in enumerate(buckets):
+        steps.extend((i, name) for name in ('maxrects', 'skyline'))
+        if len(bucket) <= EXACT_MAX_PIECES:
+            steps.append((i, 'exact'))
+    steps.extend((i, 'random') for _ in range(restarts - 1)
+                 for i in range(len(buckets)))
+    rng = random.Random(seed)
+
+    def progress(step, improved):
+        layout = Layout(tuple(s for sheets in best for s in sheets), kerf)
+        return Progress(layout, sum(bounds), time.time() - start, step,
+                        len(steps) + 1, improved)
+
+    yield progress(1, True)
+    for step, (i, name) in enumerate(steps, 2):
+        if ((cancel is not None and cancel.is_set())
+                or (end is not None and time.time() >= end)
+                or all(len(b) <= n for b, n in zip(best, bounds))):
+            return
+        if len(best[i]) <= bounds[i]:
+            continue
+        if name == 'random':
+            sheets = _guillotine(_shuffled(buckets[i], rng), sheet, kerf)
+        elif name == 'exact':
+            limit = time.time() + EXACT_TIME_LIMIT
+            try:
+                sheets = exact(buckets[i], sheet, kerf, deadline=(
+                    limit if end is None else min(end, limit)))
+            except TimeoutError:
+                sheets = None
+        else:
+            sheets = ALGORITHMS[name](buckets[i], sheet, kerf)
+        improved = (sheets is not None and _is_guillotine(sheets, kerf)
+                    and _layout_key(sheets) < _layout_key(best[i]))
+        if improved:
+            best[i] = sheets
+        yield progress(step, improved)
+
+
+def guillotine(pieces, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+               deadline=None):
+    """Lay out pieces of one material and thickness by guillotine packing.
+
+    The pieces are taken largest first, and each goes into the free rectangle
+    it fills best, on any sheet opened so far, in any orientation it allows.
+    The rest of the free rectangle is then split in two along its shorter
+    leftover side, less the kerf. A new sheet is opened only when a piece fits
+    nowhere else.
+
+    :param deadline: The time.time() by which to finish, defaults to no limit
+    :type deadline: float, optional
+    :return: The layouts of the sheets, in the order they were opened
+    :rtype: [SheetLayout]
+    :raises ValueError: If a piece will not fit on a sheet
+    :raises TimeoutError: If the deadline passes before the layout is done
+    """
+    result = _guillotine(sorted(pieces, key=_size_key, reverse=True), sheet,
+                         kerf, deadline=deadline)
+    return result
+
+
+def random_restarts(pieces, sheet=(SHEET_WIDTH, SHEET_LENGTH),
+                    kerf=DEFAULT_KERF, restarts=RANDOM_RESTARTS, seed=0,
+                    deadline=None):
+    """Lay out pieces by guillotine packing, trying many orders of the pieces.
+
+    The first order is that of guillotine(). In each of the others, the area of
+    each piece is scaled by a random factor of up to 15% either way before they
+    are sorted. The best layout is kept, as in portfolio().
+
+    :param restarts: The number of orders to try
+    :type restarts: int, optional
+    :param seed: The seed of the random numbers
+    :type seed: int, optional
+    :param deadline: The time.time() at which to stop, if sooner
+    :type deadline: float, optional
+    :return: The layouts of the sheets
+    :rtype: [SheetLayout]
+    :raises ValueError: If a piece will not fit on a sheet
+    :raises TimeoutError: If the deadline passes before the first layout is
+        done
+    """
+    rng = random.Random(seed)
+    result = guillotine(pieces, sheet, kerf, deadline)
+    for _ in range(restarts - 1):
+        if deadline is not None and time.time() >= deadline:
+            break
+        sheets = _guillotine(_shuffled(pieces, rng), sheet, kerf)
+        if _layout_key(sheets) < _layout_key(result):
+            result = sheets
+    return result
+
+
+def maxrects(pieces, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+             deadline=None):
+    """Lay out pieces of one material and thickness by MaxRects packing.
+
+    The free space of each sheet is kept as the list of all the largest empty
+    rectangles, which overlap. The pieces are taken largest first, and each
+    goes where the shorter of the sides left over beside it is least (best
+    short side fit), on any sheet opened so far. The layout may not be a
+    guillotine layout.
+
+    :param deadline: The time.time() by which to finish, defaults to no limit
+    :type deadline: float, optional
+    :return: The layouts of the sheets, in the order they were opened
+    :rtype: [SheetLayout]
+    :raises ValueError: If a piece will not fit on a sheet
+    :raises TimeoutError: If the deadline passes before the layout is done
+    """
+    width, length = sheet
+    pieces = sorted(pieces, key=_size_key, reverse=True)
+    for piece in pieces:
+        _check_fit(piece, width, length)
+    # Every piece takes up its size plus the kerf, on a sheet that much larger.
+    free = []
+    placed = []
+    for piece in pieces:
+        _check_deadline(deadline)
+        best = None
+        for s, rects in enumerate(free):
+            for rect in rects:
+                for rotated in piece.rotation.orientations:
+                    pw, ph = _placed_size(piece, rotated)
+                    w, h = rect[2] - pw - kerf, rect[3] - ph - kerf
+                    if w < -_EPSILON or h < -_EPSILON:
+                        continue
+                    score = (min(w, h), max(w, h))
+                    if best is None or score < best[0]:
+                        best = (score, s, rect, rotated)
+        if best is None:
+            free.append([(0.0, 0.0, width + kerf, length + kerf)])
+            placed.append([])
+            rotated = next(rot for rot in piece.rotation.orientations
+                           if _fit_score(piece, rot,
+                                         (0.0, 0.0, width, length)))
+            best = (None, len(free) - 1, free[-1][0], rotated)
+        _, s, (x, y, _, _), rotated = best
+        placement = Placement(piece, x, y, rotated)
+        placed[s].append(placement)
+        used = (x, y, placement.width + kerf, placement.height + kerf)
+        free[s] = _prune([r for rect in free[s]
+                          for r in _subtract(rect, used)])
+    result = [SheetLayout(pieces[0].material, pieces[0].thickness, width,
+                          length, tuple(p)) for p in placed]
+    return result
+
+
+def skyline(pieces, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+            deadline=None):
+    """Lay out pieces of one material and thickness by skyline packing.
+
+    Each sheet is filled from the bottom up, keeping only the outline of the
+    tops of the pieces placed so far. The pieces are taken largest first, and
+    each goes where its top is lowest, and then furthest left (bottom left),
+    on any sheet opened so far. The space under the outline is given up. The
+    layout may not be a guillotine layout.
+
+    :param deadline: The time.time() by which to finish, defaults to no limit
+    :type deadline: float, optional
+    :return: The layouts of the sheets, in the order they were opened
+    :rtype: [SheetLayout]
+    :raises ValueError: If a piece will not fit on a sheet
+    :raises TimeoutError: If the deadline passes before the layout is done
+    """
+    width, length = sheet
+    pieces = sorted(pieces, key=_size_key, reverse=True)
+    for piece in pieces:
+        _check_fit(piece, width, length)
+    # Each skyline is a list of segments [x, y, w], left to right. As in
+    # maxrects(), pieces take up their size plus the kerf.
+    lines = []
+    placed = []
+    for piece in pieces:
+        _check_deadline(deadline)
+        best = None
+        for s, line in enumerate(lines):
+            for rotated in piece.rotation.orientations:
+                pw, ph = _placed_size(piece, rotated)
+                fit = _skyline_fit(line, pw + kerf, ph + kerf, length + kerf)
+                if fit is not None and (best is None or fit < best[0]):
+                    best = (fit, s, rotated)
+        if best is None:
+            lines.append([[0.0, 0.0, width + kerf]])
+            placed.append([])
+            for rotated in piece.rotation.orientations:
+                pw, ph = _placed_size(piece, rotated)
+                fit = _skyline_fit(lines[-1], pw + kerf, ph + kerf,
+                                   length + kerf)
+                if fit is not None and (best is None or fit < best[0]):
+                    best = (fit, len(lines) - 1, rotated)
+        (top, x, i), s, rotated = best
+        pw, ph = _placed_size(piece, rotated)
+        placed[s].append(Placement(piece, x, top - ph - kerf, rotated))
+        _skyline_add(lines[s], i, pw + kerf, top)
+    result = [SheetLayout(pieces[0].material, pieces[0].thickness, width,
+                          length, tuple(p)) for p in placed]
+    return result
+
+
+def exact(pieces, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+          node_limit=EXACT_NODE_LIMIT, deadline=None):
+    """Lay out pieces of one material and thickness on the fewest sheets.
+
+    This is a branch and bound search, which starts from the layout of
+    guillotine(). It tries every way of putting each piece, largest first, in
+    the lower left corner of a free rectangle, in any orientation it allows, on
+    any sheet opened so far or on a new one, and then splitting the rest of the
+    rectangle either way. A branch is cut off as soon as lower_bound() shows
+    it cannot use fewer sheets than the best layout found so far, and the
+    search stops as soon as a layout meets the lower bound for all the pieces.
+    Unless it runs out of nodes or time first, the layout uses the fewest
+    sheets of any guillotine layout made that way. The search is exponential,
+    so it is meant for small jobs only.
+
+    :param node_limit: The most nodes to search
+    :type node_limit: int, optional
+    :param deadline: The time.time() at which to stop, defaults to
+        EXACT_TIME_LIMIT seconds from now
+    :type deadline: float, optional
+    :return: The layouts of the sheets, in the order they were opened
+    :rtype: [SheetLayout]
+    :raises ValueError: If a piece will not fit on a sheet
+    :raises TimeoutError: If the deadline passes before the guillotine()
+        layout it starts from is done
+    """
+    result = _exact(pieces, sheet, kerf, node_limit, deadline)[0]
+    return result
+
+
+def lower_bound(pieces, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF):
+    """Return the fewest sheets that pieces of one material could be laid on.
+
+    This is the largest of three bounds. Pieces wider than half the sheet, in
+    any orientation they allow, cannot be side by side, so they need at least
+    enough sheets for their lengths laid end to end, and likewise for pieces
+    longer than half the sheet. A piece both that wide and that long needs a
+    sheet of its own, and the other pieces need at least enough sheets for
+    their area beyond what is left on those sheets. Each piece takes up its
+    size plus the kerf, on a sheet that much larger.
+    """
+    width, length = sheet
+    capacity = (width + kerf) * (length + kerf)
+    large = 0
+    spare = 0.0
+    area = 0.0
+    wide = 0.0
+    long = 0.0
+    for piece in pieces:
+        sizes = [_placed_size(piece, rotated)
+                 for rotated in piece.rotation.orientations]
+        is_wide = all(pw > (width - kerf) / 2 + _EPSILON for pw, _ in sizes)
+        is_long = all(ph > (length - kerf) / 2 + _EPSILON for _, ph in sizes)
+        if is_wide:
+            wide += min(ph for _, ph in sizes) + kerf
+        if is_long:
+            long += min(pw for pw, _ in sizes) + kerf
+        if is_wide and is_long:
+            large += 1
+            spare += capacity - _kerf_area(piece.width, piece.height, kerf)
+        else:
+            area += _kerf_area(piece.width, piece.height, kerf)
+    result = max(
+        large + max(0, math.ceil((area - spare) / capacity - _EPSILON)),
+        math.ceil(wide / (length + kerf) - _EPSILON),
+        math.ceil(long / (width + kerf) - _EPSILON))
+    return result
+
+
+# The layout algorithms, by name. Each lays out a list of pieces of one
+# material and thickness, given the sheet size and the kerf, and stops at a
+# deadline if it is given one.
+ALGORITHMS = {'guillotine': guillotine,
+              'maxrects': maxrects,
+              'skyline': skyline,
+              'random': random_restarts,
+              'exact': exact}
+
+# The algorithms that portfolio() races unless it is given others. guillotine()
+# is left out, as portfolio() makes its layout anyway.
+PORTFOLIO_ALGORITHMS = ('maxrects', 'skyline', 'random', 'exact')
+
+
+def offcuts(sheet, kerf=DEFAULT_KERF):
+    """Return the free rectangles left on a sheet, largest first.
+
+    Each is a tuple (x, y, width, length). The free space of a sheet that is
+    not a guillotine layout is not known, and none is returned for it.
+    """
+    result = sorted(_free_rects(sheet, kerf), key=lambda r: (-r[2] * r[3], r))
+    return result
+
+
+def summary(layout, fmt=DEFAULT_FORMATTER):
+    """Return the layout of each sheet as a list of strings.
+
+    :param fmt: The formatter of the dimensions
+    :type fmt: dimension_strs.Formatter, optional
+    """
+    u = fmt.unit
+    result = []
+    result.append('Panel Layout:  {} {}, {:.1%} yield'.format(
+        layout.num_sheets, 'sheet' if layout.num_sheets == 1 else 'sheets',
+        layout.utilization))
+    for i, sheet in enumerate(layout.sheets):
+        result.append('')
+        result.append('Sheet {}:  {} {}  {} x {}  ({:.1%} used){}'.format(
+            i + 1, fmt.thickness_str(sheet.thickness) + u, sheet.material,
+            fmt.dimstr(sheet.width) + u, fmt.dimstr(sheet.length) + u,
+            sheet.utilization,
+            '' if sheet.remnant is None else
+            '  remnant #{}'.format(sheet.remnant)))
+        for p in sheet.placements:
+            result.append('    {:8s}{:>12s} x {:<12s}at {}, {}{}{}'.format(
+                p.piece.name, fmt.dimstr(p.piece.width) + u,
+                fmt.dimstr(p.piece.height) + u, fmt.dimstr(p.x) + u,
+                fmt.dimstr(p.y) + u,
+                '  (turned)' if p.rotated else '',
+                '' if p.piece.tag is None else '  [{}]'.format(p.piece.tag)))
+    return result
+
+
+# Implementation.    (Definitions below are non-public)
+
+
+def _exact(pieces, sheet, kerf, node_limit, deadline):
+    """Lay out pieces on the fewest sheets, as exact() does.
+
+    Return a tuple (sheets, complete), where complete is False if the search
+    ran out of nodes or time, so that the layout may not be the best.
+    """
+    width, length = sheet
+    pieces = sorted(pieces, key=_size_key, reverse=True)
+    result = guillotine(pieces, sheet, kerf, deadline)
+    bound = lower_bound(pieces, sheet, kerf)
+    if len(result) <= bound:
+        return (result, True)
+    if deadline is None:
+        deadline = time.time() + EXACT_TIME_LIMIT
+    capacity = (width + kerf) * (length + kerf)
+    # The area needed by the pieces from each one on, with their kerf.
+    needed = [0.0]
+    for piece in reversed(pieces):
+        needed.append(needed[-1] + _kerf_area(piece.width, piece.height, kerf))
+    needed.reverse()
+    # The sizes the pieces from each one on take up, in the orientations they
+    # allow. A free rectangle that none of them fits is waste, so the fewer
+    # ways the pieces may turn, the more is known to be waste.
+    footprints = [()]
+    for piece in reversed(pieces):
+        footprints.append(_footprints(piece, footprints[-1]))
+    footprints.reverse()
+    # The free rectangles and the placements of each sheet opened so far, and
+    # the sheet that each piece was put on.
+    free = []
+    placed = []
+    sheet_of = [0] * len(pieces)
+    nodes = 0
+    stop = False
+    complete = True
+
+    def search(i):
+        nonlocal result, nodes, stop, complete
+        if i == len(pieces):
+            result = [SheetLayout(pieces[0].material, pieces[0].thickness,
+                                  width, length, tuple(p)) for p in placed]
+            stop = len(result) <= bound
+            return
+        nodes += 1
+        if nodes > node_limit or (nodes % 1024 == 0
+                                  and time.time() >= deadline):
+            stop = True
+            complete = False
+            return
+        spare = sum(_kerf_area(w, h, kerf) for rects in free
+                    for _, _, w, h in rects
+                    if any(pw <= w + _EPSILON and ph <= h + _EPSILON
+                           for pw, ph in footprints[i]))
+        more = max(0, math.ceil((needed[i] - spare) / capacity - _EPSILON))
+        if len(free) + more >= len(result):
+            return
+        piece = pieces[i]
+        # Pieces of the same kind go on the sheets in order, so the same
+        # layout is not searched once for every order of them.
+        first = (sheet_of[i - 1]
+                 if i > 0 and _kind(piece) == _kind(pieces[i - 1]) else 0)
+        if len(free) + 1 < len(result):
+            new_sheet = range(len(free), len(free) + 1)
+        else:
+            new_sheet = range(0)
+        for s in list(range(first, len(free))) + list(new_sheet):
+            if s == len(free):
+                free.append([(0.0, 0.0, width, length)])
+                placed.append([])
+            rects = free[s]
+            for r, rect in enumerate(rects):
+                for rotated in piece.rotation.orientations:
+                    if _fit_score(piece, rotated, rect) is None:
+                        continue
+                    placement = Placement(piece, rect[0], rect[1], rotated)
+                    splits = []
+                    for across in (True, False):
+                        split = _split(rect, placement.width, placement.height,
+                                       kerf, across)
+                        if split not in splits:
+                            splits.append(split)
+                    for split in splits:
+                        free[s] = rects[:r] + rects[r + 1:] + split
+                        placed[s].append(placement)
+                        sheet_of[i] = s
+                        search(i + 1)
+                        placed[s].pop()
+                        free[s] = rects
+                        if stop:
+                            break
+                    if stop:
+                        break
+                if stop:
+                    break
+            if s == len(free) - 1 and not placed[s]:
+                free.pop()
+                placed.pop()
+            if stop:
+                break
+
+    search(0)
+    return (result, complete)
+
+
+# The version of the layout records saved in a LayoutCache.
+_CACHE_FORMAT = 1
+
+
+def _guillotine(pieces, sheet, kerf, sheets=(), unplaced=None, deadline=None):
+    """Lay out pieces by guillotine packing, in the given order.
+
+    The pieces go into the free space left on the given sheets, if any, before
+    new sheets are opened. Sheets that are not guillotine layouts are left as
+    they are. If unplaced is a list, no new sheets are opened, and the pieces
+    that do not fit on the given sheets are appended to it instead. Raise
+    TimeoutError if the deadline, a time.time(), passes first.
+    """
+    width, length = sheet
+    for piece in pieces:
+        _check_fit(piece, width, length)
+    # The free rectangles (x, y, w, h), the placements and the reach of each
+    # sheet, and the sheets with free rectangles large enough for a piece
+    # still to come.
+    layouts = list(sheets)
+    free = [_free_rects(s, kerf) for s in layouts]
+    placed = [list(s.placements) for s in layouts]
+    reach = [_reach(rects) for rects in free]
+    live = list(range(len(layouts)))
+    floors = _floors(pieces)
+    for i, piece in enumerate(pieces):
+        _check_deadline(deadline)
+        if i == 0 or floors[i] != floors[i - 1]:
+            for s in live:
+                free[s] = [r for r in free[s] if _holds(r, floors[i])]
+                reach[s] = _reach(free[s])
+            live = [s for s in live if free[s]]
+        short, long = sorted((piece.width, piece.height))
+        best = None
+        for s in live:
+            if short > reach[s][0] + _EPSILON or long > reach[s][1] + _EPSILON:
+                continue
+            rects = free[s]
+            fit = _best_fit(piece, rects)
+            if fit is not None and (best is None or fit[0] < best[0]):
+                best = fit + (s,)
+        if best is None and unplaced is not None:
+            unplaced.append(piece)
+            continue
+        if best is None:
+            layouts.append(SheetLayout(piece.material, piece.thickness,
+                                       width, length, ()))
+            free.append([(0.0, 0.0, width, length)])
+            placed.append([])
+            reach.append(_reach(free[-1]))
+            live.append(len(free) - 1)
+            best = _best_fit(piece, free[-1]) + (len(free) - 1,)
+        _, r, rotated, s = best
+        x, y, w, h = free[s].pop(r)
+        placement = Placement(piece, x, y, rotated)
+        placed[s].append(placement)
+        free[s].extend(rect for rect in _split(
+            free_rect=(x, y, w, h), pw=placement.width, ph=placement.height,
+            kerf=kerf) if _holds(rect, floors[i]))
+        reach[s] = _reach(free[s])
+        if not free[s]:
+            live.remove(s)
+    result = [layout._replace(placements=tuple(p))
+              for layout, p in zip(layouts, placed)]
+    return result
+
+
+def _use_remnants(pieces, remnants, sheet, kerf):
+    """Lay out what pieces of one group fit on remnants, for nest().
+
+    For each kind of piece, the smallest few remnants that it fits are taken
+    from the inventory, and all the pieces are laid out on those, smallest
+    remnant first, by guillotine packing. Return a tuple (sheets, unplaced)
+    of the remnants used and the pieces left over.
+    """
+    material, thickness = pieces[0].material, pieces[0].thickness
+    found = {}
+    for piece in {_kind(piece): piece for piece in pieces}.values():
+        for rotated in piece.rotation.orientations:
+            pw, ph = _placed_size(piece, rotated)
+            for remnant in remnants.find(material, thickness, pw, ph,
+                                         limit=REMNANT_CHOICES):
+                found[remnant.id] = remnant
+    stock = [SheetLayout(material, thickness, r.width, r.length, (), r.id)
+             for r in sorted(found.values(),
+                             key=lambda r: (r.width * r.length, r.id))]
+    unplaced = []
+    sheets = _guillotine(sorted(pieces, key=_size_key, reverse=True), sheet,
+                         kerf, stock, unplaced)
+    result = ([s for s in sheets if s.placements], unplaced)
+    return result
+
+
+def _free_rects(sheet, kerf):
+    """Return the free rectangles left on a sheet by guillotine cuts.
+
+    Return an empty list if the sheet is not a guillotine layout.
+    """
+    tree = _cut_tree((0.0, 0.0, sheet.width, sheet.length), sheet.placements,
+                     kerf)
+    result = []
+    stack = [] if tree is None else [tree]
+    while stack:
+        node = stack.pop()
+        if node[0] == 'cut':
+            stack.extend(node[3:])
+        elif node[0] == 'free' and min(node[1][2:]) > _EPSILON:
+            result.append(node[1])
+    return result
+
+
+def _cut_tree(region, placements, kerf):
+    """Return the guillotine cuts that free the placements from a region.
+
+    The region (x, y, w, h) is cut in two by a straight cut right across it
+    that misses every placement, and each part is cut in turn. As in
+    cutting.py, the kerf of a cut may run off the side of the region, leaving
+    an empty part narrower than the kerf, or none. Each node of the
+    tree is one of:
+        ('cut', axis, position, first, second) - a cut across the region, at
+            the given x (if axis is 'x') or y (if 'y'), with the subtrees of
+            the parts below and above that position
+        ('piece', placement) - a region that is exactly one placement
+        ('free', region) - an empty region
+    Return None if the placements cannot be freed that way.
+    """
+    x, y, w, h = region
+    if not placements:
+        return ('free', region)
+    if len(placements) == 1:
+        p = placements[0]
+        if (abs(p.x - x) <= _EPSILON and abs(p.y - y) <= _EPSILON
+                and abs(p.width - w) <= _EPSILON
+                and abs(p.height - h) <= _EPSILON):
+            return ('piece', p)
+    for axis in ('x', 'y'):
+        if axis == 'x':
+            spans = [(p.x, p.x + p.width) for p in placements]
+            lo, hi = x, x + w
+        else:
+            spans = [(p.y, p.y + p.height) for p in placements]
+            lo, hi = y, y + h
+        cuts = sorted({end for _, end in spans} | {start - kerf
+                                                   for start, _ in spans})
+        for cut in cuts:
+            if cut >= hi - _EPSILON or cut + kerf <= lo + _EPSILON:
+                continue
+            if all(end <= cut + _EPSILON or start >= cut + kerf - _EPSILON
+                   for start, end in spans):
+                below = [p for p, (start, _) in zip(placements, spans)
+                         if start < cut]
+                above = [p for p, (start, _) in zip(placements, spans)
+                         if start >= cut]
+                a, b = max(cut, lo), min(cut + kerf, hi)
+                if axis == 'x':
+                    first = (x, y, a - x, h)
+                    second = (b, y, hi - b, h)
+                else:
+                    first = (x, y, w, a - y)
+                    second = (x, b, w, hi - b)
+                first_tree = _cut_tree(first, below, kerf)
+                second_tree = _cut_tree(second, above, kerf)
+                if first_tree is None or second_tree is None:
+                    return None
+                return ('cut', axis, cut, first_tree, second_tree)
+    return None
+
+
+def _renest_bucket(previous, pieces, sheet, kerf, threshold, algorithm):
+    """Lay out one group of pieces again for renest()."""
+    layout = ALGORITHMS[_algorithm_name(algorithm, pieces)]
+    if not previous:
+        return layout(pieces, sheet, kerf)
+    # Keep the placements of as many of the pieces as are still wanted.
+    wanted = Counter(pieces)
+    kept = []
+    for old in previous:
+        placements = []
+        for p in old.placements:
+            if wanted[p.piece] > 0:
+                wanted[p.piece] -= 1
+                placements.append(p)
+        kept.append(old._replace(placements=tuple(placements)))
+    added = sorted(wanted.elements(), key=_size_key, reverse=True)
+    if not added and kept == previous:
+        return previous
+    repaired = [s for s in _guillotine(added, sheet, kerf, kept)
+                if s.placements]
+    result = repaired
+    if (Layout(repaired, kerf).utilization
+            < threshold * Layout(previous, kerf).utilization):
+        full = layout(pieces, sheet, kerf)
+        if _layout_key(full) < _layout_key(repaired):
+            result = full
+    return result
+
+
+def _lay_out(groups, sheet, kerf, max_workers, executor):
+    """Lay out groups of pieces for nest(), in a pool of processes if need be.
+
+    Each group is a tuple (algorithm, pieces). Return the list of the layouts
+    of the groups, in order, each as a tuple (sheets, complete), as returned
+    by _lay_out_group(). The largest groups are started first, so that the
+    time taken is about that of the largest group.
+    """
+    if executor is None and (max_workers == 1 or len(groups) < 2):
+        return [_lay_out_group(name, pieces, sheet, kerf)
+                for name, pieces in groups]
+    workers = min(max_workers or os.cpu_count() or 1, len(groups))
+    pool = executor or ProcessPoolExecutor(workers)
+    futures = {}
+    try:
+        for i in sorted(range(len(groups)), key=lambda i: -len(groups[i][1])):
+            name, pieces = groups[i]
+            futures[i] = pool.submit(_lay_out_group, name, pieces, sheet,
+                                     kerf)
+        result = [futures[i].result() for i in range(len(groups))]
+    finally:
+        if executor is None:
+            pool.shutdown(cancel_futures=True)
+    return result
+
+
+def _lay_out_group(name, pieces, sheet, kerf):
+    """Lay out a group of pieces with the named algorithm, for nest().
+
+    Return a tuple (sheets, complete), where complete is False if exact() ran
+    out of nodes or time, so that the layout may not be the best.
+    """
+    if name == 'exact':
+        result = _exact(pieces, sheet, kerf, EXACT_NODE_LIMIT, None)
+    else:
+        result = (ALGORITHMS[name](pieces, sheet, kerf), True)
+    return result
+
+
+def _shuffled(pieces, rng):
+    """Return the pieces roughly largest first, for random_restarts().
+
+    The area of each piece is scaled by a random factor of up to 15% either
+    way before they are sorted.
+    """
+    result = sorted(pieces, reverse=True,
+                    key=lambda p: p.area * rng.uniform(0.85, 1.15))
+    return result
+
+
+def _run_algorithm(name, pieces, sheet, kerf, seed, deadline):
+    """Run the named algorithm for portfolio(), in a worker process.
+
+    Return a tuple (sheets, finished). The sheets are the layout, made a
+    guillotine layout if it is not one, or None if the deadline passed first,
+    whether before the algorithm started or while it ran. Finished is False if
+    the deadline passed before the algorithm was done, or if exact() ran out
+    of nodes.
+    """
+    try:
+        _check_deadline(deadline)
+        complete = True
+        if name == 'random':
+            sheets = random_restarts(pieces, sheet, kerf, seed=seed,
+                                     deadline=deadline)
+        elif name == 'exact':
+            sheets, complete = _exact(pieces, sheet, kerf, EXACT_NODE_LIMIT,
+                                      deadline)
+        else:
+            sheets = ALGORITHMS[name](pieces, sheet, kerf, deadline=deadline)
+        sheets = _make_guillotine(sheets, sheet, kerf, deadline)
+    except TimeoutError:
+        return (None, False)
+    finished = complete and time.time() < deadline
+    result = (sheets, finished)
+    return result
+
+
+def _make_guillotine(sheets, sheet, kerf, deadline=None):
+    """Return a layout with the sheets that are not guillotine layouts redone.
+
+    Their pieces are laid out again by guillotine packing, largest first, in
+    the space left on the guillotine sheets and then on new sheets.
+    """
+    kept = []
+    loose = []
+    for s in sheets:
+        if _is_guillotine([s], kerf):
+            kept.append(s)
+        else:
+            loose.extend(p.piece for p in s.placements)
+    if not loose:
+        return sheets
+    result = _guillotine(sorted(loose, key=_size_key, reverse=True), sheet,
+                         kerf, sheets=kept, deadline=deadline)
+    return result
+
+
+def _check_deadline(deadline):
+    """Raise TimeoutError if the deadline, a time.time(), has passed."""
+    if deadline is not None and time.time() >= deadline:
+        raise TimeoutError('deadline passed')
+
+
+def _is_guillotine(sheets, kerf):
+    """Return True if every sheet is a guillotine layout."""
+    result = all(_cut_tree((0.0, 0.0, s.width, s.length), s.placements, kerf)
+                 is not None for s in sheets)
+    return result
+
+
+def _layout_key(sheets):
+    """Return the sort key that puts the best layout of a group first.
+
+    That is the one with the fewest sheets, and then with the least used on
+    its emptiest sheet.
+    """
+    return (len(sheets), min(sheet.used_area for sheet in sheets))
+
+
+def _cache_key(method, pieces, sheet, kerf):
+    """Return the key of the layout of a group of pieces in a LayoutCache.
+
+    The pieces are described by their kinds, with the number of each, so the
+    key does not depend on their order, names or tags.
+    """
+    kinds = Counter(_kind(piece) for piece in pieces)
+    result = content_key({'format': _CACHE_FORMAT, 'method': method,
+                          'sheet': list(sheet), 'kerf': kerf,
+                          'pieces': sorted([list(k), n]
+                                           for k, n in kinds.items())})
+    return result
+
+
+def _cache_get(cache, key, pieces):
+    """Return the cached layout of a group of pieces, or None if there is none.
+
+    The cached placements are given the caller's pieces, of the same kind.
+    """
+    record = None if cache is None else cache.get(key)
+    if record is None:
+        return None
+    kinds = sorted(set(_kind(piece) for piece in pieces))
+    unplaced = {kind: [] for kind in kinds}
+    for piece in pieces:
+        unplaced[_kind(piece)].append(piece)
+    result = []
+    for width, length, placements in record:
+        placed = tuple(Placement(unplaced[kinds[k]].pop(), x, y, rotated)
+                       for k, x, y, rotated in placements)
+        result.append(SheetLayout(pieces[0].material, pieces[0].thickness,
+                                  width, length, placed))
+    return result
+
+
+def _cache_put(cache, key, sheets, pieces):
+    """Save the layout of a group of pieces in the cache, if there is one."""
+    if cache is None:
+        return
+    index = {kind: k for k, kind in
+             enumerate(sorted(set(_kind(piece) for piece in pieces)))}
+    record = [[sheet.width, sheet.length,
+               [[index[_kind(p.piece)], p.x, p.y, p.rotated]
+                for p in sheet.placements]]
+              for sheet in sheets]
+    cache.put(key, record)
+
+
+def _kind(piece):
+    """Return what makes pieces interchangeable in a layout, as a tuple."""
+    return (piece.width, piece.height, piece.thickness, piece.material,
+            piece.rotation.value)
+
+
+def _algorithm_name(algorithm, pieces):
+    """Return the name of the algorithm to lay out a group of pieces with."""
+    if algorithm != 'auto':
+        result = algorithm
+    elif len(pieces) <= EXACT_MAX_PIECES:
+        result = 'exact'
+    else:
+        result = 'guillotine'
+    return result
+
+
+def _pieces(parts):
+    """Return the parts as a list of Pieces, expanding a parts table."""
+    if hasattr(parts, 'dtype'):
+        result = expand_parts(parts)
+    else:
+        result = list(parts)
+    return result
+
+
+def _buckets(pieces):
+    """Return the pieces grouped by (material, thickness), as a list of lists.
+
+    The groups are ordered by material, in the order of MATERIALS with any
+    others after them alphabetically, and then by thickness.
+    """
+    groups = {}
+    for piece in pieces:
+        groups.setdefault((piece.material, piece.thickness), []).append(piece)
+
+    def rank(key):
+        material, thickness = key
+        if material in MATERIALS:
+            return (MATERIALS.index(material), '', thickness)
+        return (len(MATERIALS), material, thickness)
+
+    result = [groups[key] for key in sorted(groups, key=rank)]
+    return result
+
+
+def _size_key(piece):
+    """Return the sort key that puts large pieces first."""
+    return (piece.area, max(piece.width, piece.height), piece.name)
+
+
+def _check_fit(piece, width, length):
+    """Raise ValueError if the piece will not fit on an empty sheet."""
+    if piece.width <= 0 or piece.height <= 0:
+        raise ValueError('{} panel {:g} x {:g} has no area'.format(
+            piece.name, piece.width, piece.height))
+    orientations = piece.rotation.orientations
+    if not _fits(piece.width, piece.height, False in orientations,
+                 True in orientations, width, length):
+        raise ValueError('{} panel {:g} x {:g} will not fit on a {:g} x {:g}'
+                         ' sheet'.format(piece.name, piece.width, piece.height,
+                                         width, length))
+
+
+def _floors(pieces):
+    """Return the smallest sizes of the pieces from each one on, as a list.
+
+    Each is a tuple (short side, long side, area), each the least of any of
+    the pieces from that one to the last. A free rectangle smaller than that
+    holds none of them.
+    """
+    result = []
+    floor = (math.inf, math.inf, math.inf)
+    for piece in reversed(pieces):
+        short, long = sorted((piece.width, piece.height))
+        floor = (min(floor[0], short), min(floor[1], long),
+                 min(floor[2], piece.area))
+        result.append(floor)
+    result.reverse()
+    return result
+
+
+def _holds(rect, floor):
+    """Return whether a free rectangle is as large as a floor of _floors()."""
+    _, _, w, h = rect
+    short, long, area = floor
+    return (min(w, h) >= short - _EPSILON and max(w, h) >= long - _EPSILON
+            and w * h >= area - _EPSILON)
+
+
+def _reach(rects):
+    """Return the longest short side and long side of any of the rectangles.
+
+    A piece with a longer short side or long side fits in none of them.
+    """
+    result = (max((min(r[2], r[3]) for r in rects), default=0.0),
+              max((max(r[2], r[3]) for r in rects), default=0.0))
+    return result
+
+
+def _best_fit(piece, rects):
+    """Return (score, index, rotated) of the best free rectangle for a piece.
+
+    Return None if the piece fits in none of them.
+    """
+    result = None
+    for r, rect in enumerate(rects):
+        for rotated in piece.rotation.orientations:
+            score = _fit_score(piece, rotated, rect)
+            if score is not None and (result is None or score < result[0]):
+                result = (score, r, rotated)
+    return result
+
+
+def _fit_score(piece, rotated, rect):
+    """Return how well the piece fits the free rectangle, lower being better.
+
+    The score is the area left over, then the shorter leftover side. Return
+    None if the piece does not fit.
+    """
+    pw, ph = (piece.height, piece.width) if rotated else (piece.width,
+                                                          piece.height)
+    _, _, w, h = rect
+    if pw > w + _EPSILON or ph > h + _EPSILON:
+        return None
+    return (w * h - pw * ph, min(w - pw, h - ph))
+
+
+def _split(free_rect, pw, ph, kerf, across=None):
+    """Return the free rectangles left after placing a piece in a corner.
+
+    The piece of size pw by ph goes in the lower left corner of free_rect, and
+    the rest is split by a cut across its full width if across is true, or
+    along its full height if it is false. By default, it is split along the
+    shorter leftover side, so the larger of the two new rectangles is as large
+    as possible. Rectangles narrower than nothing, once the kerf is taken out,
+    are dropped.
+    """
+    x, y, w, h = free_rect
+    right_w = w - pw - kerf
+    top_h = h - ph - kerf
+    if across is None:
+        across = w - pw < h - ph
+    if across:
+        # Cut across the full width first: the top piece gets the full width.
+        right = (x + pw + kerf, y, right_w, ph)
+        top = (x, y + ph + kerf, w, top_h)
+    else:
+        # Cut along the full height first: the right piece gets it all.
+        right = (x + pw + kerf, y, right_w, h)
+        top = (x, y + ph + kerf, pw, top_h)
+    result = [r for r in (right, top) if r[2] > _EPSILON and r[3] > _EPSILON]
+    return result
+
+
+def _footprints(piece, others):
+    """Return the sizes a piece and others take up, less any larger ones.
+
+    Each is a tuple (width, height) of an orientation the piece allows, or one
+    of others. A size no smaller either way than another is left out, since
+    any rectangle that fits it fits the other too.
+    """
+    sizes = set(others)
+    sizes.update(_placed_size(piece, rotated)
+                 for rotated in piece.rotation.orientations)
+    result = tuple(sorted(
+        a for a in sizes
+        if not any(b != a and b[0] <= a[0] and b[1] <= a[1] for b in sizes)))
+    return result
+
+
+def _kerf_area(width, height, kerf):
+    """Return the area a piece takes up, with the kerf along two edges."""
+    return (width + kerf) * (height + kerf)
+
+
+def _placed_size(piece, rotated):
+    """Return the (width, height) of the piece when placed on a sheet."""
+    if rotated:
+        result = (piece.height, piece.width)
+    else:
+        result = (piece.width, piece.height)
+    return result
+
+
+def _subtract(rect, used):
+    """Return the largest rectangles of rect that lie outside used.
+
+    There are up to four of them, one on each side of used, and they overlap.
+    """
+    rx, ry, rw, rh = rect
+    ux, uy, uw, uh = used
+    if (ux >= rx + rw - _EPSILON or ux + uw <= rx + _EPSILON
+            or uy >= ry + rh - _EPSILON or uy + uh <= ry + _EPSILON):
+        return [rect]
+    result = []
+    if ux > rx + _EPSILON:
+        result.append((rx, ry, ux - rx, rh))
+    if ux + uw < rx + rw - _EPSILON:
+        result.append((ux + uw, ry, rx + rw - ux - uw, rh))
+    if uy > ry + _EPSILON:
+        result.append((rx, ry, rw, uy - ry))
+    if uy + uh < ry + rh - _EPSILON:
+        result.append((rx, uy + uh, rw, ry + rh - uy - uh))
+    return result
+
+
+def _prune(rects):
+    """Return the rectangles, less any that lie within another."""
+    def within(a, b):
+        return (a[0] >= b[0] - _EPSILON and a[1] >= b[1] - _EPSILON
+                and a[0] + a[2] <= b[0] + b[2] + _EPSILON
+                and a[1] + a[3] <= b[1] + b[3] + _EPSILON)
+
+    result = []
+    for i, a in enumerate(rects):
+        if not any(within(a, b) and (not within(b, a) or j < i)
+                   for j, b in enumerate(rects) if j != i):
+            result.append(a)
+    return result
+
+
+def _skyline_fit(line, pw, ph, length):
+    """Return (top, x, index) of the lowest place on a skyline for a piece.
+
+    The piece of size pw by ph sits on the skyline starting at the segment with
+    the given index. Return None if it fits nowhere below the length.
+    """
+    result = None
+    right = line[-1][0] + line[-1][2]
+    for i, (x, _, _) in enumerate(line):
+        if x + pw > right + _EPSILON:
+            break
+        y = 0.0
+        j = i
+        while j < len(line) and line[j][0] < x + pw - _EPSILON:
+            y = max(y, line[j][1])
+            j += 1
+        if y + ph <= length + _EPSILON and (result is None
+                                            or (y + ph, x) < result[:2]):
+            result = (y + ph, x, i)
+    return result
+
+
+def _skyline_add(line, i, pw, top):
+    """Raise the skyline to top under a piece of width pw at segment i."""
+    x = line[i][0]
+    while i < len(line) and line[i][0] < x + pw - _EPSILON:
+        seg_x, _, seg_w = line[i]
+        if seg_x + seg_w <= x + pw + _EPSILON:
+            del line[i]
+        else:
+            line[i][0] = x + pw
+            line[i][2] = seg_x + seg_w - x - pw
+            break
+    line.insert(i, [x, top, pw])
+    # Merge neighbouring segments of the same height.
+    k = 0
+    while k < len(line) - 1:
+        if abs(line[k][1] - line[k + 1][1]) <= _EPSILON:
+            line[k][2] += line[k + 1][2]
+            del line[k + 1]
+        else:
+            k += 1
+
+
+# nesting.py  ends here
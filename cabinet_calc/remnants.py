@@ -0,0 +1,231 @@
+# remnants.py                         -*- coding: utf-8; -*-
+
+"""The remnants module for Cabinet Calc.
+
+Copyright © 2018-2021 Harry H. Toigo II, L33b0
+
+This file is part of Cabinet Calc.
+
+Cabinet Calc is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Cabinet Calc is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Cabinet Calc.  If not, see <https://www.gnu.org/licenses/>.
+
+This module keeps the shop's inventory of remnants, the offcuts of sheet goods
+left over from earlier jobs, so that they can be used again.
+
+A RemnantStore holds Remnants, each of a material and thickness, and of a
+width and a length, with the grain along its length as on a full sheet. Given
+one to nest() (see nesting.py), the parts of a job are laid out on fitting
+remnants before any new sheets are opened. Once a layout has been cut,
+update(layout) takes the remnants it used out of the inventory, and puts the
+offcuts it leaves that are large enough to keep into it.
+
+The remnants are kept in an SQLite database, with an R*Tree index over their
+thickness, width and length, so that finding the smallest remnants a part
+fits on stays fast however many there are.
+"""
+
+
+__all__ = ['REMNANTS_FILE', 'MIN_REMNANT_WIDTH', 'MIN_REMNANT_LENGTH',
+           'Remnant', 'RemnantStore']
+
+
+import os
+from collections import namedtuple
+
+from cabinet_calc.layout_cache import SQLiteStore
+from cabinet_calc.nesting import offcuts
+
+
+# Module constants
+
+# The default database file, in the user's data directory.
+REMNANTS_FILE = os.path.join(
+    os.environ.get('XDG_DATA_HOME')
+    or os.path.expanduser('~/.local/share'),
+    'cabinet-calc', 'remnants.sqlite')
+
+# The smallest offcut worth keeping, in inches: its shorter and longer sides.
+MIN_REMNANT_WIDTH = 6.0
+MIN_REMNANT_LENGTH = 12.0
+
+
+# Implementation constants, used below.
+
+# Larger than any size.
+_INFINITY = float('inf')
+
+# The widest window of sizes that RemnantStore.find() looks in, beyond the
+# size wanted, before it looks at every size.
+_MAX_MARGIN = 200.0
+
+
+class Remnant(namedtuple('Remnant', [
+        'id', 'material', 'thickness', 'width', 'length'])):
+    """A remnant of sheet goods in the inventory, as an immutable record."""
+
+    __slots__ = ()
+
+    @property
+    def area(self):
+        """Return the area of the remnant, in square inches."""
+        return self.width * self.length
+
+
+class RemnantStore(SQLiteStore):
+    """An inventory of remnants, kept in an SQLite database."""
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS remnants ('
+        'id INTEGER PRIMARY KEY AUTOINCREMENT, material TEXT NOT NULL, '
+        'thickness REAL NOT NULL, width REAL NOT NULL, '
+        'length REAL NOT NULL)',
+        'CREATE VIRTUAL TABLE IF NOT EXISTS remnant_sizes '
+        'USING rtree(id, min_thickness, max_thickness, '
+        'min_width, max_width, min_length, max_length)')
+
+    def __init__(self, filename=REMNANTS_FILE):
+        """Initialize the inventory.
+
+        :param filename: The name of the database file, or ':memory:' for an
+            inventory that is not kept
+        :type filename: str, optional
+        """
+        super().__init__(filename)
+
+    def __len__(self):
+        """Return the number of remnants in the inventory."""
+        (result,) = self._connection().execute(
+            'SELECT COUNT(*) FROM remnants').fetchone()
+        return result
+
+    def __iter__(self):
+        """Return an iterator over all the remnants, in the order added."""
+        rows = self._connection().execute(
+            'SELECT id, material, thickness, width, length FROM remnants '
+            'ORDER BY id').fetchall()
+        return (Remnant(*row) for row in rows)
+
+    def add(self, material, thickness, width, length):
+        """Put a remnant in the inventory, and return it.
+
+        :raises ValueError: If the width or length is not positive
+        """
+        if width <= 0 or length <= 0:
+            raise ValueError('remnant must have a positive width and length')
+        db = self._connection()
+        with db:
+            cursor = db.execute(
+                'INSERT INTO remnants (material, thickness, width, length) '
+                'VALUES (?, ?, ?, ?)', (material, thickness, width, length))
+            rid = cursor.lastrowid
+            db.execute('INSERT INTO remnant_sizes VALUES (?, ?, ?, ?, ?, ?, ?)',
+                       (rid, thickness, thickness, width, width, length,
+                        length))
+        return Remnant(rid, material, thickness, width, length)
+
+    def get(self, rid):
+        """Return the remnant with the given id.
+
+        :raises ValueError: If there is no such remnant
+        """
+        row = self._connection().execute(
+            'SELECT id, material, thickness, width, length FROM remnants '
+            'WHERE id = ?', (rid,)).fetchone()
+        if row is None:
+            raise ValueError('no remnant #{}'.format(rid))
+        return Remnant(*row)
+
+    def remove(self, rid):
+        """Take the remnant with the given id out of the inventory.
+
+        :raises ValueError: If there is no such remnant
+        """
+        db = self._connection()
+        with db:
+            if db.execute('DELETE FROM remnants WHERE id = ?',
+                          (rid,)).rowcount == 0:
+                raise ValueError('no remnant #{}'.format(rid))
+            db.execute('DELETE FROM remnant_sizes WHERE id = ?', (rid,))
+
+    def find(self, material, thickness, width=0.0, length=0.0, limit=None):
+        """Return the remnants that a piece of the given size fits on.
+
+        The piece's width runs across the remnant, and its length along it.
+
+        :param limit: The most remnants to return, defaults to all of them
+        :type limit: int, optional
+        :return: The remnants, smallest first
+        :rtype: [Remnant]
+        """
+        if limit is None:
+            return self._find(material, thickness, width, length)
+        # Look in a window of sizes, which grows until it holds enough
+        # remnants smaller than any outside it could be.
+        margin = 6.0
+        while margin < _MAX_MARGIN:
+            bound = min((width + margin) * length, width * (length + margin))
+            result = [r for r in self._find(material, thickness, width, length,
+                                            width + margin, length + margin)
+                      if r.area <= bound]
+            if len(result) >= limit:
+                return result[:limit]
+            margin *= 2
+        return self._find(material, thickness, width, length)[:limit]
+
+    def update(self, layout, min_width=MIN_REMNANT_WIDTH,
+               min_length=MIN_REMNANT_LENGTH):
+        """Update the inventory once the sheets of a layout have been cut.
+
+        The remnants the layout used are taken out, and the largest offcut
+        of each sheet is put in, if it is at least min_width by min_length,
+        either way round.
+
+        :param layout: The layout that was cut
+        :type layout: nesting.Layout
+        :return: The remnants put in the inventory
+        :rtype: [Remnant]
+        :raises ValueError: If the layout used a remnant not in the inventory
+        """
+        result = []
+        for sheet in layout.sheets:
+            if sheet.remnant is not None:
+                self.remove(sheet.remnant)
+            for x, y, w, h in offcuts(sheet, layout.kerf)[:1]:
+                if min(w, h) >= min_width and max(w, h) >= min_length:
+                    result.append(self.add(sheet.material, sheet.thickness,
+                                           w, h))
+        return result
+
+    def _find(self, material, thickness, width, length, max_width=_INFINITY,
+              max_length=_INFINITY):
+        """Return the remnants in a range of sizes, smallest first."""
+        # The index holds 32-bit floats, rounded outward, so it finds a few
+        # more remnants than are in range, which the remnants table then rules
+        # out.
+        rows = self._connection().execute(
+            'SELECT r.id, r.material, r.thickness, r.width, r.length '
+            'FROM remnant_sizes AS s JOIN remnants AS r ON r.id = s.id '
+            'WHERE s.min_thickness <= ? AND s.max_thickness >= ? '
+            'AND s.max_width >= ? AND s.min_width <= ? '
+            'AND s.max_length >= ? AND s.min_length <= ? '
+            'AND r.material = ? AND r.thickness = ? '
+            'AND r.width BETWEEN ? AND ? AND r.length BETWEEN ? AND ? '
+            'ORDER BY r.width * r.length, r.id',
+            (thickness, thickness, width, max_width, length, max_length,
+             material, thickness, width, max_width, length,
+             max_length)).fetchall()
+        result = [Remnant(*row) for row in rows]
+        return result
+
+
+# remnants.py  ends here
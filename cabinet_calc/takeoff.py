@@ -0,0 +1,188 @@
+# takeoff.py                          -*- coding: utf-8; -*-
+
+"""The takeoff module for Cabinet Calc.
+
+Copyright © 2018-2021 Harry H. Toigo II, L33b0
+
+This file is part of Cabinet Calc.
+
+Cabinet Calc is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+Cabinet Calc is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Cabinet Calc.  If not, see <https://www.gnu.org/licenses/>.
+
+This module computes the sheet goods takeoff of cabinet jobs, i.e. how many
+full sheets of each material and thickness must be ordered to cut all the
+parts.
+
+Its main interface is the function takeoff(jobs), which accepts a Job or a
+sequence of Jobs and returns a table with one record for each job, material
+and thickness, or, with combine=True, one record for each material and
+thickness over the whole batch. All the parts of all the jobs are grouped and
+summed together in a single pass over their parts tables.
+
+The sheet count is an estimate by area: each part is charged its area plus a
+saw kerf along two edges, and a fraction of every sheet is set aside for the
+offcuts that cannot be used.
+"""
+
+
+__all__ = ['SHEET_WIDTH', 'SHEET_LENGTH', 'DEFAULT_KERF', 'DEFAULT_WASTE',
+           'TAKEOFF_DTYPE', 'takeoff', 'summary']
+
+
+import numpy as np
+
+from cabinet_calc.cabinet import MATERIALS
+from cabinet_calc.dimension_strs import DEFAULT_FORMATTER
+
+
+# Module constants
+
+# All measurements are in inches, unless otherwise specified.
+
+# Sheet goods are bought as 4' x 8' sheets.
+SHEET_WIDTH = 48.0
+SHEET_LENGTH = 96.0
+
+# The width of the cut made by the saw blade.
+DEFAULT_KERF = 0.125
+
+# The fraction of each sheet allowed for offcuts too small to use.
+DEFAULT_WASTE = 0.15
+
+# The record type of the tables returned by takeoff(). Records for the whole
+# batch, from takeoff(..., combine=True), have a job of -1. The area is the
+# total area of the parts, kerf included, in square inches.
+TAKEOFF_DTYPE = np.dtype([('job', np.intp), ('material', 'U32'),
+                          ('thickness', float), ('parts', int),
+                          ('area', float), ('sheets', int)])
+
+
+# Implementation constants, used below.
+
+# Lengths that differ by less than this are taken to be equal, to allow for
+# floating point error.
+_EPSILON = 1e-9
+
+
+def takeoff(jobs, sheet=(SHEET_WIDTH, SHEET_LENGTH), kerf=DEFAULT_KERF,
+            waste=DEFAULT_WASTE, combine=False):
+    """Return the number of sheets of each material and thickness needed.
+
+    :param jobs: The job, or jobs, to take off
+    :type jobs: Job or [Job]
+    :param sheet: The width and length of a stock sheet
+    :type sheet: (float, float), optional
+    :param kerf: The width of the saw cut
+    :type kerf: float, optional
+    :param waste: The fraction of each sheet allowed for unusable offcuts
+    :type waste: float, optional
+    :param combine: True to total the parts of all jobs together, as for a
+        single order, rather than job by job
+    :type combine: bool, optional
+    :return: A TAKEOFF_DTYPE table ordered by job, then by material in the
+        order of MATERIALS, then by thickness
+    :rtype: numpy.ndarray
+    :raises ValueError: If a part has no area, or will not fit on a sheet
+        with its grain along the sheet's
+    """
+    if not 0 <= waste < 1:
+        raise ValueError('waste is not a fraction between 0 and 1')
+    if hasattr(jobs, 'parts'):
+        jobs = [jobs]
+    tables = [job.parts for job in jobs]
+    parts = np.concatenate(tables) if tables else np.empty(0, TAKEOFF_DTYPE)
+    if len(parts) == 0:
+        return np.empty(0, dtype=TAKEOFF_DTYPE)
+    job_idx = np.repeat(np.arange(len(tables)), [len(t) for t in tables])
+    if combine:
+        job_idx = np.full(len(parts), -1)
+    _check_fit(parts, sheet)
+
+    # Group by (job, material, thickness), with materials in MATERIALS order.
+    materials, matl_idx = np.unique(parts['material'], return_inverse=True)
+    names = MATERIALS + [m for m in materials.tolist() if m not in MATERIALS]
+    matl_rank = np.array([names.index(m) for m in materials.tolist()])
+    keys = np.rec.fromarrays([job_idx, matl_rank[matl_idx.ravel()],
+                              parts['thickness']])
+    groups, group_idx = np.unique(keys, return_inverse=True)
+    group_idx = group_idx.ravel()
+    areas = (parts['qty'] * (parts['width'] + kerf)
+             * (parts['height'] + kerf))
+    area = np.bincount(group_idx, weights=areas, minlength=len(groups))
+    count = np.bincount(group_idx, weights=parts['qty'], minlength=len(groups))
+    usable = sheet[0] * sheet[1] * (1 - waste)
+
+    result = np.empty(len(groups), dtype=TAKEOFF_DTYPE)
+    result['job'] = groups['f0']
+    result['material'] = np.array(names)[groups['f1']]
+    result['thickness'] = groups['f2']
+    result['parts'] = count
+    result['area'] = area
+    result['sheets'] = np.maximum(1, np.ceil(area / usable - 1e-9))
+    return result
+
+
+def summary(table, fmt=DEFAULT_FORMATTER):
+    """Return the takeoff table as a list of strings, one per record.
+
+    :param fmt: The formatter of the thicknesses
+    :type fmt: dimension_strs.Formatter, optional
+    """
+    result = []
+    for rec in table:
+        sheets = int(rec['sheets'])
+        result.append('{:24s}{:>8s}  {:3d} {:6s}  ({:d} parts)'.format(
+            str(rec['material']),
+            fmt.thickness_str(float(rec['thickness'])) + fmt.unit,
+            sheets, 'sheet' if sheets == 1 else 'sheets', int(rec['parts'])))
+    return result
+
+
+# Implementation.    (Definitions below are non-public)
+
+
+def _check_fit(parts, sheet):
+    """Raise ValueError if any part in a parts table will not fit on a sheet.
+
+    The rule is that of _fits(), as nesting.nest() applies it to each piece.
+    """
+    no_area = (parts['width'] <= 0) | (parts['height'] <= 0)
+    if no_area.any():
+        part = parts[np.argmax(no_area)]
+        raise ValueError('{} panel {:g} x {:g} has no area'.format(
+            part['name'], part['width'], part['height']))
+    too_big = ~_fits(parts['width'], parts['height'], parts['grain'] != 'H',
+                     parts['grain'] != 'V', *sheet)
+    if too_big.any():
+        part = parts[np.argmax(too_big)]
+        raise ValueError('{} panel {:g} x {:g} will not fit on a {:g} x {:g}'
+                         ' sheet'.format(part['name'], part['width'],
+                                         part['height'], *sheet))
+
+
+def _fits(width, height, upright, turned, sheet_width, sheet_length):
+    """Return whether parts fit on an empty sheet.
+
+    Upright is whether a part may be laid with its height along the length of
+    the sheet, and turned whether it may be laid with its width along it. The
+    arguments may be numbers, giving a bool, or arrays, giving an array of
+    bools.
+    """
+    result = ((upright & (width <= sheet_width + _EPSILON)
+               & (height <= sheet_length + _EPSILON))
+              | (turned & (height <= sheet_width + _EPSILON)
+                 & (width <= sheet_length + _EPSILON)))
+    return result
+
+
+# takeoff.py  ends here
@@ -1,6 +1,11 @@
 # test_cabinet.py    -*- coding: utf-8 -*-
 
 
+import itertools
+import math
+import pickle
+
+import numpy as np
 import pytest
 
 from cabinet_calc import cabinet as C
@@ -158,4 +163,296 @@ def test_door_height(cabrun):
     assert cabrun.door_height == 28.0
 
 
+def test_derived_values_are_cached(cabrun):
+    assert cabrun.bottom_width == 29.97
+    assert cabrun.door_width == 15.5375
+    info = cabrun.cache_info()
+    assert info.misses > 0
+    assert info.hits > 0
+    assert cabrun.bottom_width == 29.97
+    assert cabrun.cache_info().hits == info.hits + 1
+    assert cabrun.cache_info().misses == info.misses
+
+
+def test_setting_fullwidth_invalidates_cache(cabrun):
+    assert cabrun.cabinet_width == 31.45
+    cabrun.fullwidth = 183.0
+    assert cabrun.num_cabinets == 6
+    assert cabrun.cabinet_width == 30.5
+
+
+def test_setting_has_legs_invalidates_cache(cabrun):
+    assert cabrun.num_bottompanels == 5
+    cabrun.has_legs = True
+    assert cabrun.bottom_thickness == 1.48
+    assert cabrun.num_bottompanels == 10
+
+
+def test_setting_bottom_thickness_invalidates_cache(cabrun):
+    assert cabrun.bottom_thickness == 0.74
+    cabrun.bottom_thickness = 1.0
+    assert cabrun.bottom_thickness == 1.0
+
+
+def test_setting_attributes_invalidates_cache(cabrun):
+    assert cabrun.filler_width is None
+    cabrun.fillers = C.Ends.LEFT
+    assert cabrun.filler_width == 2.25
+    cabrun.doorside_space_m = 0.25
+    assert cabrun.door_width == 15.25      # (31.0 - 0.5) / 2
+
+
+def test_spec(cabrun):
+    assert cabrun.spec == C.RunSpec(
+        157.25, 28.5, 24.0, C.Ends.NEITHER, 'Standard Plywood', 0.74,
+        'Melamine', 0.76, (0.74,), False, 4, 0.5, 0.125, 0.125, 0.125)
+
+
+def test_spec_is_hashable(cabrun):
+    assert hash(cabrun.spec) == hash(C.Run(157.25, 28.5, 24.0).spec)
+    cabrun.has_legs = True
+    assert cabrun.spec.btmpanel_thicknesses == (0.74, 0.74)
+    assert cabrun.spec != C.Run(157.25, 28.5, 24.0).spec
+
+
+def test_spec_to_run(cabrun):
+    run = cabrun.spec.to_run()
+    assert run.spec == cabrun.spec
+    assert run.btmpanel_thicknesses == [0.74]
+
+
+def test_result(cabrun):
+    result = cabrun.result
+    assert result.num_cabinets == 5
+    assert result.cabinet_width == 31.45
+    assert result.filler_width is None
+    assert result.door_width == 15.5375
+    assert all(getattr(result, field) == getattr(cabrun, field)
+               for field in C.RunResult._fields)
+
+
+def test_spec_and_result_pickle(cabrun):
+    assert pickle.loads(pickle.dumps(cabrun.spec)) == cabrun.spec
+    assert pickle.loads(pickle.dumps(cabrun.result)) == cabrun.result
+
+
+def test_spec_and_result_have_no_dict(cabrun):
+    assert not hasattr(cabrun.spec, '__dict__')
+    assert not hasattr(cabrun.result, '__dict__')
+
+
+def runs_grid():
+    """Return Runs over a grid of wall widths, for every choice of fillers."""
+    return [C.Run(width, 28.5, 24.0, fillers=ends)
+            for ends in C.Ends
+            for width in np.arange(12.0, 480.0, 0.3125)]
+
+
+@pytest.mark.parametrize('prop', [
+    'num_cabinets', 'cabinet_width', 'extra_width', 'num_fillers',
+    'filler_width', 'filler_height', 'filler_thickness', 'num_backpanels',
+    'back_width', 'back_height', 'back_thickness', 'num_bottompanels',
+    'bottom_thickness', 'bottom_width', 'bottom_depth', 'num_sidepanels',
+    'side_depth', 'side_height', 'side_thickness', 'num_topnailers',
+    'topnailer_width', 'topnailer_depth', 'topnailer_thickness', 'num_doors',
+    'door_width', 'door_height'])
+def test_runbatch_matches_run(prop):
+    runs = runs_grid()
+    batch = C.RunBatch.from_runs(runs)
+    expected = [np.nan if getattr(run, prop) is None else getattr(run, prop)
+                for run in runs]
+    np.testing.assert_array_equal(getattr(batch, prop), expected)
+
+
+@pytest.mark.parametrize('num_fillers', [0, 1, 2])
+@pytest.mark.parametrize('extra_cabinets', [0, 1, 3])
+def test_solve_cabinet_width_matches_search(num_fillers, extra_cabinets):
+    for width in np.arange(12.0, 480.0, 1 / 64).tolist():
+        num_cabinets = math.ceil(width / C.MAX_CABINET_WIDTH) + extra_cabinets
+        assert (C._solve_cabinet_width(width, num_cabinets, num_fillers)
+                == C._search_cabinet_width(width, num_cabinets, num_fillers))
+
+
+def test_runbatch_broadcasts_scalars():
+    batch = C.RunBatch([157.25, 183.0], 28.5, 24.0,
+                       fillers=[C.Ends.NEITHER, C.Ends.LEFT])
+    assert list(batch.num_cabinets) == [5, 6]
+    assert list(batch.cabinet_width) == [31.45, 30.0]
+    assert np.isnan(batch.filler_width[0])
+    assert batch.filler_width[1] == 3.0
+
+
+def test_runbatch_num_cabinets():
+    batch = C.RunBatch(157.25, 28.5, 24.0, num_cabinets=[5, 6, 7])
+    assert list(batch.num_cabinets) == [5, 6, 7]
+    assert list(batch.cabinet_width) == [157.25 / 5, 157.25 / 6, 157.25 / 7]
+
+
+def test_sweep_is_ranked():
+    cands = C.sweep(157.25, 28.5, 24.0)
+    assert [c.score for c in cands] == sorted(c.score for c in cands)
+    assert cands[0] == C.SweepCandidate(5, C.Ends.NEITHER, 31.45, None, 0.0,
+                                        40, 5, 25.0)
+
+
+def test_sweep_includes_run_choices():
+    cands = C.sweep(183.0, 28.0, 24.0)
+    for ends in C.Ends:
+        run = C.Run(183.0, 28.0, 24.0, fillers=ends)
+        assert any(c.num_cabinets == run.num_cabinets and c.fillers is ends
+                   and c.cabinet_width == run.cabinet_width
+                   and c.filler_width == run.filler_width for c in cands)
+
+
+def test_sweep_candidates_are_feasible():
+    for c in C.sweep(250.0, 30.0, 24.0):
+        assert C.MIN_CABINET_WIDTH <= c.cabinet_width <= C.MAX_CABINET_WIDTH
+        if c.fillers is not C.Ends.NEITHER:
+            assert C.MIN_FILLER_WIDTH <= c.filler_width <= C.MAX_FILLER_WIDTH
+
+
+def test_sweep_batch_matches_sweep():
+    widths = [96.0, 157.25, 183.0, 250.5]
+    batch = C.sweep_batch(widths, 28.5, 24.0)
+    for i, width in enumerate(widths):
+        cands = batch[batch['wall'] == i]
+        assert list(cands['rank']) == list(range(len(cands)))
+        assert (list(cands['score'])
+                == [c.score for c in C.sweep(width, 28.5, 24.0)])
+
+
+def _brute_partition_score(fullwidth, fillers, catalog, max_distinct):
+    nf = {C.Ends.NEITHER: 0, C.Ends.LEFT: 1, C.Ends.RIGHT: 1,
+          C.Ends.BOTH: 2}[fillers]
+    best = math.inf
+    for n in range(1, int(fullwidth // min(catalog)) + 1):
+        for combo in itertools.combinations_with_replacement(catalog, n):
+            distinct = len(set(combo))
+            waste = fullwidth - sum(combo)
+            if distinct > max_distinct:
+                continue
+            if nf == 0 and abs(waste) > 1e-9:
+                continue
+            if nf and not (nf * C.MIN_FILLER_WIDTH - 1e-9 <= waste
+                           <= nf * C.MAX_FILLER_WIDTH + 1e-9):
+                continue
+            score = (waste + 0.5 * (7 * n + nf)
+                     + (1 + 4 * distinct + (nf > 0)))
+            best = min(best, score)
+    return best
+
+
+@pytest.mark.parametrize('fullwidth', [60.0, 75.5, 96.0, 101.25, 123.0])
+@pytest.mark.parametrize('fillers', list(C.Ends))
+def test_partition_run_is_optimal(fullwidth, fillers):
+    catalog = (15.0, 18.0, 24.0, 30.0, 36.0)
+    expected = _brute_partition_score(fullwidth, fillers, catalog, 2)
+    if expected == math.inf:
+        with pytest.raises(ValueError):
+            C.partition_run(fullwidth, fillers, catalog, max_distinct=2)
+        return
+    part = C.partition_run(fullwidth, fillers, catalog, max_distinct=2)
+    assert part.score == pytest.approx(expected)
+    assert len(set(part.widths)) <= 2
+    assert set(part.widths) <= set(catalog)
+    assert sum(part.widths) + part.filler_waste == pytest.approx(fullwidth)
+
+
+def test_partition_run_fields():
+    part = C.partition_run(100.0, C.Ends.RIGHT)
+    assert part.widths == (33.0, 33.0, 33.0)
+    assert part.fillers is C.Ends.RIGHT
+    assert part.filler_width == 1.0
+    assert part.part_count == 22
+    assert part.distinct_sizes == 6
+    part = C.partition_run(96.0)
+    assert part.filler_width is None and part.filler_waste == 0.0
+
+
+def test_partition_run_stacked_bottoms():
+    alike = C.partition_run(100.0, C.Ends.RIGHT,
+                            btmpanel_thicknesses=[0.75, 0.75])
+    assert alike.part_count == 25
+    assert alike.distinct_sizes == 6
+    mixed = C.partition_run(100.0, C.Ends.RIGHT,
+                            btmpanel_thicknesses=[0.75, 1.0])
+    assert mixed.widths == alike.widths
+    assert mixed.distinct_sizes == 7
+    assert mixed.score == alike.score + 1
+    run = C.Run(100.0, 28.5, 24.0, C.Ends.RIGHT, has_legs=True,
+                btmpanel_thicknesses=[0.75, 1.0])
+    sizes = {(float(p['width']), float(p['height']), float(p['thickness']))
+             for p in run.parts}
+    assert run.cabinet_width == mixed.widths[0]
+    assert len(sizes) == mixed.distinct_sizes
+
+
+def test_partition_run_mixes_widths_for_40_feet():
+    part = C.partition_run(480.0)
+    assert sum(part.widths) == 480.0
+    assert len(set(part.widths)) == 2
+
+
+@pytest.mark.parametrize('catalog', [(), (0.0,), (12.03,), (37.0,)])
+def test_partition_run_bad_catalog(catalog):
+    with pytest.raises(ValueError):
+        C.partition_run(96.0, catalog=catalog)
+
+
+def test_partition_run_no_fit():
+    with pytest.raises(ValueError):
+        C.partition_run(100.5)
+
+
+def test_run_parts():
+    run = C.Run(183, 28, 24, fillers=C.Ends.LEFT)
+    parts = run.parts
+    assert parts.dtype == C.PART_DTYPE
+    assert list(parts['name']) == ['Back', 'Bottom', 'Side', 'Nailer',
+                                   'Filler', 'Door']
+    assert list(parts['qty']) == [6, 6, 12, 12, 1, 12]
+    door = parts[-1]
+    assert (door['width'], door['height']) == (run.door_width, run.door_height)
+    assert door['material'] == run.door_material
+    assert door['edges'] == 'TBLR'
+    assert set(parts['grain']) <= {'V', 'H', ''}
+
+
+def test_run_parts_grain():
+    run = C.Run(157.125, 27.875, 24, fillers=C.Ends.BOTH,
+                prim_material='Standard Plywood', door_material='Melamine')
+    grain = dict(zip(run.parts['name'], run.parts['grain']))
+    assert grain == {'Back': 'V', 'Bottom': 'H', 'Side': 'V', 'Nailer': 'H',
+                     'Filler': 'V', 'Door': ''}
+    run = C.Run(157.125, 27.875, 24, prim_material='Melamine',
+                door_material='Marine-Grade Plywood')
+    grain = dict(zip(run.parts['name'], run.parts['grain']))
+    assert grain == {'Back': '', 'Bottom': '', 'Side': '', 'Nailer': '',
+                     'Door': 'V'}
+
+
+def test_run_parts_no_fillers():
+    assert 'Filler' not in C.Run(157.125, 27.875, 24).parts['name']
+
+
+def test_run_parts_stacked_bottoms():
+    run = C.Run(183, 28, 24, has_legs=True,
+                btmpanel_thicknesses=[0.75, 1.0, 0.75])
+    bottoms = run.parts[run.parts['name'] == 'Bottom']
+    assert list(bottoms['thickness']) == [0.75, 1.0]
+    assert list(bottoms['qty']) == [12, 6]
+    assert bottoms['qty'].sum() == run.num_bottompanels
+
+
+def test_run_parts_cached_and_read_only():
+    run = C.Run(183, 28, 24)
+    parts = run.parts
+    assert run.parts is parts
+    with pytest.raises(ValueError):
+        parts['qty'][0] = 0
+    run.fullwidth = 186
+    assert run.parts is not parts
+    assert run.parts['width'][0] == run.back_width
+
+
 # test_cabinet.py  ends here
@@ -1,8 +1,11 @@
 # test_cabinet_calc.py    -*- coding: utf-8 -*-
 
 
+import pytest
+
 from cabinet_calc import cabinet_calc as CC
 from cabinet_calc import cabinet as Cab
+from cabinet_calc import dimension_strs as DS
 
 
 def test_get_parser():
@@ -111,4 +114,36 @@ def test_parse_shortopts_sepvals_primmatl():
     assert args.prim_thick == 0.77
 
 
+def test_parse_fractional_dimensions():
+    p = CC.get_parser()
+    args = p.parse_args(['-w', '157 1/8', '-ht', '34-1/2', '-d', '24"',
+                         '-pt', '3/4', '-bt', '3/8', '0.375'])
+    assert args.fullwidth == 157.125
+    assert args.height == 34.5
+    assert args.depth == 24.0
+    assert args.prim_thick == 0.75
+    assert args.btm_thicks == [0.375, 0.375]
+    with pytest.raises(SystemExit):
+        p.parse_args(['-w', '157 1/8 in.'])
+
+
+def test_parse_precision():
+    p = CC.get_parser()
+    assert DS.PRECISIONS[p.parse_args(['-w', '161']).precision] == (
+        DS.DEFAULT_FORMATTER)
+    args = p.parse_args(['-w', '161', '--precision', '0.1mm'])
+    assert DS.PRECISIONS[args.precision].units == 'mm'
+    args = p.parse_args(['-w', '161', '-pr', '1/32'])
+    assert DS.PRECISIONS[args.precision] == DS.Formatter(32)
+    with pytest.raises(SystemExit):
+        p.parse_args(['-w', '161', '-pr', '12'])
+
+
+def test_parse_panel_layout():
+    p = CC.get_parser()
+    assert not p.parse_args(['-w', '161']).panel_layout
+    assert p.parse_args(['-w', '161', '-p']).panel_layout
+    assert p.parse_args(['--panel_layout']).panel_layout
+
+
 # test_cabinet_calc.py  ends here
@@ -0,0 +1,57 @@
+# test_cutlist.py    -*- coding: utf-8 -*-
+
+
+import os
+
+import pytest
+from reportlab.graphics.shapes import Drawing, String
+
+from cabinet_calc import cabinet as C
+from cabinet_calc import cutlist as CL
+from cabinet_calc import job as J
+from cabinet_calc import nesting as N
+
+
+def drawn_panels(table):
+    """Return the names of the panels drawn in a table, in order."""
+    result = []
+    for row in table._cellvalues:
+        for cell in row:
+            if isinstance(cell, Drawing):
+                # The name of the panel is the first String of its drawing.
+                result.append(next(s.text for s in cell.contents
+                                   if isinstance(s, String)))
+    return result
+
+
+@pytest.fixture
+def job_mixed_bottoms():
+    run = C.Run(157.125, 27.875, 24, fillers=C.Ends.LEFT, has_legs=True)
+    run.bottom_thickness = 1.75
+    return J.Job('Kitchen', run)
+
+
+def test_panels_table():
+    run = C.Run(157.125, 27.875, 24)
+    assert drawn_panels(CL.panels_table(run)) == [
+        'Back', 'Side', 'Nailer', 'Bottom', 'Door']
+
+
+def test_panels_table_mixed_bottoms(job_mixed_bottoms):
+    table = CL.panels_table(job_mixed_bottoms.cabs)
+    assert drawn_panels(table) == [
+        'Back', 'Side', 'Nailer', 'Bottom', 'Bottom', 'Door', 'Filler']
+
+
+def test_content_mixed_bottoms(job_mixed_bottoms):
+    flowables = CL.content(job_mixed_bottoms)
+    texts = [getattr(f, 'text', '') for f in flowables]
+    for line in job_mixed_bottoms.partslist[1:3]:
+        assert any(line in text for text in texts)
+
+
+def test_save_cutlist(job_mixed_bottoms, tmp_path):
+    fname = str(tmp_path / 'cutlist')
+    CL.save_cutlist(fname, job_mixed_bottoms,
+                    N.nest(job_mixed_bottoms.parts))
+    assert os.path.getsize(fname + '.pdf') > 0
@@ -0,0 +1,145 @@
+# test_cutting.py    -*- coding: utf-8 -*-
+
+
+import random
+
+import pytest
+
+from cabinet_calc import cabinet as C
+from cabinet_calc import cutting as K
+from cabinet_calc import job as J
+from cabinet_calc import nesting as N
+
+
+EPS = 1e-9
+
+
+def assert_cuts_free(plan, kerf):
+    """Assert the cuts miss every part, and cut along every inside edge."""
+    sheet = plan.sheet
+    for cut in plan.cuts:
+        assert cut.length > 0 and cut.fence >= 0
+        for p in sheet.placements:
+            if cut.axis == 'x':
+                across = (p.x, p.x + p.width, p.y, p.y + p.height)
+            else:
+                across = (p.y, p.y + p.height, p.x, p.x + p.width)
+            lo, hi, start, end = across
+            assert (cut.position + kerf <= lo + EPS or cut.position >= hi - EPS
+                    or cut.end <= start + EPS or cut.start >= end - EPS)
+
+    def cut_along(axis, position, start, end):
+        return any(c.axis == axis and abs(c.position - position) <= EPS
+                   and c.start <= start + EPS and c.end >= end - EPS
+                   for c in plan.cuts)
+
+    for p in sheet.placements:
+        if p.x > EPS:
+            assert cut_along('x', p.x - kerf, p.y, p.y + p.height)
+        if p.x + p.width < sheet.width - EPS:
+            assert cut_along('x', p.x + p.width, p.y, p.y + p.height)
+        if p.y > EPS:
+            assert cut_along('y', p.y - kerf, p.x, p.x + p.width)
+        if p.y + p.height < sheet.length - EPS:
+            assert cut_along('y', p.y + p.height, p.x, p.x + p.width)
+
+
+@pytest.fixture
+def layout():
+    job = J.Job('Kitchen',
+                {'North Wall': C.Run(157.125, 27.875, 24),
+                 'West Wall': C.Run(183, 28, 24, fillers=C.Ends.LEFT,
+                                    has_legs=True)})
+    return N.nest(job.parts)
+
+
+def random_pieces(seed, count=40):
+    """Return count pieces of random sizes, from the seed."""
+    rng = random.Random(seed)
+    result = [N.Piece('Part', rng.uniform(3, 40), rng.uniform(3, 40), 0.75,
+                      'Melamine') for _ in range(count)]
+    return result
+
+
+def test_quarters():
+    pieces = [N.Piece('Quarter', 24, 48, 0.75, 'Melamine',
+                      N.Rotation.FIXED)] * 4
+    (plan,) = K.cut_plan(N.nest(pieces, kerf=0.0))
+    assert [(c.axis, c.position, c.turned) for c in plan.cuts] == [
+        ('x', 24.0, False), ('y', 48.0, True), ('y', 48.0, True)]
+    assert plan.turns == 2
+    assert_cuts_free(plan, 0.0)
+
+
+def test_rips_first():
+    pieces = [N.Piece('Strip', 4, 96, 0.75, 'Melamine')] * 3
+    (plan,) = K.cut_plan(N.nest(pieces))
+    assert plan.turns == 0
+    assert all(c.axis == 'x' for c in plan.cuts)
+    assert [c.fence for c in plan.cuts] == [4.0, 8.125, 12.25]
+    assert plan.travel == 12.25
+
+
+@pytest.mark.parametrize('kerf', [0.0, 0.125, 0.5])
+@pytest.mark.parametrize('algorithm', ['guillotine', 'random', 'exact'])
+def test_cut_plan(kerf, algorithm):
+    job = J.Job('Kitchen', C.Run(183, 28, 24, fillers=C.Ends.LEFT,
+                                 has_legs=True))
+    layout = N.nest(job.parts, kerf=kerf, algorithm=algorithm)
+    plans = K.cut_plan(layout)
+    assert [plan.sheet for plan in plans] == list(layout.sheets)
+    for plan in plans:
+        assert_cuts_free(plan, kerf)
+        assert plan.turns == sum(c.turned for c in plan.cuts)
+        assert plan.seconds > K.SAW.load_time
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_cut_plan_portfolio(seed):
+    layout = N.portfolio(random_pieces(seed), 5.0, max_workers=1,
+                         algorithms=['guillotine', 'maxrects', 'skyline'])
+    plans = K.cut_plan(layout)
+    assert [plan.sheet for plan in plans] == list(layout.sheets)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_cut_plan_anytime(seed):
+    for progress in N.anytime(random_pieces(seed), restarts=5, seed=seed):
+        plans = K.cut_plan(progress.layout)
+        assert [plan.sheet for plan in plans] == list(progress.layout.sheets)
+
+
+def test_cut_plan_batch(layout):
+    plans = K.cut_plan([layout, layout])
+    assert len(plans) == 2 * layout.num_sheets
+    assert plans[:layout.num_sheets] == plans[layout.num_sheets:]
+
+
+def test_saw_speeds(layout):
+    (plan,) = K.cut_plan(N.Layout(layout.sheets[:1], layout.kerf))
+    slow = K.sheet_plan(plan.sheet, layout.kerf,
+                        K.SAW._replace(turn_time=2 * K.SAW.turn_time))
+    assert slow.cuts == plan.cuts
+    assert slow.seconds == pytest.approx(
+        plan.seconds + plan.turns * K.SAW.turn_time)
+
+
+def test_not_guillotine():
+    # Four pieces around a square hole, which no straight cut can free.
+    a = N.Piece('A', 30, 10, 0.75, 'Melamine', N.Rotation.FIXED)
+    b = N.Piece('B', 10, 30, 0.75, 'Melamine', N.Rotation.FIXED)
+    placements = (N.Placement(a, 0, 0, False), N.Placement(b, 30, 0, False),
+                  N.Placement(a, 10, 30, False), N.Placement(b, 0, 10, False))
+    sheet = N.SheetLayout('Melamine', 0.75, 40, 40, placements)
+    with pytest.raises(ValueError):
+        K.sheet_plan(sheet, 0.0)
+
+
+def test_summary(layout):
+    plans = K.cut_plan(layout)
+    lines = K.summary(plans)
+    assert lines[0].startswith('Cut Sequence:  {} sheets'.format(len(plans)))
+    assert len(lines) == 1 + 2 * len(plans) + sum(len(p.cuts) for p in plans)
+
+
+# test_cutting.py  ends here
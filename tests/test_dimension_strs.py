@@ -1,9 +1,34 @@
 # test_dimension_strs.py    -*- coding: utf-8 -*-
 
 
+from fractions import Fraction
+import math
+
+import numpy as np
+import pytest
+
 from cabinet_calc import dimension_strs as DS
 
 
+def fraction_dimstr(x, n=16):
+    """Return dimstr(x) as it was first written, with Fractions."""
+    nths_frac, nths_int = math.modf(x * n)
+    i, nths_int = divmod(int(nths_int), n)
+    if (nths_frac < 0.5 or nths_frac == 0.5 and nths_int % 2 == 0):
+        frac, suffix = Fraction(nths_int, n), '+' if nths_frac >= 0.25 else ''
+    else:
+        frac, suffix = Fraction(nths_int + 1, n), '' if nths_frac > 0.75 else '-'
+    if frac == 1:
+        result = str(i + 1)
+    elif frac == 0:
+        result = str(i)
+    elif i == 0:
+        result = str(frac)
+    else:
+        result = str(i) + ' ' + str(frac)
+    return result + suffix
+
+
 class TestDimstr:
     def test_zero(self):
         assert DS.dimstr(0) == '0'
@@ -19,6 +44,43 @@ class TestDimstr:
         # Do we care about supporting Python 2.7, since it's EOL?
         assert DS.dimstr(11 + 2./7) == '11 5/16-'
 
+    def test_negative(self):
+        assert DS.dimstr(-0.3) == '-1 3/4'
+
+    def test_within_a_sixty_fourth(self):
+        assert DS.dimstr(17.26) == '17 1/4'
+        assert DS.dimstr(17.24) == '17 1/4'
+        assert DS.dimstr(17.99) == '18'
+
+    def test_strong_and_shy(self):
+        assert DS.dimstr(17.2683) == '17 1/4+'
+        assert DS.dimstr(17.29) == '17 5/16-'
+
+    def test_exact_half_rounds_to_even(self):
+        assert DS.dimstr(1 / 32) == '0+'
+        assert DS.dimstr(3 / 32) == '1/8-'
+        assert DS.dimstr(31 / 32) == '1-'
+        assert DS.dimstr(3 + 1 / 32) == '3+'
+        assert DS.dimstr(3 + 3 / 32) == '3 1/8-'
+
+    def test_matches_fractions(self):
+        for k in range(-64, 64 * 40):
+            x = k / 64 + 0.001 * (k % 7)
+            assert DS.dimstr(x) == fraction_dimstr(x)
+
+
+class TestThicknessStr:
+    def test_nominal(self):
+        assert DS.thickness_str(0.74) == '3/4'
+        assert DS.thickness_str(0.76) == '3/4'
+        assert DS.thickness_str(1.0) == '1'
+        assert DS.thickness_str(1.2) == '1 1/4'
+
+    def test_exact_half_rounds_to_even(self):
+        assert DS.thickness_str(0.125) == '0'
+        assert DS.thickness_str(0.375) == '1/2'
+        assert DS.thickness_str(0.875) == '1'
+
 
 class TestDimstrCol:
     def test_zero(self):
@@ -37,6 +99,160 @@ class TestDimstrCol:
         assert DS.dimstr_col(0.27) == '1/4+'
 
 
+class TestArrays:
+    # Exact sixty-fourths and thirty-seconds hit every branch of dimstr(),
+    # including the halves that round to even; the rest are near them.
+    values = np.concatenate([np.arange(-128, 64 * 40) / 64,
+                             np.arange(-128, 64 * 40) / 64 + 1e-9,
+                             np.arange(-128, 64 * 40) / 64 - 1e-9,
+                             np.linspace(-3, 200, 5001)])
+
+    def test_dimstr_array(self):
+        assert DS.dimstr_array(self.values).tolist() == [
+            DS.dimstr(x) for x in self.values]
+
+    def test_dimstr_col_array(self):
+        assert DS.dimstr_col_array(self.values).tolist() == [
+            DS.dimstr_col(x) for x in self.values]
+
+    def test_thickness_str_array(self):
+        assert DS.thickness_str_array(self.values).tolist() == [
+            DS.thickness_str(x) for x in self.values]
+
+    def test_shape(self):
+        result = DS.dimstr_array([[0.25, 1.0], [3.03125, -0.3]])
+        assert result.tolist() == [['1/4', '1'], ['3+', '-1 3/4']]
+        assert DS.dimstr_array([]).shape == (0,)
+        assert DS.thickness_str_array(0.74).shape == ()
+
+    def test_not_finite(self):
+        with pytest.raises(ValueError):
+            DS.dimstr_array([1.0, np.nan])
+        with pytest.raises(ValueError):
+            DS.thickness_str_array([np.inf])
+
+
+class TestFormatter:
+    values = TestArrays.values.tolist()
+
+    def test_default_matches_functions(self):
+        fmt = DS.Formatter()
+        assert fmt == DS.DEFAULT_FORMATTER
+        assert fmt.unit == '"'
+        for x in self.values:
+            assert fmt.dimstr(x) == DS.dimstr(x)
+            assert fmt.dimstr_col(x) == DS.dimstr_col(x)
+            assert fmt.thickness_str(x) == DS.thickness_str(x)
+
+    @pytest.mark.parametrize('n', DS.DENOMINATORS)
+    def test_denominators(self, n):
+        fmt = DS.Formatter(n)
+        assert [fmt.dimstr(x) for x in self.values] == [
+            fraction_dimstr(x, n) for x in self.values]
+        assert fmt.thickness_str(0.74) == '3/4'
+
+    def test_thirty_seconds(self):
+        fmt = DS.Formatter(32)
+        assert fmt.dimstr(17.2683) == '17 9/32-'
+        assert fmt.dimstr(3 + 1 / 32) == '3 1/32'
+        assert fmt.dimstr_col(3 + 1 / 32) == ' 3 1/32'
+
+    def test_mm(self):
+        fmt = DS.Formatter(units='mm', decimals=1)
+        assert fmt.unit == ' mm'
+        assert fmt.dimstr(34.5) == '876.3'
+        assert fmt.dimstr_col(0.5) == '  12.7'
+        assert fmt.dimstr_col(96) == '2438.4'
+        assert fmt.thickness_str(0.74) == '18.8'
+        assert fmt.decimal_str(157.125) == '3991.0'
+        fmt = DS.Formatter(units='mm', decimals=0)
+        assert fmt.dimstr(34.5) == '876'
+        assert fmt.dimstr_col(0.75) == '  19'
+
+    def test_decimal_str(self):
+        assert DS.DEFAULT_FORMATTER.decimal_str(157.125) == '157.125'
+
+    def test_cache_is_bounded(self):
+        fmt = DS.Formatter(cache_size=100)
+        for x in self.values:
+            fmt.dimstr(x)
+        assert fmt.dimstr(self.values[-1]) == DS.dimstr(self.values[-1])
+        info = fmt.cache_info()
+        assert info.currsize == 100
+        assert info.hits >= 1
+        fmt.cache_clear()
+        assert fmt.cache_info().currsize == 0
+
+    def test_equality(self):
+        assert DS.Formatter(32) != DS.Formatter(64)
+        assert DS.Formatter(units='mm') == DS.Formatter(8, units='mm')
+        assert DS.Formatter(units='mm') != DS.Formatter(units='mm', decimals=0)
+        assert len({DS.Formatter(), DS.Formatter(cache_size=10)}) == 1
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            DS.Formatter(10)
+        with pytest.raises(ValueError):
+            DS.Formatter(units='cm')
+        with pytest.raises(ValueError):
+            DS.Formatter(units='mm', decimals=-1)
+        with pytest.raises(ValueError):
+            DS.Formatter(cache_size=0)
+
+    def test_precisions(self):
+        assert DS.PRECISIONS[DS.PRECISION_DEFAULT] is DS.DEFAULT_FORMATTER
+        assert len(set(DS.PRECISIONS.values())) == len(DS.PRECISIONS)
+        assert DS.PRECISIONS['1/32'].dimstr(31.40625) == '31 13/32'
+
+
+class TestParseDimstr:
+    def test_decimal(self):
+        assert DS.parse_dimstr('11.375') == 11.375
+        assert DS.parse_dimstr(' .5 ') == 0.5
+        assert DS.parse_dimstr('17') == 17.0
+
+    def test_fractions(self):
+        assert DS.parse_dimstr('11 3/8') == 11.375
+        assert DS.parse_dimstr('1-1/2') == 1.5
+        assert DS.parse_dimstr('1 - 1/2') == 1.5
+        assert DS.parse_dimstr('3/4') == 0.75
+        assert DS.parse_dimstr('5/4') == 1.25
+
+    def test_units(self):
+        assert DS.parse_dimstr('34 5/16"') == 34.3125
+        assert DS.parse_dimstr('2.5 in') == 2.5
+        assert DS.parse_dimstr(' 8 3/4"') == 8.75
+
+    def test_strong_and_shy(self):
+        assert DS.parse_dimstr('22 3/8+') == 22.375 + 3 / 128
+        assert DS.parse_dimstr('34 5/16-"') == 34.3125 - 3 / 128
+        assert DS.parse_dimstr('1-') == 1 - 3 / 128
+        assert DS.parse_dimstr('3 1/32+', 32) == 3 + 1 / 32 + 3 / 256
+
+    def test_negative(self):
+        assert DS.parse_dimstr('-1.5') == -1.5
+        assert DS.parse_dimstr('-3/4') == -0.75
+        assert DS.parse_dimstr('-1 3/4') == -0.25
+
+    @pytest.mark.parametrize('n', DS.DENOMINATORS)
+    def test_inverse_of_dimstr(self, n):
+        fmt = DS.Formatter(n)
+        for x in TestArrays.values.tolist():
+            for s in (fmt.dimstr(x), fmt.dimstr_col(x) + '"'):
+                assert fmt.dimstr(DS.parse_dimstr(s, n)) == fmt.dimstr(x)
+
+    def test_thickness_str(self):
+        for x in (0.25, 0.5, 0.74, 0.75, 1.0, 1.5):
+            assert DS.parse_dimstr(DS.thickness_str(x)) == round(x * 4) / 4
+
+    @pytest.mark.parametrize('s', ['', 'abc', 'nan', 'inf', '-inf', '3/0',
+                                   '1 4/4', '1 1/2/3', '--1', '1 1/2 3',
+                                   '3/4 mm', '1.5.2'])
+    def test_invalid(self, s):
+        with pytest.raises(ValueError):
+            DS.parse_dimstr(s)
+
+
 class TestSDAlign:
     def test_four(self):
         assert DS.sdalign('4') == ' 4'
@@ -5,6 +5,7 @@ import pytest
 
 from cabinet_calc import cabinet as C
 from cabinet_calc import job as J
+from cabinet_calc import dimension_strs as DS
 
 
 @pytest.fixture
@@ -240,4 +241,152 @@ def test_job_single_cabinet_specification(job_single_cabinet):
     ]
 
 
+@pytest.fixture
+def job_multirun():
+    return J.Job('Kitchen',
+                 {'North Wall': C.Run(157.125, 27.875, 24),
+                  'West Wall': C.Run(183, 28, 24, fillers=C.Ends.LEFT)},
+                 desc='Two walls.')
+
+
+def test_job_single_run_name(job):
+    assert list(job.runs) == [J.DEFAULT_RUN_NAME]
+    assert not job.multirun
+
+
+def test_job_multirun_cabs(job_multirun):
+    assert job_multirun.multirun
+    assert job_multirun.cabs is job_multirun.runs['North Wall']
+
+
+def test_job_multirun_header(job_multirun):
+    assert job_multirun.header == [
+        'Job Name: Kitchen', 'Description: Two walls.',
+        'Total Wall Space: 340.125"'
+    ]
+
+
+def test_job_multirun_summaryln(job_multirun):
+    assert job_multirun.summaryln == [
+        'Run: North Wall (157.125")',
+        '5 cabinets measuring 31 7/16" totalling 157 1/8"'
+        ', with finished end panels on left and right.'
+        ' No filler panels required.',
+        'Run: West Wall (183")',
+        '6 cabinets measuring 30" totalling 180"'
+        ', with a 3" filler on the left.'
+    ]
+
+
+def test_job_multirun_totals(job_multirun):
+    assert job_multirun.totals == [
+        'Runs:               2',
+        'Cabinets:          11',
+        'Back Panels:       11',
+        'Bottom Panels:     11',
+        'Side Panels:       22',
+        'Top Nailers:       22',
+        'Fillers:            1',
+        'Doors:             22'
+    ]
+
+
+def test_job_multirun_specification(job_multirun, job, job_filler_l):
+    spec = job_multirun.specification
+    sep = '-' * 65
+    assert spec[:5] == [sep, 'Job Name: Kitchen', 'Description: Two walls.',
+                        'Total Wall Space: 340.125"', sep]
+    north = spec.index('Run: North Wall (157.125")')
+    west = spec.index('Run: West Wall (183")')
+    assert spec[north + 4:north + 4 + len(job.overview)] == job.overview
+    assert job_filler_l.partslist[-1] in spec[west:]
+    assert spec[-len(job_multirun.totals) - 4:] == (
+        [sep, 'Job Totals:', ''] + job_multirun.totals + [sep])
+
+
+def test_job_multirun_recomputes_only_changed_run(job_multirun):
+    north_before = job_multirun.run_info('North Wall')
+    west_before = job_multirun.run_info('West Wall')
+    job_multirun.runs['West Wall'].fullwidth = 186
+    assert job_multirun.run_info('North Wall') is north_before
+    west_after = job_multirun.run_info('West Wall')
+    assert west_after is not west_before
+    assert west_after.summaryln == [
+        '6 cabinets measuring 30 1/2" totalling 183"'
+        ', with a 3" filler on the left.'
+    ]
+    assert 'Cabinets:          11' in job_multirun.totals
+
+
+def test_job_add_remove_run(job):
+    job.add_run('Island', C.Run(48, 34.5, 24))
+    assert job.multirun
+    with pytest.raises(ValueError):
+        job.add_run('Island', C.Run(48, 34.5, 24))
+    job.remove_run('Island')
+    assert not job.multirun
+    with pytest.raises(ValueError):
+        job.remove_run(J.DEFAULT_RUN_NAME)
+
+
+def test_run_partslist_mixed_stacked_bottoms():
+    # Stacked bottoms of different thicknesses get a line for each thickness,
+    # with the number of panels of that thickness, rather than one line for
+    # all of them at the total thickness of a stack (1 3/4").
+    run = C.Run(157.125, 27.875, 24, has_legs=True,
+                btmpanel_thicknesses=[0.75, 1.0])
+    assert J.run_partslist(run)[1:3] == [
+        'Bottom Panels:    5  @  29 15/16"   x  22 3/8"     x  3/4"',
+        'Bottom Panels:    5  @  29 15/16"   x  22 3/8"     x  1"'
+    ]
+    run = C.Run(157.125, 27.875, 24, has_legs=True,
+                btmpanel_thicknesses=[0.75, 0.75])
+    assert J.run_partslist(run)[1] == (
+        'Bottom Panels:   10  @  29 15/16"   x  22 3/8"     x  3/4"')
+
+
+def test_job_mixed_stacked_bottoms():
+    job = J.Job('Kitchen', C.Run(157.125, 27.875, 24, has_legs=True))
+    job.cabs.bottom_thickness = 1.75
+    assert job.cabs.btmpanel_thicknesses == [0.75, 1.0]
+    assert job.summaryln[0].startswith('5 cabinets measuring 31 7/16"')
+    assert job.cabinfo[0] == 'Number of cabinets needed:  5'
+    assert job.partslist[1:3] == [
+        'Bottom Panels:    5  @  29 15/16"   x  22 3/8"     x  3/4"',
+        'Bottom Panels:    5  @  29 15/16"   x  22 3/8"     x  1"'
+    ]
+    assert job.materialinfo[-1] == (
+        'Bottom Material:  3/4" + 1" Standard Plywood, stacked x 2')
+    spec = job.specification
+    assert job.materialinfo[-1] in spec
+    assert job.partslist[1] in spec and job.partslist[2] in spec
+
+
+def test_job_formatter(job):
+    assert job.formatter is DS.DEFAULT_FORMATTER
+    info = job.run_info(J.DEFAULT_RUN_NAME)
+    job.formatter = DS.Formatter()
+    assert job.run_info(J.DEFAULT_RUN_NAME) is info
+    job.formatter = DS.Formatter(units='mm', decimals=0)
+    assert job.header[-1] == 'Total Wall Space: 3991 mm'
+    assert job.summaryln == [
+        '5 cabinets measuring 798 mm totalling 3991 mm, with finished end'
+        ' panels on left and right. No filler panels required.'
+    ]
+    assert job.partslist[0] == (
+        'Back Panels:      5  @   798 mm     x   708 mm     x  19 mm')
+
+
+def test_job_formatter_thirty_seconds():
+    job = J.Job('Job 32', C.Run(157.125, 27.875, 24),
+                formatter=DS.Formatter(32))
+    assert job.cabinfo == ['Number of cabinets needed:  5',
+                           'Single cabinet width:  31 7/16-"']
+
+
+def test_job_no_runs():
+    with pytest.raises(ValueError):
+        J.Job('Empty', {})
+
+
 # test_job.py  ends here
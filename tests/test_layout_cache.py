@@ -0,0 +1,76 @@
+# test_layout_cache.py    -*- coding: utf-8 -*-
+
+
+import pytest
+
+from cabinet_calc import layout_cache as LC
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LC.LayoutCache(str(tmp_path / 'cache' / 'layouts.sqlite'))
+
+
+def test_content_key():
+    assert LC.content_key({'a': 1, 'b': [2.5]}) == LC.content_key(
+        {'b': [2.5], 'a': 1})
+    assert LC.content_key([1, 2]) != LC.content_key([2, 1])
+
+
+def test_get_put(cache):
+    assert cache.get('k') is None
+    cache.put('k', [[48.0, 96.0, [[0, 0.0, 0.0, False]]]])
+    assert cache.get('k') == [[48.0, 96.0, [[0, 0.0, 0.0, False]]]]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(cache) == 1
+
+
+def test_persistent(cache):
+    cache.put('k', {'sheets': 3})
+    cache.close()
+    assert LC.LayoutCache(cache.filename).get('k') == {'sheets': 3}
+
+
+def test_lru_eviction(tmp_path):
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'), max_size=30)
+    for key in 'abc':
+        cache.put(key, key * 8)
+    assert cache.get('a') is not None
+    cache.put('d', 'd' * 8)
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.size <= 30
+
+
+def test_record_too_big(tmp_path):
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'), max_size=10)
+    cache.put('k', 'x' * 20)
+    assert cache.get('k') is None
+
+
+def test_clear(cache):
+    cache.put('k', 1)
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_bad_size():
+    with pytest.raises(ValueError):
+        LC.LayoutCache('layouts.sqlite', max_size=0)
+
+
+def test_sqlite_store(tmp_path):
+    class Store(LC.SQLiteStore):
+        _SCHEMA = ('CREATE TABLE IF NOT EXISTS items (name TEXT)',)
+
+    store = Store(str(tmp_path / 'data' / 'items.sqlite'))
+    with store._connection() as db:
+        db.execute("INSERT INTO items VALUES ('a')")
+    assert store._connection() is store._connection()
+    store.close()
+    assert store._db is None
+    assert store._connection().execute(
+        'SELECT name FROM items').fetchall() == [('a',)]
+
+
+# test_layout_cache.py  ends here
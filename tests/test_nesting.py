@@ -0,0 +1,453 @@
+# test_nesting.py    -*- coding: utf-8 -*-
+
+
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from cabinet_calc import cabinet as C
+from cabinet_calc import job as J
+from cabinet_calc import layout_cache as LC
+from cabinet_calc import nesting as N
+from cabinet_calc import remnants as R
+
+
+EPS = 1e-9
+
+
+def assert_valid(layout, pieces):
+    """Assert the layout holds every piece once, on its sheet, apart by kerf."""
+    placed = [p.piece for sheet in layout.sheets for p in sheet.placements]
+    assert sorted(placed) == sorted(pieces)
+    for sheet in layout.sheets:
+        for p in sheet.placements:
+            assert p.piece.material == sheet.material
+            assert p.piece.thickness == sheet.thickness
+            assert p.rotated in p.piece.rotation.orientations
+            assert p.x >= -EPS and p.y >= -EPS
+            assert p.x + p.width <= sheet.width + EPS
+            assert p.y + p.height <= sheet.length + EPS
+        for i, a in enumerate(sheet.placements):
+            for b in sheet.placements[i + 1:]:
+                assert (a.x + a.width + layout.kerf <= b.x + EPS
+                        or b.x + b.width + layout.kerf <= a.x + EPS
+                        or a.y + a.height + layout.kerf <= b.y + EPS
+                        or b.y + b.height + layout.kerf <= a.y + EPS)
+
+
+@pytest.fixture
+def job():
+    return J.Job('Kitchen',
+                 {'North Wall': C.Run(157.125, 27.875, 24),
+                  'West Wall': C.Run(183, 28, 24, fillers=C.Ends.LEFT,
+                                     has_legs=True)})
+
+
+def test_rotation_from_grain():
+    assert N.Rotation.from_grain('V') is N.Rotation.FIXED
+    assert N.Rotation.from_grain('H') is N.Rotation.TURNED
+    assert N.Rotation.from_grain('') is N.Rotation.FREE
+    with pytest.raises(ValueError):
+        N.Rotation.from_grain('X')
+
+
+def test_expand_parts(job):
+    pieces = N.expand_parts(job.parts, tag='K')
+    assert len(pieces) == job.parts['qty'].sum()
+    assert all(p.tag == 'K' for p in pieces)
+    doors = [p for p in pieces if p.name == 'Door']
+    assert doors[0].rotation is N.Rotation.FREE
+    assert doors[0].material == 'Melamine'
+    sides = [p for p in pieces if p.name == 'Side']
+    assert sides[0].rotation is N.Rotation.FIXED
+    assert sides[0].material == 'Standard Plywood'
+
+
+@pytest.mark.parametrize('algorithm', list(N.ALGORITHMS))
+def test_nest_job(job, algorithm):
+    layout = N.nest(job.parts, algorithm=algorithm)
+    assert_valid(layout, N.expand_parts(job.parts))
+    assert [s.material for s in layout.sheets] == sorted(
+        (s.material for s in layout.sheets), key=C.MATERIALS.index)
+    assert 0 < layout.utilization < 1
+
+
+def test_nest_default(job):
+    assert N.nest(job.parts) == N.nest(job.parts, algorithm='guillotine')
+    small = C.Run(36, 28.5, 24).parts
+    assert N.nest(small, algorithm='auto') == N.nest(small, algorithm='exact')
+
+
+@pytest.mark.parametrize('algorithm', ['guillotine', 'maxrects', 'skyline'])
+@pytest.mark.parametrize('kerf', [0.0, 0.125, 0.5])
+def test_nest_kerf(job, kerf, algorithm):
+    layout = N.nest(job.parts, kerf=kerf, algorithm=algorithm)
+    assert layout.kerf == kerf
+    assert_valid(layout, N.expand_parts(job.parts))
+
+
+@pytest.mark.parametrize('algorithm', list(N.ALGORITHMS.values()))
+def test_algorithm_exact_fit(algorithm):
+    pieces = [N.Piece('Quarter', 24, 48, 0.75, 'Melamine')] * 4
+    sheets = algorithm(pieces, kerf=0)
+    assert len(sheets) == 1
+    assert sheets[0].utilization == 1
+
+
+@pytest.mark.parametrize('algorithm', [N.maxrects, N.skyline])
+def test_algorithm_rotation_rules(algorithm):
+    free = N.Piece('Strip', 96, 4, 0.75, 'Melamine', N.Rotation.FREE)
+    turned = N.Piece('Strip', 96, 4, 0.75, 'Melamine', N.Rotation.TURNED)
+    sheets = algorithm([free] * 5 + [turned] * 5)
+    assert len(sheets) == 1
+    assert all(p.rotated for p in sheets[0].placements)
+
+
+def test_random_restarts_never_worse(job):
+    pieces = N.expand_parts(job.parts)
+    plain = N.nest(pieces)
+    ply = [p for p in pieces if p.material == 'Standard Plywood']
+    sheets = N.random_restarts(ply, restarts=20, seed=1)
+    assert len(sheets) <= sum(s.material == 'Standard Plywood'
+                              for s in plain.sheets)
+    assert N.random_restarts(ply, restarts=20, seed=1) == sheets
+
+
+def test_guillotine_rotates_free_pieces_only():
+    free = N.Piece('Strip', 96, 4, 0.75, 'Melamine', N.Rotation.FREE)
+    fixed = N.Piece('Strip', 96, 4, 0.75, 'Melamine', N.Rotation.FIXED)
+    (sheet,) = N.guillotine([free] * 10)
+    assert all(p.rotated for p in sheet.placements)
+    with pytest.raises(ValueError):
+        N.guillotine([fixed])
+
+
+def test_lower_bound():
+    quarter = N.Piece('Quarter', 24, 48, 0.75, 'Melamine')
+    assert N.lower_bound([quarter] * 4, kerf=0) == 1
+    assert N.lower_bound([quarter] * 4) == 2
+    large = N.Piece('Large', 30, 60, 0.75, 'Melamine', N.Rotation.FIXED)
+    assert N.lower_bound([large] * 3 + [quarter]) == 3
+    wide = N.Piece('Wide', 30, 20, 0.75, 'Melamine', N.Rotation.FIXED)
+    assert N.lower_bound([wide] * 5) == 2
+
+
+def test_exact_beats_guillotine():
+    pieces = [p for p in N.expand_parts(C.Run(36, 28, 24).parts)
+              if p.material == 'Standard Plywood']
+    assert len(N.guillotine(pieces)) == 2
+    sheets = N.exact(pieces)
+    assert len(sheets) == N.lower_bound(pieces) == 1
+    assert_valid(N.Layout(tuple(sheets), N.DEFAULT_KERF), pieces)
+
+
+@pytest.mark.parametrize('width', [30, 48, 60, 72, 90, 108])
+def test_exact_small_runs(width):
+    run = C.Run(width, 28, 24, fillers=C.Ends.LEFT, has_legs=True)
+    pieces = N.expand_parts(run.parts)
+    layout = N.nest(run.parts)
+    assert_valid(layout, pieces)
+    heuristic = N.nest(run.parts, algorithm='guillotine')
+    assert N.lower_bound(pieces) <= layout.num_sheets <= heuristic.num_sheets
+
+
+def test_exact_grain():
+    run = C.Run(72, 28.5, 24, door_material='Standard Plywood')
+    pieces = N.expand_parts(run.parts)
+    assert all(p.rotation is not N.Rotation.FREE for p in pieces)
+    for bucket in N._buckets(pieces):
+        layout = N.Layout(tuple(N.exact(bucket)), N.DEFAULT_KERF)
+        assert_valid(layout, bucket)
+
+
+def test_exact_node_limit():
+    pieces = N.expand_parts(C.Run(36, 28, 24).parts)
+    ply = [p for p in pieces if p.material == 'Standard Plywood']
+    assert N.exact(ply, node_limit=0) == N.guillotine(ply)
+
+
+def test_nest_pieces_of_different_thickness_apart():
+    pieces = [N.Piece('A', 10, 10, 0.75, 'Melamine'),
+              N.Piece('B', 10, 10, 1.0, 'Melamine')]
+    layout = N.nest(pieces)
+    assert layout.num_sheets == 2
+    assert_valid(layout, pieces)
+
+
+def test_nest_part_too_big():
+    with pytest.raises(ValueError):
+        N.nest(C.Run(36, 100, 24).parts)
+
+
+def test_nest_part_without_area():
+    with pytest.raises(ValueError):
+        N.nest([N.Piece('Filler', -0.5, 28, 0.75, 'Melamine')])
+
+
+def test_nest_remnants(job):
+    store = R.RemnantStore(':memory:')
+    doors = store.add('Melamine', 0.76, 40, 60)
+    store.add('Melamine', 0.5, 48, 96)
+    store.add('Melamine', 0.76, 4, 4)
+    layout = N.nest(job.parts, remnants=store)
+    assert_valid(layout, N.expand_parts(job.parts))
+    remnant_sheets = [s for s in layout.sheets if s.remnant is not None]
+    assert [s.remnant for s in remnant_sheets] == [doors.id]
+    assert (remnant_sheets[0].width, remnant_sheets[0].length) == (40, 60)
+    assert layout.num_sheets - 1 <= N.nest(job.parts).num_sheets
+    assert len(store) == 3
+    assert 'remnant #{}'.format(doors.id) in '\n'.join(N.summary(layout))
+
+
+def test_nest_remnants_take_everything():
+    store = R.RemnantStore(':memory:')
+    for _ in range(2):
+        store.add('Melamine', 0.75, 24, 48)
+    pieces = [N.Piece('Quarter', 24, 48, 0.75, 'Melamine')] * 2
+    layout = N.nest(pieces, kerf=0, remnants=store)
+    assert layout.num_sheets == 2
+    assert all(s.remnant is not None for s in layout.sheets)
+
+
+def test_nest_max_workers(job):
+    layout = N.nest(job.parts, algorithm='guillotine', max_workers=2)
+    assert layout == N.nest(job.parts, algorithm='guillotine')
+    layout = N.nest(job.parts, max_workers=None)
+    assert_valid(layout, N.expand_parts(job.parts))
+
+
+def test_nest_executor(job, tmp_path):
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'))
+    with ProcessPoolExecutor(2) as executor:
+        layout = N.nest(job.parts, cache=cache, executor=executor)
+        assert N.nest(job.parts, cache=cache, executor=executor) == layout
+    assert_valid(layout, N.expand_parts(job.parts))
+    assert cache.hits == cache.misses == len(
+        {(s.material, s.thickness) for s in layout.sheets})
+
+
+def test_nest_cache_exact_cut_short(job, tmp_path, monkeypatch):
+    monkeypatch.setattr(N, 'EXACT_NODE_LIMIT', 0)
+    buckets = N._buckets(N.expand_parts(job.parts))
+    complete = [N._exact(bucket, (N.SHEET_WIDTH, N.SHEET_LENGTH),
+                         N.DEFAULT_KERF, 0, None)[1] for bucket in buckets]
+    assert not all(complete)
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'))
+    layout = N.nest(job.parts, algorithm='exact', cache=cache)
+    assert_valid(layout, N.expand_parts(job.parts))
+    assert len(cache) == sum(complete)
+
+
+def test_nest_jobs(job):
+    jobs = [job] + [J.Job('Bath {}'.format(i), C.Run(36 + 6 * i, 30, 21))
+                    for i in range(4)]
+    layout = N.nest_jobs(jobs, algorithm='guillotine')
+    assert_valid(layout, [p for j in jobs
+                          for p in N.expand_parts(j.parts, j.name)])
+    assert layout.num_sheets <= sum(
+        N.nest(j.parts, algorithm='guillotine').num_sheets for j in jobs)
+    assert any(len({p.piece.tag for p in s.placements}) > 1
+               for s in layout.sheets)
+    assert '[Bath 0]' in '\n'.join(N.summary(layout))
+
+
+def test_nest_jobs_many():
+    jobs = [J.Job('Job {}'.format(i), C.Run(72 + 12 * (i % 8), 28.5, 24))
+            for i in range(60)]
+    layout = N.nest_jobs(jobs)
+    assert_valid(layout, [p for j in jobs
+                          for p in N.expand_parts(j.parts, j.name)])
+    assert ({p.piece.tag for s in layout.sheets for p in s.placements}
+            == {j.name for j in jobs})
+
+
+def test_nest_jobs_same_name(job):
+    with pytest.raises(ValueError):
+        N.nest_jobs([job, J.Job(job.name, C.Run(36, 30, 21))])
+
+
+def test_offcuts():
+    piece = N.Piece('Shelf', 30, 20, 0.75, 'Melamine', N.Rotation.FIXED)
+    (sheet,) = N.guillotine([piece], kerf=0)
+    assert N.offcuts(sheet, 0) == [(0.0, 20.0, 30.0, 76.0),
+                                   (30.0, 0.0, 18.0, 96.0)]
+
+
+def test_renest_same_parts(job):
+    layout = N.nest(job.parts)
+    assert N.renest(layout, job.parts) == layout
+
+
+@pytest.mark.parametrize('change', [{'fillers': C.Ends.BOTH},
+                                    {'door_thickness': 0.5},
+                                    {'fullwidth': 150}])
+def test_renest_changed_run(change):
+    before = C.Run(183, 28, 24, fillers=C.Ends.LEFT)
+    after = C.Run(**dict(dict(fullwidth=183, height=28, depth=24,
+                              fillers=C.Ends.LEFT), **change))
+    layout = N.nest(before.parts)
+    relaid = N.renest(layout, after.parts, threshold=0)
+    assert_valid(relaid, N.expand_parts(after.parts))
+    # Every part that did not change stays where it was.
+    old = Counter(N.expand_parts(before.parts))
+    same = old & Counter(N.expand_parts(after.parts))
+    placed = {p for s in layout.sheets for p in s.placements}
+    kept = Counter(p.piece for s in relaid.sheets for p in s.placements
+                   if p in placed)
+    assert kept == same
+
+
+@pytest.mark.parametrize('algorithm', list(N.ALGORITHMS))
+def test_renest_falls_back(job, algorithm):
+    run = C.Run(183, 28, 24, fillers=C.Ends.BOTH)
+    layout = N.nest(job.parts, algorithm=algorithm)
+    relaid = N.renest(layout, run.parts, threshold=2, algorithm=algorithm)
+    assert_valid(relaid, N.expand_parts(run.parts))
+    assert relaid.num_sheets <= N.nest(run.parts,
+                                       algorithm=algorithm).num_sheets
+
+
+def test_portfolio(job):
+    layout = N.portfolio(job.parts, 5.0, max_workers=2)
+    assert_valid(layout, N.expand_parts(job.parts))
+    assert N._is_guillotine(layout.sheets, layout.kerf)
+    assert layout.num_sheets <= min(
+        N.nest(job.parts, algorithm=name).num_sheets
+        for name in ('guillotine', 'exact'))
+
+
+def test_portfolio_guillotine_only():
+    rng = random.Random(7)
+    pieces = [N.Piece('Part', rng.uniform(3, 40), rng.uniform(3, 40), 0.75,
+                      'Melamine') for _ in range(60)]
+    layout = N.portfolio(pieces, 5.0, algorithms=['maxrects', 'skyline'],
+                         max_workers=1)
+    assert_valid(layout, pieces)
+    assert N._is_guillotine(layout.sheets, layout.kerf)
+
+
+def test_make_guillotine():
+    rng = random.Random(7)
+    pieces = [N.Piece('Part', rng.uniform(3, 40), rng.uniform(3, 40), 0.75,
+                      'Melamine') for _ in range(60)]
+    sheets = N.maxrects(pieces)
+    assert not N._is_guillotine(sheets, N.DEFAULT_KERF)
+    redone = N._make_guillotine(sheets, (N.SHEET_WIDTH, N.SHEET_LENGTH),
+                                N.DEFAULT_KERF)
+    assert_valid(N.Layout(tuple(redone), N.DEFAULT_KERF), pieces)
+    assert N._is_guillotine(redone, N.DEFAULT_KERF)
+    # The guillotine sheets keep their placements, and may get more.
+    kept = [s for s in sheets if N._is_guillotine([s], N.DEFAULT_KERF)]
+    assert kept
+    for before, after in zip(kept, redone):
+        assert after.placements[:len(before.placements)] == before.placements
+
+
+def test_portfolio_past_deadline(job):
+    layout = N.portfolio(job.parts, 0.0, max_workers=1)
+    assert layout == N.nest(job.parts, algorithm='guillotine')
+
+
+def test_portfolio_executor(job):
+    with ProcessPoolExecutor(2) as executor:
+        layout = N.portfolio(job.parts, 5.0, algorithms=['skyline'],
+                             executor=executor)
+        assert layout.num_sheets <= N.nest(job.parts,
+                                           algorithm='guillotine').num_sheets
+        assert executor.submit(abs, -1).result() == 1
+
+
+@pytest.mark.parametrize('algorithm', ['guillotine', 'maxrects', 'skyline',
+                                       'exact'])
+def test_algorithm_deadline(job, algorithm):
+    pieces = N.expand_parts(job.parts)
+    pieces = [p for p in pieces if (p.material, p.thickness)
+              == (pieces[0].material, pieces[0].thickness)]
+    with pytest.raises(TimeoutError):
+        N.ALGORITHMS[algorithm](pieces, deadline=time.time() - 1.0)
+
+
+def test_anytime(job):
+    steps = list(N.anytime(job.parts, restarts=20))
+    assert steps[0].step == 1 and steps[0].improved
+    assert steps[0].layout == N.nest(job.parts, algorithm='guillotine')
+    for before, after in zip(steps, steps[1:]):
+        assert before.step < after.step <= after.steps
+        assert after.layout.num_sheets <= before.layout.num_sheets
+        assert after.improved == (after.layout != before.layout)
+        assert after.bound == steps[0].bound
+    assert_valid(steps[-1].layout, N.expand_parts(job.parts))
+    assert steps[-1].bound <= steps[-1].layout.num_sheets
+    assert steps[-1].utilization == steps[-1].layout.utilization
+
+
+def test_anytime_optimal():
+    pieces = [N.Piece('Quarter', 24, 48, 0.75, 'Melamine')] * 4
+    steps = list(N.anytime(pieces, kerf=0))
+    assert len(steps) == 1
+    assert steps[0].optimal
+
+
+def test_anytime_stops(job):
+    cancel = threading.Event()
+    search = N.anytime(job.parts, cancel=cancel)
+    next(search)
+    cancel.set()
+    assert list(search) == []
+    assert len(list(N.anytime(job.parts, deadline=0.0))) == 1
+
+
+def test_nest_cache(job, tmp_path):
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'))
+    layout = N.nest(job.parts, cache=cache)
+    assert cache.misses > 0 and cache.hits == 0
+    assert N.nest(job.parts, cache=cache) == layout
+    assert cache.hits == cache.misses
+    # The same parts under other names and tags share the cached layouts.
+    pieces = [p._replace(name=p.name.upper(), tag='K')
+              for p in reversed(N.expand_parts(job.parts))]
+    cached = N.nest(pieces, cache=cache)
+    assert cache.hits == 2 * cache.misses
+    assert_valid(cached, pieces)
+    assert cached.num_sheets == layout.num_sheets
+
+
+def test_nest_cache_key(job, tmp_path):
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'))
+    N.nest(job.parts, cache=cache)
+    N.nest(job.parts, kerf=0.25, cache=cache)
+    N.nest(job.parts, algorithm='maxrects', cache=cache)
+    assert cache.hits == 0
+
+
+def test_portfolio_cache(job, tmp_path):
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'))
+    names = ['guillotine', 'maxrects', 'skyline']
+    layout = N.portfolio(job.parts, 5.0, algorithms=names, cache=cache)
+    assert N.portfolio(job.parts, 0, algorithms=names, cache=cache) == layout
+    assert cache.hits == cache.misses
+
+
+def test_portfolio_cache_short_deadline(job, tmp_path):
+    cache = LC.LayoutCache(str(tmp_path / 'layouts.sqlite'))
+    names = ['guillotine', 'maxrects', 'skyline']
+    N.portfolio(job.parts, 0, algorithms=names, cache=cache)
+    assert len(cache) == 0
+    layout = N.portfolio(job.parts, 5.0, algorithms=names, cache=cache)
+    assert layout == N.portfolio(job.parts, 5.0, algorithms=names)
+    assert len(cache) > 0
+
+
+def test_summary(job):
+    layout = N.nest(job.parts)
+    lines = N.summary(layout)
+    assert lines[0].startswith('Panel Layout:  {} sheets'.format(
+        layout.num_sheets))
+    assert len(lines) == 1 + 2 * layout.num_sheets + layout.num_pieces
+
+
+# test_nesting.py  ends here
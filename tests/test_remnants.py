@@ -0,0 +1,83 @@
+# test_remnants.py    -*- coding: utf-8 -*-
+
+
+import random
+
+import pytest
+
+from cabinet_calc import nesting as N
+from cabinet_calc import remnants as R
+
+
+@pytest.fixture
+def store():
+    return R.RemnantStore(':memory:')
+
+
+def test_add_get_remove(store):
+    a = store.add('Melamine', 0.75, 20, 30)
+    b = store.add('Melamine', 0.75, 10, 40)
+    assert len(store) == 2
+    assert list(store) == [a, b]
+    assert store.get(a.id) == a
+    store.remove(a.id)
+    assert list(store) == [b]
+    with pytest.raises(ValueError):
+        store.remove(a.id)
+    with pytest.raises(ValueError):
+        store.get(a.id)
+    with pytest.raises(ValueError):
+        store.add('Melamine', 0.75, 0, 30)
+
+
+def test_persistent(tmp_path):
+    store = R.RemnantStore(str(tmp_path / 'shop' / 'remnants.sqlite'))
+    remnant = store.add('Melamine', 0.75, 20, 30)
+    store.close()
+    assert list(R.RemnantStore(store.filename)) == [remnant]
+
+
+def test_find(store):
+    small = store.add('Melamine', 0.75, 12, 24)
+    large = store.add('Melamine', 0.75, 24, 48)
+    store.add('Melamine', 0.5, 24, 48)
+    store.add('Standard Plywood', 0.75, 24, 48)
+    store.add('Melamine', 0.75, 48, 11.5)
+    assert store.find('Melamine', 0.75, 12, 12) == [small, large]
+    assert store.find('Melamine', 0.75, 12, 12, limit=1) == [small]
+    assert store.find('Melamine', 0.75, 24, 24) == [large]
+    assert store.find('Melamine', 0.75, 24.01, 24) == []
+    assert store.find('Melamine', 1.0) == []
+
+
+def test_find_many(store):
+    rng = random.Random(0)
+    for _ in range(3000):
+        store.add(rng.choice(['Melamine', 'Standard Plywood']),
+                  rng.choice([0.5, 0.75]), round(rng.uniform(6, 48), 3),
+                  round(rng.uniform(12, 96), 3))
+    everything = list(store)
+    for _ in range(20):
+        material = rng.choice(['Melamine', 'Standard Plywood'])
+        thickness = rng.choice([0.5, 0.75])
+        width, length = rng.uniform(6, 48), rng.uniform(12, 96)
+        expected = sorted((r for r in everything if r.material == material
+                           and r.thickness == thickness and r.width >= width
+                           and r.length >= length),
+                          key=lambda r: (r.area, r.id))
+        assert store.find(material, thickness, width, length) == expected
+
+
+def test_update(store):
+    used = store.add('Melamine', 0.75, 30, 40)
+    pieces = [N.Piece('Shelf', 30, 20, 0.75, 'Melamine', N.Rotation.FIXED)]
+    layout = N.nest(pieces, remnants=store)
+    assert [s.remnant for s in layout.sheets] == [used.id]
+    (offcut,) = store.update(layout)
+    assert list(store) == [offcut]
+    assert (offcut.width, offcut.length) == (30, 40 - 20 - N.DEFAULT_KERF)
+    with pytest.raises(ValueError):
+        store.update(layout)
+
+
+# test_remnants.py  ends here
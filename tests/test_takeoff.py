@@ -0,0 +1,104 @@
+# test_takeoff.py    -*- coding: utf-8 -*-
+
+
+import numpy as np
+import pytest
+
+from cabinet_calc import cabinet as C
+from cabinet_calc import job as J
+from cabinet_calc import nesting as N
+from cabinet_calc import takeoff as T
+
+
+@pytest.fixture
+def job():
+    return J.Job('Kitchen',
+                 {'North Wall': C.Run(157.125, 27.875, 24),
+                  'West Wall': C.Run(183, 28, 24, fillers=C.Ends.LEFT,
+                                     has_legs=True)})
+
+
+@pytest.fixture
+def job_oak():
+    return J.Job('Bath', C.Run(96, 34.5, 24, prim_material='Oak',
+                               prim_thickness=0.75))
+
+
+def test_takeoff_groups_by_material_and_thickness(job):
+    table = T.takeoff(job)
+    assert list(table['material']) == ['Standard Plywood', 'Melamine']
+    assert list(table['thickness']) == [0.74, 0.76]
+    assert list(table['job']) == [0, 0]
+    assert table['parts'].sum() == job.parts['qty'].sum()
+
+
+def test_takeoff_area_includes_kerf(job):
+    parts = job.parts
+    ply = parts[parts['material'] == 'Standard Plywood']
+    table = T.takeoff(job, kerf=0.25)
+    expected = (ply['qty'] * (ply['width'] + 0.25)
+                * (ply['height'] + 0.25)).sum()
+    assert table['area'][0] == pytest.approx(expected)
+
+
+def test_takeoff_sheets(job):
+    table = T.takeoff(job, waste=0.0)
+    assert list(table['sheets']) == list(
+        np.ceil(table['area'] / (T.SHEET_WIDTH * T.SHEET_LENGTH)))
+    assert (T.takeoff(job)['sheets'] >= table['sheets']).all()
+
+
+def test_takeoff_batch(job, job_oak):
+    table = T.takeoff([job, job_oak])
+    assert list(table['job']) == [0, 0, 1, 1]
+    assert list(table['material']) == ['Standard Plywood', 'Melamine',
+                                       'Melamine', 'Oak']
+    single = T.takeoff(job_oak)
+    assert list(table[2:]['sheets']) == list(single['sheets'])
+
+
+def test_takeoff_combined(job, job_oak):
+    table = T.takeoff([job, job_oak], combine=True)
+    assert list(table['job']) == [-1, -1, -1]
+    assert list(table['material']) == ['Standard Plywood', 'Melamine', 'Oak']
+    assert table['parts'].sum() == (job.parts['qty'].sum()
+                                    + job_oak.parts['qty'].sum())
+
+
+def test_takeoff_empty():
+    assert len(T.takeoff([])) == 0
+
+
+def test_takeoff_part_too_big():
+    tall = J.Job('Pantry', C.Run(36, 100, 24))
+    with pytest.raises(ValueError):
+        T.takeoff(tall)
+
+
+@pytest.mark.parametrize('grain, fits', [('V', False), ('H', True),
+                                         ('', True)])
+def test_check_fit_follows_grain(grain, fits):
+    parts = np.array([('Top', 1, 60.0, 30.0, 0.75, 'Oak', grain, '')],
+                     dtype=C.PART_DTYPE)
+    for check in (lambda: T._check_fit(parts, (48.0, 96.0)),
+                  lambda: N._check_fit(N.expand_parts(parts)[0], 48.0, 96.0)):
+        if fits:
+            check()
+        else:
+            with pytest.raises(ValueError):
+                check()
+
+
+def test_takeoff_bad_waste(job):
+    with pytest.raises(ValueError):
+        T.takeoff(job, waste=1.0)
+
+
+def test_summary(job):
+    assert T.summary(T.takeoff(job)) == [
+        'Standard Plywood            3/4"   10 sheets  (73 parts)',
+        'Melamine                    3/4"    3 sheets  (22 parts)'
+    ]
+
+
+# test_takeoff.py  ends here